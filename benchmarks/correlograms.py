@@ -0,0 +1,96 @@
+# Correlogram benchmark
+#
+#   python benchmarks/correlograms.py [--num-units 300] [--duration-sec 1800] [--firing-rate 10] [--num-workers 1]
+#
+# Compares figneuro.spike_sorting.correlograms with the example helper
+# (examples/spike_sorting/helpers/compute_correlogram_data.py) on a busy
+# unit and a pair of units, checking that the counts are the same, and
+# times the all-pairs computation for the whole (random) sorting. The
+# helper needs spikeinterface; without it only the new engine is timed.
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+
+SAMPLING_FREQUENCY = 30000
+
+class _SpikeTrains:
+    # the methods of a spikeinterface sorting that the helper uses
+    def __init__(self, spike_trains: dict, sampling_frequency: float) -> None:
+        self._spike_trains = spike_trains
+        self._sampling_frequency = sampling_frequency
+    def get_unit_spike_train(self, unit_id, segment_index: int=0):
+        return self._spike_trains[unit_id]
+    def get_sampling_frequency(self):
+        return self._sampling_frequency
+
+def main():
+    parser = argparse.ArgumentParser(description='Correlogram benchmark')
+    parser.add_argument('--num-units', type=int, default=300)
+    parser.add_argument('--duration-sec', type=float, default=1800)
+    parser.add_argument('--firing-rate', type=float, default=10)
+    parser.add_argument('--busy-firing-rate', type=float, default=100, help='Firing rate of the unit of the single-unit comparison')
+    parser.add_argument('--window-size-msec', type=float, default=50)
+    parser.add_argument('--bin-size-msec', type=float, default=1)
+    parser.add_argument('--num-workers', type=int, default=1)
+    args = parser.parse_args()
+
+    repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, repo_dir)
+    from figneuro.spike_sorting.correlograms import compute_correlogram, compute_correlograms
+    try:
+        sys.path.insert(0, f'{repo_dir}/examples/spike_sorting')
+        from helpers.compute_correlogram_data import compute_correlogram_data
+    except ImportError as e:
+        print(f'Unable to import the example helper ({e}). Skipping the comparison.')
+        compute_correlogram_data = None
+
+    rng = np.random.default_rng(0)
+    num_frames = int(args.duration_sec * SAMPLING_FREQUENCY)
+    def random_spike_train(firing_rate: float):
+        return np.sort(rng.integers(0, num_frames, int(firing_rate * args.duration_sec)))
+    opts = dict(window_size_msec=args.window_size_msec, bin_size_msec=args.bin_size_msec)
+
+    busy = random_spike_train(args.busy_firing_rate)
+    other = random_spike_train(args.firing_rate)
+    sorting = _SpikeTrains({1: busy, 2: other}, SAMPLING_FREQUENCY)
+    for label, unit_id2 in [(f'autocorrelogram ({len(busy)} spikes)', None), (f'cross correlogram ({len(busy)} x {len(other)} spikes)', 2)]:
+        t0 = time.time()
+        a = compute_correlogram(busy, other if unit_id2 is not None else None, sampling_frequency=SAMPLING_FREQUENCY, **opts)
+        elapsed_new = time.time() - t0
+        line = f'{label}: {elapsed_new * 1000:.1f} ms'
+        if compute_correlogram_data is not None:
+            t0 = time.time()
+            b = compute_correlogram_data(sorting=sorting, unit_id1=1, unit_id2=unit_id2, **opts)
+            elapsed_old = time.time() - t0
+            if not np.array_equal(a['bin_counts'], b['bin_counts']):
+                raise Exception(f'Counts differ from the example helper: {label}')
+            line += f' (example helper: {elapsed_old * 1000:.1f} ms, {elapsed_old / elapsed_new:.0f}x)'
+        print(line)
+
+    spike_trains = {ii: random_spike_train(args.firing_rate) for ii in range(args.num_units)}
+    num_spikes = sum([len(a) for a in spike_trains.values()])
+    t0 = time.time()
+    a = compute_correlograms(spike_trains, sampling_frequency=SAMPLING_FREQUENCY, num_workers=args.num_workers, **opts)
+    elapsed = time.time() - t0
+    line = f'all pairs ({args.num_units} units, {num_spikes} spikes, {args.num_workers} workers): {elapsed:.1f} sec'
+    if compute_correlogram_data is not None:
+        # the helper computes one pair at a time, so it is timed on a few
+        # pairs and the time is scaled to all the pairs
+        sorting = _SpikeTrains(spike_trains, SAMPLING_FREQUENCY)
+        unit_ids = list(spike_trains.keys())
+        sample_pairs = [(unit_ids[ii % len(unit_ids)], unit_ids[(ii + 1) % len(unit_ids)]) for ii in range(10)]
+        t0 = time.time()
+        for unit_id1, unit_id2 in sample_pairs:
+            b = compute_correlogram_data(sorting=sorting, unit_id1=unit_id1, unit_id2=unit_id2, **opts)
+            if not np.array_equal(a['bin_counts'][unit_id1, unit_id2], b['bin_counts']):
+                raise Exception(f'Counts differ from the example helper: units {unit_id1} and {unit_id2}')
+        elapsed_old = (time.time() - t0) / len(sample_pairs) * len(unit_ids) ** 2
+        line += f' (example helper, estimated: {elapsed_old:.1f} sec, {elapsed_old / elapsed:.0f}x)'
+    print(line)
+
+if __name__ == '__main__':
+    main()
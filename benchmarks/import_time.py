@@ -0,0 +1,89 @@
+# Import-time benchmark for the figneuro packages
+#
+#   python benchmarks/import_time.py [--repeats 5] [--max-ms 50]
+#
+# Each import runs in a fresh interpreter. The import time is measured with
+# python -X importtime (so interpreter startup is not included) and the
+# median over the repeats is reported. The script exits with an error if an
+# import loads one of the heavy dependencies, which must only be imported
+# when they are used, or if importing a package takes longer than --max-ms.
+
+import os
+import sys
+import argparse
+import subprocess
+from typing import List, Tuple
+
+
+# (statement, whether it is a bare package import subject to --max-ms)
+IMPORTS: List[Tuple[str, bool]] = [
+    ('import figneuro', True),
+    ('import figneuro.views', True),
+    ('import figneuro.storage', True),
+    ('import figneuro.spike_sorting.views', True),
+    ('import figneuro.misc.views', True),
+    ('import figneuro.saneslab.views', True),
+    ('import figneuro.franklab.views', True),
+    # importing a view imports numpy but none of the heavy dependencies
+    ('from figneuro.views import TimeseriesGraph', False),
+    ('from figneuro.spike_sorting.views import RasterPlot', False),
+    ('from figneuro.saneslab.views import SparseAudioSpectrogram', False),
+    ('from figneuro.misc.views import AnnotatedVideo, create_annotations_uri', False)
+]
+
+HEAVY_MODULES = ['figurl', 'kachery_cloud', 'simplejson', 'numba', 'cv2', 'uuid', 'asyncio']
+
+def main():
+    parser = argparse.ArgumentParser(description='Import-time benchmark for figneuro')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--max-ms', type=float, default=50, help='Maximum import time of a bare package import')
+    args = parser.parse_args()
+
+    repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    failures: List[str] = []
+    for statement, is_package_import in IMPORTS:
+        times_ms = []
+        loaded: List[str] = []
+        for _ in range(args.repeats):
+            t, loaded = _measure_import(statement, repo_dir=repo_dir)
+            times_ms.append(t)
+        median_ms = sorted(times_ms)[len(times_ms) // 2]
+        print(f'{median_ms:9.1f} ms  {statement}')
+        if loaded:
+            failures.append(f'{statement}: imports {", ".join(loaded)}')
+        if is_package_import and median_ms > args.max_ms:
+            failures.append(f'{statement}: {median_ms:.1f} ms > {args.max_ms} ms')
+    if failures:
+        print('')
+        for f in failures:
+            print(f'FAILED: {f}')
+        sys.exit(1)
+
+def _measure_import(statement: str, *, repo_dir: str):
+    # returns the import time in ms and the heavy modules that were loaded
+    code = f'{statement}\nimport sys\nprint(",".join([m for m in {HEAVY_MODULES!r} if m in sys.modules]))'
+    env = dict(os.environ)
+    env['PYTHONPATH'] = repo_dir + (os.pathsep + env['PYTHONPATH'] if env.get('PYTHONPATH') else '')
+    # -X importtime reports to stderr; the modules already imported during
+    # interpreter startup are not included
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True, env=env, cwd=repo_dir)
+    if proc.returncode != 0:
+        raise Exception(f'Error running {statement}: {proc.stderr.strip().splitlines()[-1]}')
+    # Top-level entries have a name indented by a single space; their
+    # cumulative time includes the nested imports. Interpreter startup
+    # ends with the import of site.
+    top_level: List[Tuple[str, int]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line.split('|')
+        if not name.startswith('  '):
+            top_level.append((name.strip(), int(cumulative_us)))
+    startup_names = [name for name, _ in top_level]
+    start = len(startup_names) - startup_names[::-1].index('site') if 'site' in startup_names else 0
+    total_us = sum([us for _, us in top_level[start:]])
+    loaded = [m for m in proc.stdout.strip().split(',') if m]
+    return total_us / 1000, loaded
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,11 @@
 # 1/6/23
 # https://figurl.org/f?v=gs://figurl/figneuro-1&d=sha1://488594c6bc6433838cf44f06436b0d050ab7519a&label=Cross%20correlograms%20example
 
-from typing import List
 import figneuro.spike_sorting.views as ssv
+from figneuro.spike_sorting.correlograms import cross_correlogram_items
 import spikeinterface as si
 import spikeinterface.extractors as se
 import kachery_cloud as kcl
-from helpers.compute_correlogram_data import compute_correlogram_data
 
 
 def main():
@@ -18,24 +17,12 @@ def main():
     print(url)
 
 def example_cross_correlograms(*, sorting: si.BaseSorting, hide_unit_selector: bool=False, height=500):
-    cross_correlogram_items: List[ssv.CrossCorrelogramItem] = []
-    for unit_id1 in sorting.get_unit_ids():
-        for unit_id2 in sorting.get_unit_ids():
-            if unit_id1 != unit_id2 + 1:
-                a = compute_correlogram_data(sorting=sorting, unit_id1=unit_id1, unit_id2=unit_id2, window_size_msec=50, bin_size_msec=1)
-                bin_edges_sec = a['bin_edges_sec']
-                bin_counts = a['bin_counts']
-                cross_correlogram_items.append(
-                    ssv.CrossCorrelogramItem(
-                        unit_id1 = unit_id1,
-                        unit_id2 = unit_id2,
-                        bin_edges_sec = bin_edges_sec,
-                        bin_counts = bin_counts
-                    )
-                )
+    unit_ids = sorting.get_unit_ids()
+    pairs = [(unit_id1, unit_id2) for unit_id1 in unit_ids for unit_id2 in unit_ids if unit_id1 != unit_id2 + 1]
+    cross_correlograms = cross_correlogram_items(sorting, window_size_msec=50, bin_size_msec=1, pairs=pairs)
 
     view = ssv.CrossCorrelograms(
-        cross_correlograms=cross_correlogram_items,
+        cross_correlograms=cross_correlograms,
         hide_unit_selector=hide_unit_selector,
         height=height
     )
@@ -1,8 +1,6 @@
 # 1/6/23
 # https://figurl.org/f?v=gs://figurl/figneuro-1&d=sha1://705ba1f48b9bae778ade2b8026d341165f09767e&label=Raster%20plot%20example
 
-from typing import List
-import numpy as np
 import figneuro.spike_sorting.views as ssv
 import spikeinterface as si
 import spikeinterface.extractors as se
@@ -19,20 +17,13 @@ def main():
     print(url)
 
 def example_raster_plot(*, recording: si.BaseRecording, sorting: si.BaseSorting, height=500):
-    plot_items: List[ssv.RasterPlotItem] = []
-    for unit_id in sorting.get_unit_ids():
-        spike_times_sec = np.array(sorting.get_unit_spike_train(segment_index=0, unit_id=unit_id)) / sorting.get_sampling_frequency()
-        plot_items.append(
-            ssv.RasterPlotItem(
-                unit_id=unit_id,
-                spike_times_sec=spike_times_sec.astype(np.float32)
-            )
-        )
+    # all the spike trains in one array, read from the sorting in one call
+    spike_trains = ssv.SpikeTrains.from_sorting(sorting, segment_index=0)
 
     view = ssv.RasterPlot(
         start_time_sec=0,
         end_time_sec=recording.get_num_frames(segment_index=0) / recording.get_sampling_frequency(),
-        plots=plot_items,
+        plots=spike_trains,
         height=height
     )
     return view
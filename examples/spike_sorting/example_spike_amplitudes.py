@@ -2,7 +2,6 @@
 # https://figurl.org/f?v=gs://figurl/figneuro-1&d=sha1://e0b6c94ca7e6d0ef761e94f3551c00eb8ed23636&label=Spike%20amplitudes%20example
 
 import numpy as np
-from typing import List
 import figneuro.spike_sorting.views as ssv
 import spikeinterface as si
 import spikeinterface.extractors as se
@@ -20,21 +19,17 @@ def main():
 
 def example_spike_amplitudes(*, recording: si.BaseRecording, sorting: si.BaseSorting, hide_unit_selector: bool=False, height=500):
     rng = np.random.default_rng(2022)
-    plot_items: List[ssv.SpikeAmplitudesItem] = []
-    for unit_id in sorting.get_unit_ids():
-        spike_times_sec = np.array(sorting.get_unit_spike_train(segment_index=0, unit_id=unit_id)) / sorting.get_sampling_frequency()
-        plot_items.append(
-            ssv.SpikeAmplitudesItem(
-                unit_id=unit_id,
-                spike_times_sec=spike_times_sec.astype(np.float32),
-                spike_amplitudes=rng.uniform(0, 5) + rng.normal(0, 0.2, spike_times_sec.shape).astype(np.float32) # fake amplitudes
-            )
-        )
+    spike_trains = ssv.SpikeTrains.from_sorting(sorting, segment_index=0)
+    # fake amplitudes, in the order of spike_trains.spike_frames
+    unit_means = rng.uniform(0, 5, spike_trains.num_units)
+    num_unit_spikes = np.diff(spike_trains.unit_offsets)
+    spike_amplitudes = (np.repeat(unit_means, num_unit_spikes) + rng.normal(0, 0.2, spike_trains.num_spikes)).astype(np.float32)
 
     view = ssv.SpikeAmplitudes(
         start_time_sec=0,
         end_time_sec=recording.get_num_frames(segment_index=0) / recording.get_sampling_frequency(),
-        plots=plot_items,
+        plots=spike_trains,
+        spike_amplitudes=spike_amplitudes,
         hide_unit_selector=hide_unit_selector,
         height=height
     )
@@ -3,6 +3,8 @@ import { getFigureData, SetupUrlState, startListeningToParent } from '@figurl/in
 import { useEffect, useMemo, useReducer, useState } from 'react';
 import { SetupTimeseriesSelection } from '@figurl/timeseries-views';
 import View from './View';
+import { BundleLayoutView } from './general/view-bundle';
+import { getFigneuroFileData, loadBundleManifest } from './general/figneuroFileData';
 import { defaultUnitSelection, SetupSortingCuration, UnitMetricSelectionContext, unitMetricSelectionReducer, UnitSelectionContext, unitSelectionReducer } from '@figurl/spike-sorting-views';
 import './localStyles.css';
 import './App.css'
@@ -19,7 +21,19 @@ function App() {
   const [unitMetricSelection, unitMetricSelectionDispatch] = useReducer(unitMetricSelectionReducer, {})
 
   useEffect(() => {
-    if (queryParams.test === '1') {
+    if (queryParams.bundle) {
+      // Offline figure bundle, see figneuro/views/export_bundle.py
+      // for example, http://localhost:3000?bundle=/path/to/bundle
+      loadBundleManifest(queryParams.bundle).then(manifest => (
+        getFigneuroFileData(manifest.dataUri, {responseType: 'json'})
+      )).then((data: any) => {
+        setData(data)
+      }).catch((err: any) => {
+        setErrorMessage(`Error loading figure bundle`)
+        console.error(`Error loading figure bundle`, err)
+      })
+    }
+    else if (queryParams.test === '1') {
       // To test without using the figurl parent
       // for example, with no internet connection,
       // use http://localhost:3000?test=1
@@ -41,7 +55,7 @@ function App() {
 
   const opts = useMemo(() => ({}), [])
 
-  if (!queryParams.figureId) {
+  if ((!queryParams.figureId) && (!queryParams.bundle)) {
     const style0 = {padding: 20}
     return (
       <div style={style0}>
@@ -65,12 +79,24 @@ function App() {
         <UnitSelectionContext.Provider value={{unitSelection, unitSelectionDispatch}}>
           <UnitMetricSelectionContext.Provider value={{unitMetricSelection, unitMetricSelectionDispatch}}>
             <SetupSortingCuration>
-              <View
-                data={data}
-                opts={opts}
-                width={width - 3}
-                height={height - 3}
-              />
+              {
+                (queryParams.bundle) && (data.type === 'MainLayout') ? (
+                  <BundleLayoutView
+                    data={data}
+                    opts={opts}
+                    width={width - 3}
+                    height={height - 3}
+                    ViewComponent={View}
+                  />
+                ) : (
+                  <View
+                    data={data}
+                    opts={opts}
+                    width={width - 3}
+                    height={height - 3}
+                  />
+                )
+              }
             </SetupSortingCuration>
           </UnitMetricSelectionContext.Provider>
         </UnitSelectionContext.Provider>
@@ -0,0 +1,170 @@
+import { getFigneuroFileData } from "../figneuroFileData"
+import decodeBinaryPayload from "../view-payload/decodeBinaryPayload"
+
+// An array that was published as separately stored chunks
+// (see figneuro/views/chunked_arrays.py)
+export type ChunkedArrayRef = {
+    _type: 'chunkedArray'
+    dtype: string
+    shape: number[]
+    axis: number
+    scale?: number // for quantized values, which stand for value * scale + offset
+    offset?: number // added to the values of every chunk
+    chunks: {
+        uri: string
+        start: number // range of the chunk along axis
+        end: number
+        tStart?: number // times of the first and last entries of the chunk
+        tEnd?: number
+    }[]
+}
+
+export const isChunkedArrayRef = (x: any): x is ChunkedArrayRef => (
+    (x) && (typeof(x) === 'object') && (x._type === 'chunkedArray') && (Array.isArray(x.chunks))
+)
+
+// Chunks can be shared between views, so each one is only downloaded once
+const chunkPromises: {[uri: string]: Promise<any>} = {}
+
+const loadChunk = (uri: string): Promise<any> => {
+    if (!chunkPromises[uri]) {
+        chunkPromises[uri] = getFigneuroFileData(uri, {responseType: 'binary'}).then((buf: ArrayBuffer) => (
+            decodeBinaryPayload(buf)
+        ))
+        chunkPromises[uri].catch(() => {
+            // allow retrying
+            delete chunkPromises[uri]
+        })
+    }
+    return chunkPromises[uri]
+}
+
+class ChunkedArrayClient {
+    constructor(private ref: ChunkedArrayRef) {
+    }
+    get shape() {
+        return this.ref.shape
+    }
+    get numChunks() {
+        return this.ref.chunks.length
+    }
+    // The chunks containing entries with times in [t1, t2]. Without time
+    // bounds all the chunks are returned.
+    chunkIndicesForTimeRange(t1: number, t2: number): number[] {
+        const ret: number[] = []
+        this.ref.chunks.forEach((c, i) => {
+            if ((c.tStart === undefined) || (c.tEnd === undefined) || ((c.tEnd >= t1) && (c.tStart <= t2))) {
+                ret.push(i)
+            }
+        })
+        return ret
+    }
+    async getChunk(i: number): Promise<any> {
+        const a = await loadChunk(this.ref.chunks[i].uri)
+        if (this.ref.scale !== undefined) return dequantize(a, this.ref.scale, this.ref.offset || 0)
+        return this.ref.offset !== undefined ? addOffset(a, this.ref.offset) : a
+    }
+    // The entries along axis covering the time range [t1, t2], along with
+    // the index of the first entry. Only the chunks that overlap the range
+    // are loaded.
+    async getTimeRange(t1: number, t2: number): Promise<{start: number, data: any}> {
+        const indices = this.chunkIndicesForTimeRange(t1, t2)
+        if (indices.length === 0) return {start: 0, data: await this._concatenate([])}
+        return {
+            start: this.ref.chunks[indices[0]].start,
+            data: await this._concatenate(indices)
+        }
+    }
+    async getAll(): Promise<any> {
+        return await this._concatenate(this.ref.chunks.map((c, i) => i))
+    }
+    async _concatenate(indices: number[]) {
+        const chunks = await Promise.all(indices.map(i => this.getChunk(i)))
+        if (chunks.length === 0) return emptyArray(this.ref.shape, this.ref.axis, this._outputDtype())
+        return concatenate(chunks, this.ref.axis)
+    }
+    _outputDtype() {
+        if (this.ref.scale !== undefined) return 'float32'
+        if (this.ref.offset !== undefined) return 'float64'
+        return this.ref.dtype
+    }
+}
+
+// Load all the chunks of every chunked array in the data. This is what
+// views that expect plain arrays get; views that support chunked arrays
+// can use ChunkedArrayClient to load only the visible chunks.
+export const resolveChunkedArrays = async (x: any): Promise<any> => {
+    if ((x) && (typeof(x) === 'object') && (!ArrayBuffer.isView(x))) {
+        if (Array.isArray(x)) {
+            return await Promise.all(x.map(a => resolveChunkedArrays(a)))
+        }
+        if (isChunkedArrayRef(x)) {
+            return await new ChunkedArrayClient(x).getAll()
+        }
+        const ret: {[key: string]: any} = {}
+        const keys = Object.keys(x)
+        const vals = await Promise.all(keys.map(k => resolveChunkedArrays(x[k])))
+        keys.forEach((k, i) => {ret[k] = vals[i]})
+        return ret
+    }
+    return x
+}
+
+const typedArrayConstructors: {[dtype: string]: any} = {
+    int8: Int8Array,
+    uint8: Uint8Array,
+    int16: Int16Array,
+    uint16: Uint16Array,
+    int32: Int32Array,
+    uint32: Uint32Array,
+    float32: Float32Array,
+    float64: Float64Array
+}
+
+// Chunks are typed arrays (1D) or nested arrays of typed-array rows
+const concatenate = (chunks: any[], axis: number): any => {
+    if (axis > 0) {
+        return chunks[0].map((_: any, i: number) => concatenate(chunks.map(c => c[i]), axis - 1))
+    }
+    if (ArrayBuffer.isView(chunks[0])) {
+        const n = chunks.reduce((p, c) => p + c.length, 0)
+        const ret = new (chunks[0].constructor as any)(n)
+        let pos = 0
+        for (let c of chunks) {
+            ret.set(c, pos)
+            pos += c.length
+        }
+        return ret
+    }
+    return ([] as any[]).concat(...chunks)
+}
+
+const addOffset = (a: any, offset: number): any => {
+    if (ArrayBuffer.isView(a)) {
+        const b = a as any as Float32Array
+        const ret = new Float64Array(b.length)
+        for (let i = 0; i < b.length; i++) ret[i] = b[i] + offset
+        return ret
+    }
+    return a.map((r: any) => addOffset(r, offset))
+}
+
+const dequantize = (a: any, scale: number, offset: number): any => {
+    if (ArrayBuffer.isView(a)) {
+        const b = a as any as Int16Array
+        const ret = new Float32Array(b.length)
+        for (let i = 0; i < b.length; i++) ret[i] = b[i] * scale + offset
+        return ret
+    }
+    return a.map((r: any) => dequantize(r, scale, offset))
+}
+
+const emptyArray = (shape: number[], axis: number, dtype: string): any => {
+    if (shape.length <= 1) return new typedArrayConstructors[dtype](0)
+    const n = axis === 0 ? 0 : shape[0]
+    const ret: any[] = []
+    for (let i = 0; i < n; i++) ret.push(emptyArray(shape.slice(1), axis - 1, dtype))
+    return ret
+}
+
+export default ChunkedArrayClient
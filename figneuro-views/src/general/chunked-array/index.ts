@@ -0,0 +1,2 @@
+export {default as ChunkedArrayClient, isChunkedArrayRef, resolveChunkedArrays} from './ChunkedArrayClient'
+export type {ChunkedArrayRef} from './ChunkedArrayClient'
@@ -0,0 +1,119 @@
+import { getFileData, getFileDataUrl } from "@figurl/interface"
+
+// Loads figure files. Normally the files come from the figurl parent
+// window, but when the app is showing an offline bundle (see App.tsx and
+// figneuro/views/export_bundle.py) they are fetched from the bundle
+// directory instead.
+
+type ResponseType = 'json' | 'text' | 'binary'
+
+type BundleManifest = {
+    type: 'figneuro.Bundle'
+    version: number
+    label: string
+    dataUri: string
+    state?: any
+    files: {[uri: string]: string}
+}
+
+let bundleUrl: string | undefined = undefined
+let bundleManifest: BundleManifest | undefined = undefined
+const bundleFilePromises: {[path: string]: Promise<ArrayBuffer>} = {}
+
+export const loadBundleManifest = async (url: string): Promise<BundleManifest> => {
+    bundleUrl = url.endsWith('/') ? url.slice(0, -1) : url
+    const resp = await fetch(`${bundleUrl}/manifest.json`)
+    if (!resp.ok) throw Error(`Unable to load bundle manifest: ${resp.statusText}`)
+    bundleManifest = await resp.json()
+    return bundleManifest as BundleManifest
+}
+
+export const isBundleMode = () => (bundleManifest !== undefined)
+
+export const getFigneuroFileData = async (uri: string, o: {responseType: ResponseType, startByte?: number, endByte?: number}): Promise<any> => {
+    if (!bundleManifest) {
+        return getFileData(uri, () => {}, o)
+    }
+    let buf = await loadBundleFile(uri)
+    if ((o.startByte !== undefined) || (o.endByte !== undefined)) {
+        buf = buf.slice(o.startByte || 0, o.endByte !== undefined ? o.endByte : buf.byteLength)
+    }
+    if (o.responseType === 'binary') return buf
+    const text = new TextDecoder().decode(buf)
+    if (o.responseType === 'text') return text
+    return deserializeNdarrays(JSON.parse(text))
+}
+
+const loadBundleFile = (uri: string): Promise<ArrayBuffer> => {
+    if (!bundleManifest) throw Error('Not in bundle mode')
+    const sha1 = uri.slice('sha1://'.length).split('?')[0].split('/')[0]
+    const path = bundleManifest.files[`sha1://${sha1}`]
+    if (!path) throw Error(`File not found in bundle: ${uri}`)
+    if (!bundleFilePromises[path]) {
+        bundleFilePromises[path] = fetch(`${bundleUrl}/${path}`).then(resp => {
+            if (!resp.ok) throw Error(`Unable to load bundle file ${path}: ${resp.statusText}`)
+            return resp.arrayBuffer()
+        })
+    }
+    return bundleFilePromises[path]
+}
+
+const typedArrayConstructors: {[dtype: string]: any} = {
+    uint8: Uint8Array,
+    int16: Int16Array,
+    uint16: Uint16Array,
+    int32: Int32Array,
+    uint32: Uint32Array,
+    float32: Float32Array,
+    float64: Float64Array
+}
+
+// the same decoding of {_type: 'ndarray', ...} objects that figurl does
+// for files that come from the parent window
+export const deserializeNdarrays = (x: any): any => {
+    if ((x) && (typeof(x) === 'object')) {
+        if (Array.isArray(x)) {
+            return x.map(a => deserializeNdarrays(a))
+        }
+        if ((x._type === 'ndarray') && (x.data_b64 !== undefined)) {
+            const C = typedArrayConstructors[x.dtype]
+            if (!C) throw Error(`Unsupported dtype: ${x.dtype}`)
+            const bytes = base64ToUint8Array(x.data_b64)
+            return applyShape(new C(bytes.buffer, 0, bytes.byteLength / C.BYTES_PER_ELEMENT), x.shape)
+        }
+        const ret: {[key: string]: any} = {}
+        for (let k in x) {
+            ret[k] = deserializeNdarrays(x[k])
+        }
+        return ret
+    }
+    return x
+}
+
+const applyShape = (a: any, shape: number[]): any => {
+    if (shape.length <= 1) return a
+    const stride = shape.slice(1).reduce((p, n) => p * n, 1)
+    const ret: any[] = []
+    for (let i = 0; i < shape[0]; i++) {
+        ret.push(applyShape(a.subarray(i * stride, (i + 1) * stride), shape.slice(1)))
+    }
+    return ret
+}
+
+const base64ToUint8Array = (base64: string) => {
+    const binaryString = window.atob(base64)
+    const bytes = new Uint8Array(binaryString.length)
+    for (let i = 0; i < binaryString.length; i++) {
+        bytes[i] = binaryString.charCodeAt(i)
+    }
+    return bytes
+}
+
+export const getFigneuroFileDataUrl = async (uri: string): Promise<string | undefined> => {
+    if (!bundleManifest) {
+        return getFileDataUrl(uri)
+    }
+    const sha1 = uri.slice('sha1://'.length).split('?')[0].split('/')[0]
+    const path = bundleManifest.files[`sha1://${sha1}`]
+    return path ? `${bundleUrl}/${path}` : undefined
+}
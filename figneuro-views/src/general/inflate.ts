@@ -0,0 +1,11 @@
+// Decompress data that was compressed with deflate in the zlib format
+// (zlib.compress in Python, see figneuro/views/compression.py)
+const inflate = async (buf: ArrayBuffer): Promise<ArrayBuffer> => {
+    // DecompressionStream is not in the DOM typings of this TypeScript version
+    const DecompressionStream = (globalThis as any).DecompressionStream
+    if (!DecompressionStream) throw Error('This browser does not support DecompressionStream')
+    const stream = new Blob([buf]).stream().pipeThrough(new DecompressionStream('deflate'))
+    return await new Response(stream).arrayBuffer()
+}
+
+export default inflate
@@ -0,0 +1,187 @@
+import { ViewComponentProps } from "@figurl/core-views"
+import { FunctionComponent, useEffect, useMemo, useState } from "react"
+import { getFigneuroFileData } from "../figneuroFileData"
+
+// Renders a MainLayout figure from an offline bundle. In figurl the layouts
+// are rendered by @figurl/core-views, which loads the view data through the
+// figurl parent window. Offline there is no parent window, so the layout is
+// rendered here with the data loaded from the bundle.
+
+type MainLayoutData = {
+    type: 'MainLayout'
+    layout: any
+    views: {type: string, viewId: string, dataUri: string}[]
+}
+
+type Props = {
+    data: MainLayoutData
+    opts: any
+    width: number
+    height: number
+    ViewComponent: FunctionComponent<ViewComponentProps>
+}
+
+const titleHeight = 20
+const tabBarHeight = 30
+const mountainControlsWidth = 250
+
+const BundleLayoutView: FunctionComponent<Props> = ({data, opts, width, height, ViewComponent}) => {
+    const dataUrisByViewId = useMemo(() => {
+        const ret: {[viewId: string]: string} = {}
+        for (const v of data.views) ret[v.viewId] = v.dataUri
+        return ret
+    }, [data.views])
+    return (
+        <LayoutItemView
+            layout={data.layout}
+            dataUrisByViewId={dataUrisByViewId}
+            opts={opts}
+            width={width}
+            height={height}
+            ViewComponent={ViewComponent}
+        />
+    )
+}
+
+type LayoutItemProps = {
+    layout: any
+    dataUrisByViewId: {[viewId: string]: string}
+    opts: any
+    width: number
+    height: number
+    ViewComponent: FunctionComponent<ViewComponentProps>
+}
+
+const LayoutItemView: FunctionComponent<LayoutItemProps> = (props) => {
+    const {layout} = props
+    if ((layout.type === 'Box') || (layout.type === 'Splitter')) {
+        return <BoxLayoutView {...props} />
+    }
+    else if ((layout.type === 'TabLayout') || (layout.type === 'Mountain')) {
+        return <TabLayoutView {...props} />
+    }
+    else if (layout.type === 'View') {
+        return <LeafView {...props} />
+    }
+    else {
+        return <div>Unsupported layout in bundle: {layout.type}</div>
+    }
+}
+
+const BoxLayoutView: FunctionComponent<LayoutItemProps> = ({layout, dataUrisByViewId, opts, width, height, ViewComponent}) => {
+    const horizontal = layout.direction === 'horizontal'
+    const showTitles = layout.showTitles === true
+    const items: any[] = layout.items
+    const itemProperties: any[] = layout.itemProperties || []
+    const total = horizontal ? width : height
+    const sizes = useMemo(() => {
+        const stretches = items.map((_, i) => ((itemProperties[i] || {}).stretch !== undefined ? itemProperties[i].stretch : 1))
+        const sumStretch = stretches.reduce((a, b) => (a + b), 0) || 1
+        return items.map((_, i) => {
+            const p = itemProperties[i] || {}
+            let s = total * stretches[i] / sumStretch
+            if (p.minSize !== undefined) s = Math.max(s, p.minSize)
+            if (p.maxSize !== undefined) s = Math.min(s, p.maxSize)
+            return Math.floor(s)
+        })
+    }, [items, itemProperties, total])
+    let pos = 0
+    return (
+        <div style={{position: 'relative', width, height, overflow: layout.scrollbar ? 'auto' : 'hidden'}}>
+            {
+                items.map((item, i) => {
+                    const p = itemProperties[i] || {}
+                    const titleSpace = (showTitles && p.title) ? titleHeight : 0
+                    const w = horizontal ? sizes[i] : width
+                    const h = horizontal ? height : sizes[i]
+                    const style: React.CSSProperties = horizontal ? {position: 'absolute', left: pos, top: 0, width: w, height: h} : {position: 'absolute', left: 0, top: pos, width: w, height: h}
+                    pos += sizes[i]
+                    return (
+                        <div key={i} style={style}>
+                            {titleSpace > 0 && <div style={{height: titleSpace, fontWeight: 'bold'}}>{p.title}</div>}
+                            <LayoutItemView
+                                layout={item}
+                                dataUrisByViewId={dataUrisByViewId}
+                                opts={opts}
+                                width={w}
+                                height={h - titleSpace}
+                                ViewComponent={ViewComponent}
+                            />
+                        </div>
+                    )
+                })
+            }
+        </div>
+    )
+}
+
+const TabLayoutView: FunctionComponent<LayoutItemProps> = ({layout, dataUrisByViewId, opts, width, height, ViewComponent}) => {
+    const items: any[] = layout.items
+    const itemProperties: any[] = layout.itemProperties || []
+    // in a Mountain layout the control items are shown on the left and the
+    // other items as tabs
+    const controlIndices = items.map((_, i) => i).filter(i => ((itemProperties[i] || {}).isControl === true))
+    const tabIndices = items.map((_, i) => i).filter(i => ((itemProperties[i] || {}).isControl !== true))
+    const [currentTab, setCurrentTab] = useState<number>(0)
+    const controlsWidth = controlIndices.length > 0 ? Math.min(mountainControlsWidth, width / 3) : 0
+    const tabsWidth = width - controlsWidth
+    let controlTop = 0
+    const tabIndex = tabIndices[Math.min(currentTab, tabIndices.length - 1)]
+    return (
+        <div style={{position: 'relative', width, height}}>
+            {
+                controlIndices.map(i => {
+                    const h = (itemProperties[i] || {}).controlHeight || Math.floor(height / controlIndices.length)
+                    const top = controlTop
+                    controlTop += h
+                    return (
+                        <div key={i} style={{position: 'absolute', left: 0, top, width: controlsWidth, height: h, overflow: 'hidden'}}>
+                            <LayoutItemView layout={items[i]} dataUrisByViewId={dataUrisByViewId} opts={opts} width={controlsWidth} height={h} ViewComponent={ViewComponent} />
+                        </div>
+                    )
+                })
+            }
+            <div style={{position: 'absolute', left: controlsWidth, top: 0, width: tabsWidth, height: tabBarHeight, overflowX: 'auto', whiteSpace: 'nowrap'}}>
+                {
+                    tabIndices.map((i, j) => (
+                        <button key={i} onClick={() => setCurrentTab(j)} style={{fontWeight: i === tabIndex ? 'bold' : 'normal'}}>
+                            {(itemProperties[i] || {}).label || `${j + 1}`}
+                        </button>
+                    ))
+                }
+            </div>
+            {
+                tabIndex !== undefined && (
+                    <div style={{position: 'absolute', left: controlsWidth, top: tabBarHeight, width: tabsWidth, height: height - tabBarHeight}}>
+                        <LayoutItemView layout={items[tabIndex]} dataUrisByViewId={dataUrisByViewId} opts={opts} width={tabsWidth} height={height - tabBarHeight} ViewComponent={ViewComponent} />
+                    </div>
+                )
+            }
+        </div>
+    )
+}
+
+const LeafView: FunctionComponent<LayoutItemProps> = ({layout, dataUrisByViewId, opts, width, height, ViewComponent}) => {
+    const dataUri = dataUrisByViewId[layout.viewId]
+    const [viewData, setViewData] = useState<any>()
+    const [errorMessage, setErrorMessage] = useState<string>()
+    useEffect(() => {
+        if (!dataUri) {
+            setErrorMessage(`No data for view ${layout.viewId}`)
+            return
+        }
+        let canceled = false
+        getFigneuroFileData(dataUri, {responseType: 'json'}).then(x => {
+            if (!canceled) setViewData(x)
+        }).catch((err: Error) => {
+            console.error('Error loading view data', err)
+            if (!canceled) setErrorMessage(`Error loading view data: ${err.message}`)
+        })
+        return () => {canceled = true}
+    }, [dataUri, layout.viewId])
+    if (errorMessage) return <div style={{color: 'red'}}>{errorMessage}</div>
+    if (!viewData) return <div>Loading data...</div>
+    return <ViewComponent data={viewData} opts={opts} width={width} height={height} />
+}
+
+export default BundleLayoutView
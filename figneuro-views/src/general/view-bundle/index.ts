@@ -0,0 +1 @@
+export {default as BundleLayoutView} from './BundleLayoutView'
@@ -0,0 +1,149 @@
+import { TimeseriesGraphView, useTimeRange } from "@figurl/timeseries-views"
+import { FunctionComponent, useEffect, useMemo, useState } from "react"
+import { ChunkedArrayClient, isChunkedArrayRef } from "../chunked-array"
+import { DecimatedSeries, DecimatedTimeseriesGraphViewData } from "./DecimatedTimeseriesGraphViewData"
+
+type Props = {
+	data: DecimatedTimeseriesGraphViewData
+	width: number
+	height: number
+}
+
+// the finest level is used that has at most this many points per pixel
+// in the visible time range
+const maxPointsPerPixel = 4
+
+type Selection = {
+	[dataset: string]: { // name of a decimated series
+		levelDataset: string
+		chunkIndices?: number[] // for chunked datasets
+	}
+}
+
+// Renders the graph with the TimeseriesGraph view, after replacing each
+// decimated series by the level that matches the zoom, restricted to the
+// chunks around the visible time range
+const DecimatedTimeseriesGraphView: FunctionComponent<Props> = ({data, width, height}) => {
+	const {visibleStartTimeSec, visibleEndTimeSec} = useTimeRange()
+	const datasetsByName = useMemo(() => {
+		const ret: {[name: string]: {[key: string]: any}} = {}
+		for (let ds of data.datasets) ret[ds.name] = ds.data
+		return ret
+	}, [data])
+	const selection: Selection = useMemo(() => {
+		const ret: Selection = {}
+		for (let s of data.decimatedSeries) {
+			ret[s.dataset] = selectLevel(s, datasetsByName, {
+				// times in the datasets are relative to timeOffset
+				startTime: visibleStartTimeSec !== undefined ? visibleStartTimeSec - (data.timeOffset || 0) : undefined,
+				endTime: visibleEndTimeSec !== undefined ? visibleEndTimeSec - (data.timeOffset || 0) : undefined,
+				width
+			})
+		}
+		return ret
+	}, [data, datasetsByName, visibleStartTimeSec, visibleEndTimeSec, width])
+	const selectionKey = JSON.stringify(selection)
+	const [graphData, setGraphData] = useState<any>()
+	const [errorMessage, setErrorMessage] = useState<string>()
+	useEffect(() => {
+		// the previous graph is shown until the new level is loaded
+		let canceled = false
+		createGraphData(data, datasetsByName, JSON.parse(selectionKey)).then(x => {
+			if (!canceled) setGraphData(x)
+		}).catch((err: Error) => {
+			console.error('Error loading decimated timeseries', err)
+			if (!canceled) setErrorMessage(`Error loading data: ${err.message}`)
+		})
+		return () => {canceled = true}
+	}, [data, datasetsByName, selectionKey])
+	if (errorMessage) {
+		return <div style={{color: 'red'}}>{errorMessage}</div>
+	}
+	if (!graphData) {
+		return <div>Loading data...</div>
+	}
+	return <TimeseriesGraphView data={graphData} width={width} height={height} />
+}
+
+const selectLevel = (s: DecimatedSeries, datasetsByName: {[name: string]: {[key: string]: any}}, o: {startTime?: number, endTime?: number, width: number}) => {
+	const duration = s.endTime - s.startTime
+	const t1 = o.startTime !== undefined ? Math.max(o.startTime, s.startTime) : s.startTime
+	const t2 = o.endTime !== undefined ? Math.min(o.endTime, s.endTime) : s.endTime
+	const fraction = duration > 0 ? Math.max(t2 - t1, 0) / duration : 1
+	const numVisiblePoints = s.numPoints * fraction
+	const maxNumPoints = maxPointsPerPixel * o.width
+	// candidates from finest to coarsest; a level has 2 points per bin
+	const candidates = [{dataset: s.dataset, numPoints: numVisiblePoints}, ...s.levels.map(level => (
+		{dataset: level.dataset, numPoints: 2 * numVisiblePoints / level.binSize}
+	))]
+	const levelDataset = (candidates.find(c => (c.numPoints <= maxNumPoints)) || candidates[candidates.length - 1]).dataset
+	const t = datasetsByName[levelDataset]['t']
+	if (!isChunkedArrayRef(t)) return {levelDataset}
+	// load the chunks covering the visible range and a margin of the same
+	// duration on either side, so that panning does not need a reload
+	const margin = t2 - t1
+	return {
+		levelDataset,
+		chunkIndices: new ChunkedArrayClient(t).chunkIndicesForTimeRange(t1 - margin, t2 + margin)
+	}
+}
+
+const createGraphData = async (data: DecimatedTimeseriesGraphViewData, datasetsByName: {[name: string]: {[key: string]: any}}, selection: Selection) => {
+	const levelDatasets = new Set<string>()
+	for (let s of data.decimatedSeries) {
+		for (let level of s.levels) levelDatasets.add(level.dataset)
+	}
+	const datasets: {name: string, data: {[key: string]: any}}[] = []
+	for (let ds of data.datasets) {
+		if (levelDatasets.has(ds.name)) continue
+		const sel = selection[ds.name]
+		if (sel) {
+			const s = data.decimatedSeries.find(a => (a.dataset === ds.name)) as DecimatedSeries
+			datasets.push({name: sel.levelDataset, data: await loadLevelData(datasetsByName[sel.levelDataset], sel.chunkIndices, s)})
+		}
+		else {
+			datasets.push(ds)
+		}
+	}
+	const series = data.series.map(s => (
+		selection[s.dataset] ? {...s, dataset: selection[s.dataset].levelDataset} : s
+	))
+	const ret: {[key: string]: any} = {...data, type: 'TimeseriesGraph', datasets, series}
+	delete ret.decimatedSeries
+	return ret
+}
+
+const loadLevelData = async (levelData: {[key: string]: any}, chunkIndices: number[] | undefined, s: DecimatedSeries) => {
+	if (!isChunkedArrayRef(levelData.t)) return levelData
+	// y is chunked along with t
+	const [t, y] = await Promise.all([levelData.t, levelData.y].map(async a => {
+		const client = new ChunkedArrayClient(a)
+		const chunks = await Promise.all((chunkIndices || []).map(i => client.getChunk(i)))
+		return concatenate(chunks)
+	}))
+	if (t.length === 0) return {t, y}
+	// The first and last times of the series are kept, so that the graph
+	// spans the full recording when only part of it is loaded
+	const t2 = new Float64Array(t.length + 2)
+	const y2 = new Float64Array(y.length + 2)
+	t2.set(t, 1)
+	y2.set(y, 1)
+	t2[0] = Math.min(s.startTime, t[0])
+	y2[0] = y[0]
+	t2[t2.length - 1] = Math.max(s.endTime, t[t.length - 1])
+	y2[y2.length - 1] = y[y.length - 1]
+	return {t: t2, y: y2}
+}
+
+const concatenate = (chunks: any[]): any => {
+	const n = chunks.reduce((p, c) => p + c.length, 0)
+	const ret = new Float64Array(n)
+	let pos = 0
+	for (let c of chunks) {
+		ret.set(c, pos)
+		pos += c.length
+	}
+	return ret
+}
+
+export default DecimatedTimeseriesGraphView
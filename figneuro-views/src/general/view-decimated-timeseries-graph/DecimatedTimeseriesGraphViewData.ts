@@ -0,0 +1,50 @@
+import { isArrayOf, isBoolean, isEqualTo, isNumber, isString, optional, validateObject } from "@figurl/core-utils"
+
+// A TimeseriesGraph with min/max decimation levels for some of its line
+// series (see figneuro/views/TimeseriesGraph.py). Long datasets are
+// chunked arrays, which are loaded for the visible time range only.
+export type DecimatedSeries = {
+    dataset: string
+    numPoints: number
+    startTime: number
+    endTime: number
+    levels: {dataset: string, binSize: number}[]
+}
+
+export type DecimatedTimeseriesGraphViewData = {
+    type: 'figneuro.DecimatedTimeseriesGraph'
+    datasets: {name: string, data: {[key: string]: any}}[]
+    series: {type: string, dataset: string, encoding: {[key: string]: any}, attributes: {[key: string]: any}, title?: string}[]
+    decimatedSeries: DecimatedSeries[]
+    timeOffset?: number
+    legendOpts?: {[key: string]: any}
+    yRange?: [number, number]
+    gridlineOpts?: {hideX: boolean, hideY: boolean}
+    hideToolbar?: boolean
+}
+
+const isAny = (x: any) => true
+
+const isDecimatedSeries = (x: any): x is DecimatedSeries => {
+    return validateObject(x, {
+        dataset: isString,
+        numPoints: isNumber,
+        startTime: isNumber,
+        endTime: isNumber,
+        levels: isArrayOf(y => validateObject(y, {dataset: isString, binSize: isNumber}))
+    })
+}
+
+export const isDecimatedTimeseriesGraphViewData = (x: any): x is DecimatedTimeseriesGraphViewData => {
+    return validateObject(x, {
+        type: isEqualTo('figneuro.DecimatedTimeseriesGraph'),
+        datasets: isArrayOf(isAny),
+        series: isArrayOf(isAny),
+        decimatedSeries: isArrayOf(isDecimatedSeries),
+        timeOffset: optional(isNumber),
+        legendOpts: optional(isAny),
+        yRange: optional(isArrayOf(isNumber)),
+        gridlineOpts: optional(isAny),
+        hideToolbar: optional(isBoolean)
+    })
+}
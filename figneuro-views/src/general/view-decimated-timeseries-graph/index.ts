@@ -0,0 +1,3 @@
+export {default as DecimatedTimeseriesGraphView} from './DecimatedTimeseriesGraphView'
+export {isDecimatedTimeseriesGraphViewData} from './DecimatedTimeseriesGraphViewData'
+export type {DecimatedTimeseriesGraphViewData} from './DecimatedTimeseriesGraphViewData'
@@ -0,0 +1,63 @@
+import { ViewComponentProps } from "@figurl/core-views"
+import { FunctionComponent, useMemo } from "react"
+import { DenseAutocorrelogramsViewData, DenseCrossCorrelogramsViewData } from "./DenseCorrelogramsViewData"
+
+type Props = {
+	data: DenseCrossCorrelogramsViewData | DenseAutocorrelogramsViewData
+	opts: any
+	width: number
+	height: number
+	ViewComponent: FunctionComponent<ViewComponentProps>
+}
+
+// Expands the dense form into the item list of the CrossCorrelograms or
+// Autocorrelograms view. The items share the bin edges and their counts
+// are views into the decoded array, so nothing is copied.
+const DenseCorrelogramsView: FunctionComponent<Props> = ({data, opts, width, height, ViewComponent}) => {
+	const viewData = useMemo(() => (
+		data.type === 'figneuro.DenseCrossCorrelograms' ? expandCrossCorrelograms(data) : expandAutocorrelograms(data)
+	), [data])
+	return (
+		<ViewComponent
+			data={viewData}
+			opts={opts}
+			width={width}
+			height={height}
+		/>
+	)
+}
+
+export const expandCrossCorrelograms = (data: DenseCrossCorrelogramsViewData) => {
+	const unitIds2 = data.unitIds2 || data.unitIds
+	const crossCorrelograms: any[] = []
+	data.unitIds.forEach((unitId1, i1) => {
+		unitIds2.forEach((unitId2, i2) => {
+			if ((data.pairMask) && (!data.pairMask[i1][i2])) return
+			crossCorrelograms.push({
+				unitId1,
+				unitId2,
+				binEdgesSec: data.binEdgesSec,
+				binCounts: data.binCounts[i1][i2]
+			})
+		})
+	})
+	const ret: any = {
+		type: 'CrossCorrelograms',
+		crossCorrelograms
+	}
+	if (data.hideUnitSelector !== undefined) ret.hideUnitSelector = data.hideUnitSelector
+	return ret
+}
+
+export const expandAutocorrelograms = (data: DenseAutocorrelogramsViewData) => {
+	return {
+		type: 'Autocorrelograms',
+		autocorrelograms: data.unitIds.map((unitId, i) => ({
+			unitId,
+			binEdgesSec: data.binEdgesSec,
+			binCounts: data.binCounts[i]
+		}))
+	}
+}
+
+export default DenseCorrelogramsView
@@ -0,0 +1,49 @@
+import { isArrayOf, isBoolean, isEqualTo, isNumber, isOneOf, isString, optional, validateObject } from "@figurl/core-utils"
+
+// Correlograms as one shared binEdgesSec and a dense array of counts
+// (see figneuro/spike_sorting/views/CrossCorrelograms.py and
+// Autocorrelograms.py). binCounts is decoded as nested arrays of rows:
+// binCounts[i1][i2] for cross correlograms and binCounts[i] for
+// autocorrelograms. pairMask[i1][i2] is 0 for the pairs that are not
+// included.
+export type DenseCrossCorrelogramsViewData = {
+    type: 'figneuro.DenseCrossCorrelograms'
+    binEdgesSec: number[]
+    unitIds: (number | string)[]
+    unitIds2?: (number | string)[]
+    binCounts: any[]
+    pairMask?: any[]
+    hideUnitSelector?: boolean
+}
+
+export type DenseAutocorrelogramsViewData = {
+    type: 'figneuro.DenseAutocorrelograms'
+    binEdgesSec: number[]
+    unitIds: (number | string)[]
+    binCounts: any[]
+}
+
+const isAny = (x: any) => true
+
+const isUnitIds = isArrayOf(isOneOf([isNumber, isString]))
+
+export const isDenseCrossCorrelogramsViewData = (x: any): x is DenseCrossCorrelogramsViewData => {
+    return validateObject(x, {
+        type: isEqualTo('figneuro.DenseCrossCorrelograms'),
+        binEdgesSec: isAny,
+        unitIds: isUnitIds,
+        unitIds2: optional(isUnitIds),
+        binCounts: isAny,
+        pairMask: optional(isAny),
+        hideUnitSelector: optional(isBoolean)
+    })
+}
+
+export const isDenseAutocorrelogramsViewData = (x: any): x is DenseAutocorrelogramsViewData => {
+    return validateObject(x, {
+        type: isEqualTo('figneuro.DenseAutocorrelograms'),
+        binEdgesSec: isAny,
+        unitIds: isUnitIds,
+        binCounts: isAny
+    })
+}
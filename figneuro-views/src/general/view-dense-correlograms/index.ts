@@ -0,0 +1,3 @@
+export {default as DenseCorrelogramsView} from './DenseCorrelogramsView'
+export {isDenseAutocorrelogramsViewData, isDenseCrossCorrelogramsViewData} from './DenseCorrelogramsViewData'
+export type {DenseAutocorrelogramsViewData, DenseCrossCorrelogramsViewData} from './DenseCorrelogramsViewData'
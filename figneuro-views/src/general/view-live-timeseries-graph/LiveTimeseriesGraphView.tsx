@@ -0,0 +1,98 @@
+import { TimeseriesGraphView } from "@figurl/timeseries-views"
+import { FunctionComponent, useEffect, useMemo, useState } from "react"
+import { getFigneuroFileData } from "../figneuroFileData"
+import { DecimatedTimeseriesGraphView } from "../view-decimated-timeseries-graph"
+import { decodeBinaryPayload } from "../view-payload"
+import { restoreEncodedArrays } from "../view-payload/loadPayload"
+import { subscribeToMutable } from "./liveMutable"
+import { isLiveManifest, LiveManifest, LiveTimeseriesGraphViewData } from "./LiveTimeseriesGraphViewData"
+
+type Props = {
+	data: LiveTimeseriesGraphViewData
+	width: number
+	height: number
+}
+
+type Segment = {
+	dataset: string
+	data: {t: any, y: any}
+}
+
+// Renders the graph with the appended segments added to the end of their
+// datasets. Segments are immutable, so each one is loaded only once, when
+// it first appears in the manifest.
+const LiveTimeseriesGraphView: FunctionComponent<Props> = ({data, width, height}) => {
+	const [manifest, setManifest] = useState<LiveManifest>({segments: []})
+	useEffect(() => {
+		return subscribeToMutable(data.liveManifestKey, (value: string | undefined) => {
+			if (value === undefined) return
+			const x = JSON.parse(value)
+			if (!isLiveManifest(x)) {
+				console.warn('Invalid live manifest', x)
+				return
+			}
+			// the manifest only grows
+			setManifest(m => (x.segments.length > m.segments.length ? x : m))
+		})
+	}, [data.liveManifestKey])
+	const [segments, setSegments] = useState<Segment[]>([])
+	const [errorMessage, setErrorMessage] = useState<string>()
+	useEffect(() => {
+		if (manifest.segments.length <= segments.length) return
+		let canceled = false
+		const newSegments = manifest.segments.slice(segments.length)
+		Promise.all(newSegments.map(s => loadSegment(s.uri))).then(datas => {
+			if (canceled) return
+			setSegments(a => [...a, ...newSegments.map((s, i) => ({dataset: s.dataset, data: datas[i]}))])
+		}).catch((err: Error) => {
+			console.error('Error loading live segments', err)
+			if (!canceled) setErrorMessage(`Error loading data: ${err.message}`)
+		})
+		return () => {canceled = true}
+	}, [manifest, segments.length])
+	const graphData = useMemo(() => (
+		appendSegments(data, segments)
+	), [data, segments])
+	if (errorMessage) {
+		return <div style={{color: 'red'}}>{errorMessage}</div>
+	}
+	if ((graphData.decimatedSeries) && (graphData.decimatedSeries.length > 0)) {
+		return <DecimatedTimeseriesGraphView data={{...graphData, type: 'figneuro.DecimatedTimeseriesGraph'} as any} width={width} height={height} />
+	}
+	return <TimeseriesGraphView data={{...graphData, type: 'TimeseriesGraph'} as any} width={width} height={height} />
+}
+
+const loadSegment = async (uri: string) => {
+	const buf: ArrayBuffer = await getFigneuroFileData(uri, {responseType: 'binary'})
+	return restoreEncodedArrays(decodeBinaryPayload(buf))
+}
+
+const appendSegments = (data: LiveTimeseriesGraphViewData, segments: Segment[]): LiveTimeseriesGraphViewData => {
+	if (segments.length === 0) return data
+	const datasets = data.datasets.map(ds => {
+		const dsSegments = segments.filter(s => (s.dataset === ds.name))
+		if (dsSegments.length === 0) return ds
+		return {
+			...ds,
+			data: {
+				...ds.data,
+				t: concatenate([ds.data.t, ...dsSegments.map(s => s.data.t)]),
+				y: concatenate([ds.data.y, ...dsSegments.map(s => s.data.y)])
+			}
+		}
+	})
+	return {...data, datasets}
+}
+
+const concatenate = (arrays: any[]): Float64Array => {
+	const n = arrays.reduce((p, a) => p + a.length, 0)
+	const ret = new Float64Array(n)
+	let pos = 0
+	for (let a of arrays) {
+		ret.set(a, pos)
+		pos += a.length
+	}
+	return ret
+}
+
+export default LiveTimeseriesGraphView
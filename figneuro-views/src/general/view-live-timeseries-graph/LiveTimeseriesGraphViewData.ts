@@ -0,0 +1,48 @@
+import { isArrayOf, isBoolean, isEqualTo, isNumber, isString, optional, validateObject } from "@figurl/core-utils"
+
+// A TimeseriesGraph that data is appended to after publishing (see
+// figneuro/views/TimeseriesGraph.py). The appended segments are listed in
+// the mutable manifest at liveManifestKey.
+export type LiveTimeseriesGraphViewData = {
+    type: 'figneuro.LiveTimeseriesGraph'
+    liveManifestKey: string
+    datasets: {name: string, data: {[key: string]: any}}[]
+    series: {type: string, dataset: string, encoding: {[key: string]: any}, attributes: {[key: string]: any}, title?: string}[]
+    decimatedSeries?: any[]
+    timeOffset?: number
+    legendOpts?: {[key: string]: any}
+    yRange?: [number, number]
+    gridlineOpts?: {hideX: boolean, hideY: boolean}
+    hideToolbar?: boolean
+}
+
+export type LiveManifest = {
+    segments: {
+        dataset: string
+        uri: string
+        numPoints: number
+    }[]
+}
+
+const isAny = (x: any) => true
+
+export const isLiveManifest = (x: any): x is LiveManifest => {
+    return validateObject(x, {
+        segments: isArrayOf(y => validateObject(y, {dataset: isString, uri: isString, numPoints: isNumber}))
+    })
+}
+
+export const isLiveTimeseriesGraphViewData = (x: any): x is LiveTimeseriesGraphViewData => {
+    return validateObject(x, {
+        type: isEqualTo('figneuro.LiveTimeseriesGraph'),
+        liveManifestKey: isString,
+        datasets: isArrayOf(isAny),
+        series: isArrayOf(isAny),
+        decimatedSeries: optional(isArrayOf(isAny)),
+        timeOffset: optional(isNumber),
+        legendOpts: optional(isAny),
+        yRange: optional(isArrayOf(isNumber)),
+        gridlineOpts: optional(isAny),
+        hideToolbar: optional(isBoolean)
+    })
+}
@@ -0,0 +1,3 @@
+export {default as LiveTimeseriesGraphView} from './LiveTimeseriesGraphView'
+export {isLiveTimeseriesGraphViewData} from './LiveTimeseriesGraphViewData'
+export type {LiveTimeseriesGraphViewData} from './LiveTimeseriesGraphViewData'
@@ -0,0 +1,72 @@
+import * as figurlInterface from "@figurl/interface"
+
+// Live figures keep a mutable manifest of the segments appended after
+// publishing (see figneuro/views/live.py). It is read with the getMutable
+// request of figurl. In Jupyter the figure talks to the Python kernel
+// instead, which answers figneuro.getMutable messages and pushes every
+// update, so there is nothing to poll once a message has arrived.
+
+type Listener = (value: string | undefined) => void
+
+const pollIntervalMsec = 3000
+
+const listeners: {[key: string]: Listener[]} = {}
+let receivingMessages = false
+let listeningToBackend = false
+
+// not every version of @figurl/interface has the backend messaging
+const figurl = figurlInterface as any
+
+const listenToBackend = () => {
+    if (listeningToBackend) return
+    listeningToBackend = true
+    if (!figurl.onMessageFromBackend) return
+    figurl.onMessageFromBackend((message: any) => {
+        if ((!message) || (message.type !== 'figneuro.mutable')) return
+        receivingMessages = true
+        for (let listener of (listeners[message.key] || [])) {
+            listener(message.value !== null ? message.value : undefined)
+        }
+    })
+}
+
+const requestMutable = (key: string) => {
+    if (figurl.sendMessageToBackend) {
+        try {
+            figurl.sendMessageToBackend({type: 'figneuro.getMutable', key})
+        }
+        catch (err) {
+            // no backend outside of Jupyter
+        }
+    }
+}
+
+// Calls listener with the value of the mutable now and whenever it
+// changes, until the returned function is called
+export const subscribeToMutable = (key: string, listener: Listener) => {
+    listenToBackend()
+    listeners[key] = [...(listeners[key] || []), listener]
+    let canceled = false
+    let pending = false
+    const poll = () => {
+        if ((canceled) || (pending) || (receivingMessages) || (!figurl.getMutable)) return
+        // only one request at a time, since a request may never be
+        // answered (for example in Jupyter)
+        pending = true
+        figurl.getMutable(key).then((value: string | undefined) => {
+            pending = false
+            if (!canceled) listener(value !== null ? value : undefined)
+        }).catch((err: Error) => {
+            pending = false
+            console.warn('Unable to get mutable', key, err)
+        })
+    }
+    requestMutable(key)
+    poll()
+    const timer = setInterval(poll, pollIntervalMsec)
+    return () => {
+        canceled = true
+        clearInterval(timer)
+        listeners[key] = (listeners[key] || []).filter(a => (a !== listener))
+    }
+}
@@ -0,0 +1,241 @@
+import { useSelectedUnitIds } from "@figurl/spike-sorting-views"
+import { DefaultToolbarWidth, TimeScrollView, usePanelDimensions, useTimeRange, useTimeseriesMargins, useTimeseriesSelectionInitialization } from "@figurl/timeseries-views"
+import { FunctionComponent, useCallback, useEffect, useMemo, useState } from "react"
+import { ChunkedArrayClient, isChunkedArrayRef } from "../chunked-array"
+import { MultiscaleRasterPlotViewData } from "./MultiscaleRasterPlotViewData"
+
+type Props = {
+	data: MultiscaleRasterPlotViewData
+	width: number
+	height: number
+}
+
+// The spikes themselves are loaded once the visible time range contains
+// at most this many of them. Otherwise the finest level of spike counts
+// with bins of at least one pixel is shown.
+const maxRawNumSpikes = 100000
+
+const panelSpacing = 4
+
+type Selection = {
+	level?: number // undefined for the spikes
+	chunkIndices?: number[] // for chunked arrays
+}
+
+type LoadedData = {
+	level?: number
+	firstBin: number // index of the first loaded bin, for levels
+	counts: any[] // counts of each unit, for levels
+	spikeTimesSec: any[] // spike times of each unit, for the spikes
+}
+
+type PanelProps = {
+	unitIndex: number
+}
+
+const MultiscaleRasterPlotView: FunctionComponent<Props> = ({data, width, height}) => {
+	const {selectedUnitIds} = useSelectedUnitIds()
+	const timeseriesLayoutOpts = useMemo(() => (
+		{hideToolbar: data.hideToolbar}
+	), [data.hideToolbar])
+	useTimeseriesSelectionInitialization(data.startTimeSec, data.endTimeSec)
+	const {visibleStartTimeSec, visibleEndTimeSec} = useTimeRange()
+	const margins = useTimeseriesMargins(timeseriesLayoutOpts)
+	const toolbarWidth = timeseriesLayoutOpts.hideToolbar ? 0 : DefaultToolbarWidth
+	const {panelWidth, panelHeight} = usePanelDimensions(width - toolbarWidth, height, data.unitIds.length, panelSpacing, margins)
+
+	// the coarsest level is small and is used to count the visible spikes
+	const [overview, setOverview] = useState<any[]>()
+	const [errorMessage, setErrorMessage] = useState<string>()
+	useEffect(() => {
+		let canceled = false
+		const counts = data.levels[data.levels.length - 1].counts
+		const p = isChunkedArrayRef(counts) ? new ChunkedArrayClient(counts).getAll() : Promise.resolve(counts)
+		p.then(x => {
+			if (!canceled) setOverview(x)
+		}).catch((err: Error) => {
+			console.error('Error loading spike counts', err)
+			if (!canceled) setErrorMessage(`Error loading data: ${err.message}`)
+		})
+		return () => {canceled = true}
+	}, [data])
+
+	const selection: Selection | undefined = useMemo(() => {
+		if ((!overview) || (visibleStartTimeSec === undefined) || (visibleEndTimeSec === undefined)) return undefined
+		const t1 = visibleStartTimeSec
+		const t2 = visibleEndTimeSec
+		// load the visible range and a margin of the same duration on
+		// either side, so that panning does not need a reload
+		const margin = t2 - t1
+		const coarsest = data.levels[data.levels.length - 1]
+		if (countSpikes(overview, coarsest.binSizeSec, data.startTimeSec, t1, t2) <= maxRawNumSpikes) {
+			return {chunkIndices: chunkIndicesForTimeRange(data.spikeUnitIndices, t1 - margin, t2 + margin)}
+		}
+		const pixelSec = (t2 - t1) / Math.max(panelWidth, 1)
+		let level = 0
+		data.levels.forEach((a, k) => {
+			if ((a.binSizeSec <= pixelSec) && (a.binSizeSec > data.levels[level].binSizeSec)) level = k
+		})
+		return {level, chunkIndices: chunkIndicesForTimeRange(data.levels[level].counts, t1 - margin, t2 + margin)}
+	}, [data, overview, visibleStartTimeSec, visibleEndTimeSec, panelWidth])
+	const selectionKey = JSON.stringify(selection)
+
+	const [loadedData, setLoadedData] = useState<LoadedData>()
+	useEffect(() => {
+		if (selectionKey === undefined) return
+		// the previous data are shown until the new data are loaded
+		let canceled = false
+		loadData(data, JSON.parse(selectionKey)).then(x => {
+			if (!canceled) setLoadedData(x)
+		}).catch((err: Error) => {
+			console.error('Error loading raster plot data', err)
+			if (!canceled) setErrorMessage(`Error loading data: ${err.message}`)
+		})
+		return () => {canceled = true}
+	}, [data, selectionKey])
+
+	const maxRate = useMemo(() => {
+		// for the color scale of the levels
+		if ((!loadedData) || (loadedData.level === undefined)) return 1
+		let m = 0
+		for (let c of loadedData.counts) {
+			for (let i = 0; i < c.length; i++) m = Math.max(m, c[i])
+		}
+		return Math.max(m / data.levels[loadedData.level].binSizeSec, 1)
+	}, [data, loadedData])
+
+	const paintPanel = useCallback((context: CanvasRenderingContext2D, props: PanelProps) => {
+		if ((!loadedData) || (visibleStartTimeSec === undefined) || (visibleEndTimeSec === undefined)) return
+		const timeToPixel = (t: number) => ((t - visibleStartTimeSec) / (visibleEndTimeSec - visibleStartTimeSec) * panelWidth)
+		context.save()
+		context.beginPath()
+		context.rect(-1, 0, panelWidth + 2, panelHeight)
+		context.clip()
+		if (loadedData.level === undefined) {
+			context.strokeStyle = 'black'
+			context.beginPath()
+			for (let t of loadedData.spikeTimesSec[props.unitIndex]) {
+				if ((t < visibleStartTimeSec) || (t > visibleEndTimeSec)) continue
+				const x = timeToPixel(t)
+				context.moveTo(x, 0)
+				context.lineTo(x, panelHeight)
+			}
+			context.stroke()
+		}
+		else {
+			const binSizeSec = data.levels[loadedData.level].binSizeSec
+			const counts = loadedData.counts[props.unitIndex]
+			for (let i = 0; i < counts.length; i++) {
+				if (counts[i] === 0) continue
+				const t = data.startTimeSec + (loadedData.firstBin + i) * binSizeSec
+				if ((t + binSizeSec < visibleStartTimeSec) || (t > visibleEndTimeSec)) continue
+				const x1 = timeToPixel(t)
+				const x2 = timeToPixel(t + binSizeSec)
+				context.fillStyle = rateToColor(counts[i] / binSizeSec / maxRate)
+				// at least one pixel wide, so that isolated spikes show
+				context.fillRect(x1, 0, Math.max(x2 - x1, 1), panelHeight)
+			}
+		}
+		context.restore()
+	}, [data, loadedData, maxRate, panelWidth, panelHeight, visibleStartTimeSec, visibleEndTimeSec])
+
+	const panels = useMemo(() => (data.unitIds.map((unitId, i) => ({
+		key: `${unitId}`,
+		label: `${unitId}`,
+		props: {unitIndex: i} as PanelProps,
+		paint: paintPanel
+	}))), [data.unitIds, paintPanel])
+
+	if (errorMessage) {
+		return <div style={{color: 'red'}}>{errorMessage}</div>
+	}
+	if ((visibleStartTimeSec === undefined) || (!loadedData)) {
+		return <div>Loading data...</div>
+	}
+	return (
+		<TimeScrollView
+			margins={margins}
+			panels={panels}
+			panelSpacing={panelSpacing}
+			selectedPanelKeys={selectedUnitIds}
+			timeseriesLayoutOpts={timeseriesLayoutOpts}
+			width={width}
+			height={height}
+		/>
+	)
+}
+
+// number of spikes in [t1, t2] according to the counts of a level
+const countSpikes = (counts: any[], binSizeSec: number, startTimeSec: number, t1: number, t2: number) => {
+	const i1 = Math.max(Math.floor((t1 - startTimeSec) / binSizeSec), 0)
+	const i2 = Math.ceil((t2 - startTimeSec) / binSizeSec)
+	let ret = 0
+	for (let c of counts) {
+		for (let i = i1; (i < i2) && (i < c.length); i++) ret += c[i]
+	}
+	return ret
+}
+
+const chunkIndicesForTimeRange = (x: any, t1: number, t2: number) => (
+	isChunkedArrayRef(x) ? new ChunkedArrayClient(x).chunkIndicesForTimeRange(t1, t2) : undefined
+)
+
+const loadChunks = async (x: any, chunkIndices: number[] | undefined): Promise<{start: number, data: any}> => {
+	if (!isChunkedArrayRef(x)) return {start: 0, data: x}
+	const client = new ChunkedArrayClient(x)
+	const indices = chunkIndices || []
+	const chunks = await Promise.all(indices.map(i => client.getChunk(i)))
+	return {
+		start: indices.length > 0 ? x.chunks[indices[0]].start : 0,
+		data: chunks
+	}
+}
+
+const loadData = async (data: MultiscaleRasterPlotViewData, selection: Selection): Promise<LoadedData> => {
+	const numUnits = data.unitIds.length
+	if (selection.level !== undefined) {
+		// chunks of a level are split along time, so the rows of the
+		// chunks are concatenated for each unit
+		const {start, data: chunks} = await loadChunks(data.levels[selection.level].counts, selection.chunkIndices)
+		const counts = isChunkedArrayRef(data.levels[selection.level].counts) ? (
+			data.unitIds.map((_, i) => concatenate(chunks.map((c: any) => c[i])))
+		) : chunks
+		return {level: selection.level, firstBin: start, counts, spikeTimesSec: []}
+	}
+	const [t, u] = await Promise.all([data.spikeFrames || data.spikeTimesSec, data.spikeUnitIndices].map(async x => {
+		const {data: chunks} = await loadChunks(x, selection.chunkIndices)
+		return isChunkedArrayRef(x) ? concatenate(chunks) : chunks
+	}))
+	// frames are converted to seconds here, in float64
+	const frameOffset = data.spikeFrames ? (data.frameOffset || 0) : 0
+	const divisor = data.spikeFrames ? (data.samplingFrequency || 1) : 1
+	// split by unit
+	const numUnitSpikes = new Array(numUnits).fill(0)
+	for (let i = 0; i < u.length; i++) numUnitSpikes[u[i]] ++
+	const spikeTimesSec = numUnitSpikes.map(n => new Float64Array(n))
+	const pos = new Array(numUnits).fill(0)
+	for (let i = 0; i < u.length; i++) {
+		spikeTimesSec[u[i]][pos[u[i]]++] = (t[i] + frameOffset) / divisor
+	}
+	return {firstBin: 0, counts: [], spikeTimesSec}
+}
+
+const concatenate = (chunks: any[]): any => {
+	const n = chunks.reduce((p, c) => p + c.length, 0)
+	const ret = new Float64Array(n)
+	let pos = 0
+	for (let c of chunks) {
+		ret.set(c, pos)
+		pos += c.length
+	}
+	return ret
+}
+
+// from white (no spikes) to dark blue (the highest rate in view)
+const rateToColor = (v: number) => {
+	const a = Math.min(1, Math.max(v, 0))
+	const l = Math.round(95 - 65 * Math.sqrt(a))
+	return `hsl(220,80%,${l}%)`
+}
+
+export default MultiscaleRasterPlotView
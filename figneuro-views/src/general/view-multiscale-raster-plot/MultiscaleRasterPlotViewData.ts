@@ -0,0 +1,43 @@
+import { isArrayOf, isBoolean, isEqualTo, isNumber, isOneOf, isString, optional, validateObject } from "@figurl/core-utils"
+
+// A RasterPlot with spike count levels (see
+// figneuro/spike_sorting/views/RasterPlot.py and spike_density.py). The
+// spikes of all the units are in time order, and spikeUnitIndices gives
+// the index in unitIds of each spike. The spike times are given either
+// in seconds or as sample indices (spikeFrames, relative to frameOffset
+// if given, with samplingFrequency). levels[k].counts[i] holds the spike
+// counts of unitIds[i] in bins of binSizeSec starting at startTimeSec,
+// finest level first. The arrays are usually chunked arrays.
+export type MultiscaleRasterPlotViewData = {
+    type: 'figneuro.MultiscaleRasterPlot'
+    startTimeSec: number
+    endTimeSec: number
+    unitIds: (number | string)[]
+    numSpikes: number
+    spikeTimesSec?: any
+    spikeFrames?: any
+    samplingFrequency?: number
+    frameOffset?: number
+    spikeUnitIndices: any
+    levels: {binSizeSec: number, counts: any}[]
+    hideToolbar?: boolean
+}
+
+const isAny = (x: any) => true
+
+export const isMultiscaleRasterPlotViewData = (x: any): x is MultiscaleRasterPlotViewData => {
+    return validateObject(x, {
+        type: isEqualTo('figneuro.MultiscaleRasterPlot'),
+        startTimeSec: isNumber,
+        endTimeSec: isNumber,
+        unitIds: isArrayOf(isOneOf([isNumber, isString])),
+        numSpikes: isNumber,
+        spikeTimesSec: optional(isAny),
+        spikeFrames: optional(isAny),
+        samplingFrequency: optional(isNumber),
+        frameOffset: optional(isNumber),
+        spikeUnitIndices: isAny,
+        levels: isArrayOf(y => validateObject(y, {binSizeSec: isNumber, counts: isAny})),
+        hideToolbar: optional(isBoolean)
+    })
+}
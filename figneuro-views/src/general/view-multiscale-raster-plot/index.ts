@@ -0,0 +1,3 @@
+export {default as MultiscaleRasterPlotView} from './MultiscaleRasterPlotView'
+export {isMultiscaleRasterPlotViewData} from './MultiscaleRasterPlotViewData'
+export type {MultiscaleRasterPlotViewData} from './MultiscaleRasterPlotViewData'
@@ -0,0 +1,44 @@
+import { ViewComponentProps } from "@figurl/core-views"
+import { FunctionComponent, useEffect, useState } from "react"
+import loadPayload from "./loadPayload"
+import { PayloadViewData } from "./PayloadViewData"
+
+type Props = {
+	data: PayloadViewData
+	opts: any
+	width: number
+	height: number
+	ViewComponent: FunctionComponent<ViewComponentProps>
+}
+
+const PayloadView: FunctionComponent<Props> = ({data, opts, width, height, ViewComponent}) => {
+	const [viewData, setViewData] = useState<any>()
+	const [errorMessage, setErrorMessage] = useState<string>()
+	useEffect(() => {
+		let canceled = false
+		loadPayload(data).then(x => {
+			if (canceled) return
+			setViewData(x)
+		}).catch((err: Error) => {
+			console.error('Error loading payload', err)
+			if (!canceled) setErrorMessage(`Error loading payload: ${err.message}`)
+		})
+		return () => {canceled = true}
+	}, [data])
+	if (errorMessage) {
+		return <div style={{color: 'red'}}>{errorMessage}</div>
+	}
+	if (!viewData) {
+		return <div>Loading data...</div>
+	}
+	return (
+		<ViewComponent
+			data={viewData}
+			opts={opts}
+			width={width}
+			height={height}
+		/>
+	)
+}
+
+export default PayloadView
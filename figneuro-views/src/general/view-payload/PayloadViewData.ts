@@ -0,0 +1,28 @@
+import { isEqualTo, isOneOf, isString, optional, validateObject } from "@figurl/core-utils"
+
+export type PayloadViewData = {
+    type: 'figneuro.Payload'
+    encoding: 'binary' | 'json'
+    payloadUri?: string // for binary encoding, or compressed json encoding
+    data?: any // for json encoding
+    compression?: 'deflate' // compression of the file at payloadUri
+    sharedArrays?: {[key: string]: string} // key -> uri of arrays shared between views
+}
+
+const isAny = (x: any) => true
+
+const isStringMap = (x: any) => {
+    if ((!x) || (typeof(x) !== 'object')) return false
+    return Object.values(x).every(v => isString(v))
+}
+
+export const isPayloadViewData = (x: any): x is PayloadViewData => {
+    return validateObject(x, {
+        type: isEqualTo('figneuro.Payload'),
+        encoding: isOneOf([isEqualTo('binary'), isEqualTo('json')]),
+        payloadUri: optional(isString),
+        data: optional(isAny),
+        compression: optional(isEqualTo('deflate')),
+        sharedArrays: optional(isStringMap)
+    })
+}
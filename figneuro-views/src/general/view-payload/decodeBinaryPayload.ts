@@ -0,0 +1,84 @@
+// Decoder for the figneuro binary payload container (see figneuro/views/binary_payload.py)
+//
+//   magic           8 bytes     'FNBP0001'
+//   header length   4 bytes     uint32, little-endian
+//   header          JSON text (utf-8)
+//   padding         zeros up to the next multiple of 8 bytes
+//   array buffers   little-endian array data, each starting at a multiple of 8 bytes
+
+const magic = 'FNBP0001'
+const alignment = 8
+
+type ArrayInfo = {
+    dtype: string
+    shape: number[]
+    offset: number
+    byteLength: number
+}
+
+type TypedArray = Int8Array | Uint8Array | Int16Array | Uint16Array | Int32Array | Uint32Array | Float32Array | Float64Array
+
+const typedArrayConstructors: {[dtype: string]: any} = {
+    int8: Int8Array,
+    uint8: Uint8Array,
+    int16: Int16Array,
+    uint16: Uint16Array,
+    int32: Int32Array,
+    uint32: Uint32Array,
+    float32: Float32Array,
+    float64: Float64Array
+}
+
+export const isBinaryPayload = (buf: ArrayBuffer) => {
+    if (buf.byteLength < magic.length + 4) return false
+    return new TextDecoder().decode(new Uint8Array(buf, 0, magic.length)) === magic
+}
+
+const decodeBinaryPayload = (buf: ArrayBuffer): any => {
+    if (!isBinaryPayload(buf)) throw Error('Not a figneuro binary payload')
+    const headerLength = new DataView(buf).getUint32(magic.length, true)
+    const headerStart = magic.length + 4
+    const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buf, headerStart, headerLength)))
+    const dataStart = align(headerStart + headerLength)
+    // the typed arrays are views into the loaded buffer - no copies
+    const arrays = (header.arrays as ArrayInfo[]).map(info => {
+        const C = typedArrayConstructors[info.dtype]
+        if (!C) throw Error(`Unsupported dtype in binary payload: ${info.dtype}`)
+        const a: TypedArray = new C(buf, dataStart + info.offset, info.byteLength / C.BYTES_PER_ELEMENT)
+        return applyShape(a, info.shape)
+    })
+    return replaceRefsByArrays(header.data, arrays)
+}
+
+const replaceRefsByArrays = (x: any, arrays: any[]): any => {
+    if ((x) && (typeof(x) === 'object')) {
+        if (Array.isArray(x)) {
+            return x.map(a => replaceRefsByArrays(a, arrays))
+        }
+        if (x._type === 'ndarrayRef') {
+            return arrays[x.index]
+        }
+        const ret: {[key: string]: any} = {}
+        for (let k in x) {
+            ret[k] = replaceRefsByArrays(x[k], arrays)
+        }
+        return ret
+    }
+    return x
+}
+
+// multi-dimensional arrays become nested arrays of typed-array rows,
+// the same as for arrays in the JSON encoding
+const applyShape = (a: TypedArray, shape: number[]): any => {
+    if (shape.length <= 1) return a
+    const stride = shape.slice(1).reduce((p, n) => p * n, 1)
+    const ret: any[] = []
+    for (let i = 0; i < shape[0]; i++) {
+        ret.push(applyShape(a.subarray(i * stride, (i + 1) * stride), shape.slice(1)))
+    }
+    return ret
+}
+
+const align = (pos: number) => (Math.ceil(pos / alignment) * alignment)
+
+export default decodeBinaryPayload
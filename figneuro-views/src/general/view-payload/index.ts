@@ -0,0 +1,4 @@
+export {default as PayloadView} from './PayloadView'
+export {isPayloadViewData} from './PayloadViewData'
+export type {PayloadViewData} from './PayloadViewData'
+export {default as decodeBinaryPayload, isBinaryPayload} from './decodeBinaryPayload'
@@ -0,0 +1,107 @@
+import { resolveChunkedArrays } from "../chunked-array"
+import { deserializeNdarrays, getFigneuroFileData } from "../figneuroFileData"
+import inflate from "../inflate"
+import decodeBinaryPayload from "./decodeBinaryPayload"
+import { PayloadViewData } from "./PayloadViewData"
+
+// Shared arrays are referenced by several views, so we make sure
+// that each of them is only downloaded once
+const sharedArrayPromises: {[uri: string]: Promise<any>} = {}
+
+const loadSharedArray = (uri: string): Promise<any> => {
+    if (!sharedArrayPromises[uri]) {
+        sharedArrayPromises[uri] = getFigneuroFileData(uri, {responseType: 'binary'}).then((buf: ArrayBuffer) => (
+            decodeBinaryPayload(buf)
+        ))
+        sharedArrayPromises[uri].catch(() => {
+            // allow retrying
+            delete sharedArrayPromises[uri]
+        })
+    }
+    return sharedArrayPromises[uri]
+}
+
+// Views that load the chunks of their chunked arrays as needed. For all
+// other views every chunk is loaded before the view is rendered.
+const viewTypesWithChunkedArrays = new Set(['figneuro.DecimatedTimeseriesGraph', 'figneuro.LiveTimeseriesGraph', 'figneuro.MultiscaleRasterPlot'])
+
+const loadPayload = async (payload: PayloadViewData): Promise<any> => {
+    let data: any
+    if (payload.payloadUri) {
+        let buf: ArrayBuffer = await getFigneuroFileData(payload.payloadUri, {responseType: 'binary'})
+        if (payload.compression === 'deflate') {
+            buf = await inflate(buf)
+        }
+        if (payload.encoding === 'binary') {
+            data = decodeBinaryPayload(buf)
+        }
+        else {
+            data = deserializeNdarrays(JSON.parse(new TextDecoder().decode(buf)))
+        }
+    }
+    else {
+        if (payload.encoding === 'binary') throw Error('Missing payloadUri in binary payload')
+        data = payload.data
+    }
+    if (payload.sharedArrays) {
+        const keys = Object.keys(payload.sharedArrays)
+        const arrays = await Promise.all(keys.map(key => loadSharedArray((payload.sharedArrays || {})[key])))
+        const arraysByKey: {[key: string]: any} = {}
+        keys.forEach((key, i) => {arraysByKey[key] = arrays[i]})
+        data = replaceSharedArrayRefs(data, arraysByKey)
+    }
+    if (!viewTypesWithChunkedArrays.has(data?.type)) {
+        data = await resolveChunkedArrays(data)
+    }
+    return restoreEncodedArrays(data)
+}
+
+const replaceSharedArrayRefs = (x: any, arraysByKey: {[key: string]: any}): any => {
+    if ((x) && (typeof(x) === 'object') && (!ArrayBuffer.isView(x))) {
+        if (Array.isArray(x)) {
+            return x.map(a => replaceSharedArrayRefs(a, arraysByKey))
+        }
+        if (x._type === 'sharedArrayRef') {
+            const a = arraysByKey[x.key]
+            if (a === undefined) throw Error(`Missing shared array: ${x.key}`)
+            return a
+        }
+        const ret: {[key: string]: any} = {}
+        for (let k in x) {
+            ret[k] = replaceSharedArrayRefs(x[k], arraysByKey)
+        }
+        return ret
+    }
+    return x
+}
+
+// float64 arrays that were published as float32 relative to an offset
+// (see figneuro/views/PayloadPolicy.py) and quantized arrays (see
+// figneuro/views/quantization.py)
+export const restoreEncodedArrays = (x: any): any => {
+    if ((x) && (typeof(x) === 'object') && (!ArrayBuffer.isView(x))) {
+        if (Array.isArray(x)) {
+            return x.map(a => restoreEncodedArrays(a))
+        }
+        if (x._type === 'offsetArray') {
+            const data = x.data
+            const ret = new Float64Array(data.length)
+            for (let i = 0; i < data.length; i++) ret[i] = data[i] + x.offset
+            return ret
+        }
+        if (x._type === 'quantizedArray') {
+            const data = x.data
+            const ret = new Float32Array(data.length)
+            for (let i = 0; i < data.length; i++) ret[i] = data[i] * x.scale + x.offset
+            return ret
+        }
+        const ret: {[key: string]: any} = {}
+        for (let k in x) {
+            ret[k] = restoreEncodedArrays(x[k])
+        }
+        return ret
+    }
+    return x
+}
+
+export default loadPayload
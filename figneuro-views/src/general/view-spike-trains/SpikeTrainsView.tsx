@@ -0,0 +1,53 @@
+import { ViewComponentProps } from "@figurl/core-views"
+import { FunctionComponent, useMemo } from "react"
+import { SpikeTrainsViewData } from "./SpikeTrainsViewData"
+
+type Props = {
+	data: SpikeTrainsViewData
+	opts: any
+	width: number
+	height: number
+	ViewComponent: FunctionComponent<ViewComponentProps>
+}
+
+// Expands the spike trains into the items of the view (RasterPlot,
+// SpikeAmplitudes, SpikeLocations, ...) and renders it
+const SpikeTrainsView: FunctionComponent<Props> = ({data, opts, width, height, ViewComponent}) => {
+	const viewData = useMemo(() => (
+		expandSpikeTrainsView(data)
+	), [data])
+	return (
+		<ViewComponent
+			data={viewData}
+			opts={opts}
+			width={width}
+			height={height}
+		/>
+	)
+}
+
+export const expandSpikeTrainsView = (data: SpikeTrainsViewData) => {
+	const {unitIds, spikeFrames, unitOffsets, samplingFrequency} = data.spikeTrains
+	const frameOffset = data.spikeTrains.frameOffset || 0
+	const items = unitIds.map((unitId, i) => {
+		const i1 = unitOffsets[i]
+		const i2 = unitOffsets[i + 1]
+		const spikeTimesSec = new Float64Array(i2 - i1)
+		for (let j = i1; j < i2; j++) {
+			// exact in float64 for any recording length
+			spikeTimesSec[j - i1] = (spikeFrames[j] + frameOffset) / samplingFrequency
+		}
+		const item: {[key: string]: any} = {unitId, spikeTimesSec}
+		for (let k in data.spikeData) {
+			item[k] = data.spikeData[k].subarray(i1, i2)
+		}
+		return item
+	})
+	return {
+		...data.data,
+		type: data.viewType,
+		[data.itemsKey]: items
+	}
+}
+
+export default SpikeTrainsView
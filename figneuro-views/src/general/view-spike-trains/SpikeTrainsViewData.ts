@@ -0,0 +1,47 @@
+import { isArrayOf, isEqualTo, isNumber, isOneOf, isString, optional, validateObject } from "@figurl/core-utils"
+
+// The spike trains of all the units in one array (see
+// figneuro/spike_sorting/views/SpikeTrains.py): the spikes of unitIds[i]
+// are spikeFrames[unitOffsets[i]:unitOffsets[i + 1]], as sample indices
+// relative to frameOffset
+export type SpikeTrainsData = {
+    unitIds: (number | string)[]
+    spikeFrames: Uint32Array
+    unitOffsets: Uint32Array
+    samplingFrequency: number
+    frameOffset?: number
+}
+
+// A view of type viewType whose items (data[itemsKey], one per unit) are
+// built from spikeTrains and the per-spike arrays of spikeData
+export type SpikeTrainsViewData = {
+    type: 'figneuro.SpikeTrainsView'
+    viewType: string
+    itemsKey: string
+    spikeTrains: SpikeTrainsData
+    spikeData: {[key: string]: any}
+    data: {[key: string]: any}
+}
+
+const isAny = (x: any) => true
+
+export const isSpikeTrainsData = (x: any): x is SpikeTrainsData => {
+    return validateObject(x, {
+        unitIds: isArrayOf(isOneOf([isNumber, isString])),
+        spikeFrames: isAny,
+        unitOffsets: isAny,
+        samplingFrequency: isNumber,
+        frameOffset: optional(isNumber)
+    })
+}
+
+export const isSpikeTrainsViewData = (x: any): x is SpikeTrainsViewData => {
+    return validateObject(x, {
+        type: isEqualTo('figneuro.SpikeTrainsView'),
+        viewType: isString,
+        itemsKey: isString,
+        spikeTrains: isSpikeTrainsData,
+        spikeData: isAny,
+        data: isAny
+    })
+}
@@ -0,0 +1,3 @@
+export {default as SpikeTrainsView} from './SpikeTrainsView'
+export {isSpikeTrainsViewData} from './SpikeTrainsViewData'
+export type {SpikeTrainsViewData} from './SpikeTrainsViewData'
@@ -0,0 +1,40 @@
+import { ViewComponentProps } from "@figurl/core-views"
+import { FunctionComponent } from "react"
+import { SubsampledViewData } from "./SubsampledViewData"
+
+type Props = {
+	data: SubsampledViewData
+	opts: any
+	width: number
+	height: number
+	ViewComponent: FunctionComponent<ViewComponentProps>
+}
+
+const captionHeight = 20
+
+// Renders the subsampled view below a line saying how many of the spikes
+// are shown
+const SubsampledView: FunctionComponent<Props> = ({data, opts, width, height, ViewComponent}) => {
+	const {numShownSpikes, totalNumSpikes, maxSpikesPerBin, numTimeBins} = data.subsampling
+	const percent = totalNumSpikes > 0 ? (100 * numShownSpikes / totalNumSpikes) : 100
+	return (
+		<div style={{position: 'relative', width, height}}>
+			<div
+				style={{position: 'absolute', width, height: captionHeight, fontSize: 12, color: 'gray', overflow: 'hidden', whiteSpace: 'nowrap'}}
+				title={`At most ${maxSpikesPerBin} spikes (plus the extremes) per unit in each of ${numTimeBins} time bins`}
+			>
+				Showing {numShownSpikes} of {totalNumSpikes} spikes ({percent.toFixed(1)}%)
+			</div>
+			<div style={{position: 'absolute', top: captionHeight, width, height: height - captionHeight}}>
+				<ViewComponent
+					data={data.view}
+					opts={opts}
+					width={width}
+					height={height - captionHeight}
+				/>
+			</div>
+		</div>
+	)
+}
+
+export default SubsampledView
@@ -0,0 +1,40 @@
+import { isEqualTo, isNumber, validateObject } from "@figurl/core-utils"
+
+// A view whose spikes were subsampled (see
+// figneuro/spike_sorting/views/SpikeSubsampling.py). ratios[i] is the
+// fraction of the numSpikes[i] spikes of unitIds[i] that are in the view.
+export type SubsamplingRecord = {
+    unitIds: (number | string)[]
+    numSpikes: any
+    ratios: any
+    numShownSpikes: number
+    totalNumSpikes: number
+    maxSpikesPerBin: number
+    numTimeBins: number
+    seed: number
+}
+
+export type SubsampledViewData = {
+    type: 'figneuro.SubsampledView'
+    subsampling: SubsamplingRecord
+    view: any
+}
+
+const isAny = (x: any) => true
+
+export const isSubsampledViewData = (x: any): x is SubsampledViewData => {
+    return validateObject(x, {
+        type: isEqualTo('figneuro.SubsampledView'),
+        subsampling: (y: any) => validateObject(y, {
+            unitIds: isAny,
+            numSpikes: isAny,
+            ratios: isAny,
+            numShownSpikes: isNumber,
+            totalNumSpikes: isNumber,
+            maxSpikesPerBin: isNumber,
+            numTimeBins: isNumber,
+            seed: isNumber
+        }),
+        view: isAny
+    })
+}
@@ -0,0 +1,3 @@
+export {default as SubsampledView} from './SubsampledView'
+export {isSubsampledViewData} from './SubsampledViewData'
+export type {SubsampledViewData} from './SubsampledViewData'
@@ -7,12 +7,40 @@ import { FiringRatesPlotView, isFiringRatesPlotViewData } from "./saneslab/view-
 import { CameraView, isCameraViewData } from "./saneslab/view-camera"
 import { EmptyView, isEmptyViewData } from "./general/view-empty"
 import { AnnotatedVideoView, isAnnotatedVideoViewData } from "./misc/view-annotated-video"
+import { PayloadView, isPayloadViewData } from "./general/view-payload"
+import { DecimatedTimeseriesGraphView, isDecimatedTimeseriesGraphViewData } from "./general/view-decimated-timeseries-graph"
+import { LiveTimeseriesGraphView, isLiveTimeseriesGraphViewData } from "./general/view-live-timeseries-graph"
+import { DenseCorrelogramsView, isDenseAutocorrelogramsViewData, isDenseCrossCorrelogramsViewData } from "./general/view-dense-correlograms"
+import { SpikeTrainsView, isSpikeTrainsViewData } from "./general/view-spike-trains"
+import { MultiscaleRasterPlotView, isMultiscaleRasterPlotViewData } from "./general/view-multiscale-raster-plot"
+import { SubsampledView, isSubsampledViewData } from "./general/view-subsampled"
 
 const loadView = (o: {data: any, width: number, height: number, opts: any, ViewComponent: FunctionComponent<ViewComponentProps>}) => {
-    const {data, width, height} = o
-    if (isTimeseriesGraphViewData(data)) {
+    const {data, width, height, opts, ViewComponent} = o
+    if (isPayloadViewData(data)) {
+        return <PayloadView data={data} opts={opts} width={width} height={height} ViewComponent={ViewComponent} />
+    }
+    else if (isLiveTimeseriesGraphViewData(data)) {
+        return <LiveTimeseriesGraphView data={data} width={width} height={height} />
+    }
+    else if (isDecimatedTimeseriesGraphViewData(data)) {
+        return <DecimatedTimeseriesGraphView data={data} width={width} height={height} />
+    }
+    else if (isTimeseriesGraphViewData(data)) {
         return <TimeseriesGraphView data={data} width={width} height={height} />
     }
+    else if ((isDenseCrossCorrelogramsViewData(data)) || (isDenseAutocorrelogramsViewData(data))) {
+        return <DenseCorrelogramsView data={data} opts={opts} width={width} height={height} ViewComponent={ViewComponent} />
+    }
+    else if (isMultiscaleRasterPlotViewData(data)) {
+        return <MultiscaleRasterPlotView data={data} width={width} height={height} />
+    }
+    else if (isSubsampledViewData(data)) {
+        return <SubsampledView data={data} opts={opts} width={width} height={height} ViewComponent={ViewComponent} />
+    }
+    else if (isSpikeTrainsViewData(data)) {
+        return <SpikeTrainsView data={data} opts={opts} width={width} height={height} ViewComponent={ViewComponent} />
+    }
     else if (isAudioSpectrogramViewData(data)) {
         // obsolete ??
         return <AudioSpectrogramView data={data} width={width} height={height} />
@@ -1,4 +1,4 @@
-import { getFileData } from "@figurl/interface"
+import { getFigneuroFileData } from "../../general/figneuroFileData"
 import { useTimeseriesSelection, useTimeseriesSelectionInitialization } from "@figurl/timeseries-views"
 import { FunctionComponent, useEffect, useState } from "react"
 import { AnnotatedVideoNode, AnnotatedVideoViewData } from "./AnnotatedVideoViewData"
@@ -22,7 +22,7 @@ const AnnotatedVideoView: FunctionComponent<Props> = ({data, width, height}) =>
     const [nodes, setNodes] = useState<AnnotatedVideoNode[]>()
     useEffect(() => {
         if (!nodesUri) return
-        getFileData(nodesUri, () => {}, {responseType: 'json'}).then(x => {
+        getFigneuroFileData(nodesUri, {responseType: 'json'}).then(x => {
             setNodes(x)
         })
     }, [nodesUri])
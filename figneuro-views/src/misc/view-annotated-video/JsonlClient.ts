@@ -1,15 +1,33 @@
-import { getFileData } from "@figurl/interface"
+import { getFigneuroFileData } from "../../general/figneuroFileData"
+import inflate from "../../general/inflate"
 
 const chunkSize = 1000 * 1000 * 1 // 1MB chunks. Is this a good choice?
 
 interface JsonlHeader {recordByteLengths: number[]}
 
+// Compressed JSONL container (see figneuro/views/compression.py): the
+// records are stored in separately compressed blocks, so a record is read
+// by fetching and decompressing the block that contains it
+const compressedJsonlMagic = 'FNZJSONL'
+const maxNumCachedBlocks = 20
+
+interface CompressedJsonlHeader {
+    version: number
+    codec: 'deflate'
+    header: JsonlHeader
+    numRecords: number
+    blocks: [number, number, number][] // [firstRecord, offset, byteLength]
+}
+
 class JsonlClient {
     #initializing = false
     #chunks: {[chunkIndex: number]: string} = {}
     #header: JsonlHeader | undefined
     #framePositions: number[] | undefined
     #fetchingChunks = new Set<number>()
+    #compressedHeader: CompressedJsonlHeader | undefined
+    #compressedDataStart = 0
+    #blockPromises = new Map<number, Promise<string[]>>()
     constructor(private uri: string) {
 
     }
@@ -22,6 +40,7 @@ class JsonlClient {
         }
         this.#initializing = true
         try {
+            if (await this._initializeCompressed()) return
             let i = 0
             while (!this._haveEnoughDataToReadHeaderRecord()) {
                 if (!(await this._fetchChunk(i))) {
@@ -62,6 +81,7 @@ class JsonlClient {
     }
     async getFrame(frameIndex: number): Promise<undefined | {[key: string]: any}> {
         await this.initialize()
+        if (this.#compressedHeader) return this._getCompressedFrame(frameIndex)
         if (!this.#framePositions) return undefined // unexpected
         if (frameIndex < 0) return undefined
         if (frameIndex + 1 >= this.#framePositions.length) return undefined
@@ -73,6 +93,74 @@ class JsonlClient {
         await this.initialize()
         return this.#header
     }
+    async _initializeCompressed() {
+        // The first chunk is fetched as binary to check for the compressed
+        // container. Otherwise it is used as the first text chunk.
+        const buf: ArrayBuffer | undefined = await getFigneuroFileData(this.uri, {startByte: 0, endByte: chunkSize, responseType: 'binary'})
+        if (!buf) return false
+        const magic = new TextDecoder().decode(buf.slice(0, compressedJsonlMagic.length))
+        if (magic !== compressedJsonlMagic) {
+            this.#chunks[0] = new TextDecoder().decode(buf)
+            return false
+        }
+        const headerStart = compressedJsonlMagic.length + 4
+        const headerLength = new DataView(buf).getUint32(compressedJsonlMagic.length, true)
+        let headerBuf: ArrayBuffer
+        if (headerStart + headerLength <= buf.byteLength) {
+            headerBuf = buf.slice(headerStart, headerStart + headerLength)
+        }
+        else {
+            headerBuf = await getFigneuroFileData(this.uri, {startByte: headerStart, endByte: headerStart + headerLength, responseType: 'binary'})
+        }
+        this.#compressedHeader = JSON.parse(new TextDecoder().decode(headerBuf))
+        this.#header = this.#compressedHeader?.header
+        this.#compressedDataStart = headerStart + headerLength
+        return true
+    }
+    async _getCompressedFrame(frameIndex: number) {
+        const h = this.#compressedHeader
+        if (!h) return undefined
+        if ((frameIndex < 0) || (frameIndex >= h.numRecords)) return undefined
+        // the last block whose first record is at or before frameIndex
+        let lo = 0
+        let hi = h.blocks.length - 1
+        while (lo < hi) {
+            const mid = Math.ceil((lo + hi) / 2)
+            if (h.blocks[mid][0] <= frameIndex) lo = mid
+            else hi = mid - 1
+        }
+        const records = await this._fetchBlock(lo)
+        if (!records) return undefined
+        // trigger getting the next block in advance (buffering)
+        if (lo + 1 < h.blocks.length) this._fetchBlock(lo + 1)
+        return JSON.parse(records[frameIndex - h.blocks[lo][0]])
+    }
+    async _fetchBlock(blockIndex: number): Promise<string[] | undefined> {
+        const h = this.#compressedHeader
+        if (!h) return undefined
+        let p = this.#blockPromises.get(blockIndex)
+        if (!p) {
+            const [, offset, byteLength] = h.blocks[blockIndex]
+            const b1 = this.#compressedDataStart + offset
+            p = getFigneuroFileData(this.uri, {startByte: b1, endByte: b1 + byteLength, responseType: 'binary'}).then(async (buf: ArrayBuffer) => (
+                new TextDecoder().decode(await inflate(buf)).split('\n')
+            ))
+            this.#blockPromises.set(blockIndex, p)
+            // keep the most recently fetched blocks
+            if (this.#blockPromises.size > maxNumCachedBlocks) {
+                const oldest = this.#blockPromises.keys().next().value
+                if (oldest !== undefined) this.#blockPromises.delete(oldest)
+            }
+        }
+        try {
+            return await p
+        }
+        catch(err) {
+            console.error('Error fetching block', err)
+            this.#blockPromises.delete(blockIndex)
+            return undefined
+        }
+    }
     _haveEnoughDataToReadHeaderRecord() {
         let i = 0
         while (true) {
@@ -118,7 +206,7 @@ class JsonlClient {
         try {
             const i1 = chunkSize * i
             const i2 = chunkSize * (i + 1)
-            const txt = await getFileData(this.uri, () => {}, {startByte: i1, endByte: i2, responseType: 'text'})
+            const txt = await getFigneuroFileData(this.uri, {startByte: i1, endByte: i2, responseType: 'text'})
             // const resp = await fetch(
             //     this.url,
             //     {
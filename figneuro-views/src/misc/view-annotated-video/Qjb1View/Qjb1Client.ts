@@ -1,4 +1,4 @@
-import { getFileData } from "@figurl/interface"
+import { getFigneuroFileData } from "../../../general/figneuroFileData"
 
 const expectedInitialText = 'qjb1.ecv9vh5lt\n'
 const initialChunkSize = 1000 * 1000 * 0.5 // use a smaller first chunk so we can load the first frames more quickly
@@ -151,7 +151,7 @@ class Qjb1Client {
         try {
             const i1 = i === 0 ? 0 : initialChunkSize + chunkSize * (i - 1)
             const i2 = i + 1 === 0 ? 0 : initialChunkSize + chunkSize * (i + 1 - 1)
-            const content = await getFileData(this.uri, () => {}, {startByte: i1, endByte: i2, responseType: 'binary'})
+            const content = await getFigneuroFileData(this.uri, {startByte: i1, endByte: i2, responseType: 'binary'})
             this.#chunks[i] = content
             return this.#chunks[i]
         }
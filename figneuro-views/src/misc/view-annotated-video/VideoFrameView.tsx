@@ -1,4 +1,4 @@
-import { getFileDataUrl } from "@figurl/interface";
+import { getFigneuroFileDataUrl } from "../../general/figneuroFileData";
 import { AffineTransform } from "@figurl/spike-sorting-views";
 import { FunctionComponent, useCallback, useEffect, useMemo, useRef, useState } from "react";
 
@@ -19,7 +19,7 @@ const VideoFrameView: FunctionComponent<Props> = ({src, timeSec, setTimeSec, wid
 	const [refreshCode, setRefreshCode] = useState(0)
 	useEffect(() => {
 		if (src.startsWith('sha1://')) {
-			getFileDataUrl(src).then((url) => {
+			getFigneuroFileDataUrl(src).then((url) => {
 				setSrcUrl(url)
 			}).catch(err => {
 				console.warn(`Problem getting file data url for ${src}`)
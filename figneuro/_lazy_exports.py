@@ -0,0 +1,40 @@
+import sys
+import importlib
+from types import ModuleType
+from typing import Dict
+
+
+def lazy_exports(package_name: str, exports: Dict[str, str]):
+    """
+    Export names from the submodules of a package without importing them
+    until they are first accessed
+
+    exports maps each exported name to the submodule that defines it, for
+    example {'Box': 'Box', 'MountainLayoutItem': 'MountainLayout'}. Call it
+    at the end of the package __init__.py with __name__ as package_name.
+    """
+    module = sys.modules[package_name]
+    module.__dict__['_lazy_exports'] = exports
+    module.__dict__['__all__'] = sorted(exports.keys())
+    module.__class__ = _LazyExportsModule
+
+class _LazyExportsModule(ModuleType):
+    def __getattr__(self, name: str):
+        exports: Dict[str, str] = self.__dict__['_lazy_exports']
+        if name not in exports:
+            raise AttributeError(f'module {self.__name__!r} has no attribute {name!r}')
+        submodule = importlib.import_module(f'.{exports[name]}', self.__name__)
+        value = getattr(submodule, name)
+        self.__dict__[name] = value
+        return value
+    def __setattr__(self, name: str, value) -> None:
+        # When a submodule is imported, the import system sets it as an
+        # attribute of the package. Most submodules are named after the
+        # class they define (View.py defines View), and the package
+        # attribute must stay the class, as it was with eager imports.
+        exports: Dict[str, str] = self.__dict__.get('_lazy_exports', {})
+        if isinstance(value, ModuleType) and exports.get(name, None) is not None and value.__name__ == f'{self.__name__}.{exports[name]}':
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(self.__dict__['_lazy_exports'].keys()))
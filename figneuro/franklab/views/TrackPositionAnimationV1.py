@@ -1,6 +1,7 @@
 from typing import List, Union
 import numpy as np
 from .View import View
+from ...views.ChunkedArray import ChunkedArray
 
 
 # /**
@@ -118,6 +119,10 @@ class DecodedPositionData:
 class TrackPositionAnimationV1(View):
     """
     Track position animation
+
+    For long recordings the timestamps, positions and head direction can be
+    given as ChunkedArray, for example
+    ChunkedArray(positions, times=timestamps, axis=1).
     """
     def __init__(self, *,
         track_bin_width: float,
@@ -125,13 +130,13 @@ class TrackPositionAnimationV1(View):
         track_bin_ul_corners: np.array, # 2 x N
         total_recording_frame_length: float,
         timestamp_start: Union[float, None]=None,
-        timestamps: np.array, # N
-        positions: np.array, # 2 x N
+        timestamps: Union[np.array, ChunkedArray], # N
+        positions: Union[np.array, ChunkedArray], # 2 x N
         x_min: float,
         x_max: float,
         y_min: float,
         y_max: float,
-        head_direction: Union[None, np.array]=None, # N
+        head_direction: Union[None, np.array, ChunkedArray]=None, # N
         decoded_data: Union[None, DecodedPositionData]=None,
         sampling_frequency_hz: Union[None, float]=None,
         **kwargs
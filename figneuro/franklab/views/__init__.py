@@ -1,2 +1,15 @@
-from .TrackPositionAnimationV1 import TrackPositionAnimationV1, DecodedPositionData
-from .DecodedLinearPositionV1 import DecodedLinearPositionData
+from typing import TYPE_CHECKING
+from ..._lazy_exports import lazy_exports
+
+
+# The submodules are imported when a name is first accessed, so that
+# importing the package does not import all the views and their dependencies
+lazy_exports(__name__, {
+    'TrackPositionAnimationV1': 'TrackPositionAnimationV1',
+    'DecodedPositionData': 'TrackPositionAnimationV1',
+    'DecodedLinearPositionData': 'DecodedLinearPositionV1'
+})
+
+if TYPE_CHECKING:
+    from .TrackPositionAnimationV1 import TrackPositionAnimationV1, DecodedPositionData
+    from .DecodedLinearPositionV1 import DecodedLinearPositionData
@@ -1 +1,12 @@
-from .create_qjb1 import create_qjb1
\ No newline at end of file
+from typing import TYPE_CHECKING
+from ..._lazy_exports import lazy_exports
+
+
+# The submodules are imported when a name is first accessed, so that
+# importing the package does not import all the views and their dependencies
+lazy_exports(__name__, {
+    'create_qjb1': 'create_qjb1'
+})
+
+if TYPE_CHECKING:
+    from .create_qjb1 import create_qjb1
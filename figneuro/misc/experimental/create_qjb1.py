@@ -2,9 +2,9 @@ from typing import Union
 import os
 import json
 import time
-import cv2
 
 def create_qjb1(*, input: str, output: str, quality: int, duration_sec: Union[float, None]=None):
+    import cv2
     input_file_size = os.path.getsize(input)
     vid = cv2.VideoCapture(input)
 
@@ -1,3 +1,23 @@
-from .AnnotatedVideo import AnnotatedVideoNode, AnnotatedVideo
-from .create_annotations_uri import AnnotationElement, AnnotationFrame, create_annotations_uri, NodeElement, EdgeElement
-from .create_position_decode_field_uri import PositionDecodeFieldBin, PositionDecodeFieldFrame, create_position_decode_field_uri
\ No newline at end of file
+from typing import TYPE_CHECKING
+from ..._lazy_exports import lazy_exports
+
+
+# The submodules are imported when a name is first accessed, so that
+# importing the package does not import all the views and their dependencies
+lazy_exports(__name__, {
+    'AnnotatedVideoNode': 'AnnotatedVideo',
+    'AnnotatedVideo': 'AnnotatedVideo',
+    'AnnotationElement': 'create_annotations_uri',
+    'AnnotationFrame': 'create_annotations_uri',
+    'create_annotations_uri': 'create_annotations_uri',
+    'NodeElement': 'create_annotations_uri',
+    'EdgeElement': 'create_annotations_uri',
+    'PositionDecodeFieldBin': 'create_position_decode_field_uri',
+    'PositionDecodeFieldFrame': 'create_position_decode_field_uri',
+    'create_position_decode_field_uri': 'create_position_decode_field_uri'
+})
+
+if TYPE_CHECKING:
+    from .AnnotatedVideo import AnnotatedVideoNode, AnnotatedVideo
+    from .create_annotations_uri import AnnotationElement, AnnotationFrame, create_annotations_uri, NodeElement, EdgeElement
+    from .create_position_decode_field_uri import PositionDecodeFieldBin, PositionDecodeFieldFrame, create_position_decode_field_uri
@@ -1,7 +1,6 @@
-from typing import List
-import figurl as fig
-import kachery_cloud as kcl
-import simplejson
+from typing import List, Union
+from ...storage import StorageBackend
+from ...views.compression import store_jsonl_text
 
 
 class AnnotationElement():
@@ -16,6 +15,7 @@ class AnnotationElement():
         self.id = id
         self.data = data
     def to_dict(self):
+        import figurl as fig
         return {
             't': self.type, # type
             'i': self.id, # id
@@ -34,11 +34,13 @@ class AnnotationFrame():
     def __init__(self, elements: List[AnnotationElement]) -> None:
         self.elements = elements
 
-def create_annotations_uri(annotation_frames: List[AnnotationFrame]):
+def create_annotations_uri(annotation_frames: List[AnnotationFrame], *, backend: Union[str, StorageBackend, None]=None, compress: Union[bool, None]=None):
     text = create_annotations_jsonl_text(annotation_frames)
-    return kcl.store_text(text, label='annotations.jsonl')
+    # compressed in blocks of records if compress is True (see store_jsonl_text)
+    return store_jsonl_text(text, label='annotations.jsonl', backend=backend, compress=compress)
 
 def create_annotations_jsonl_text(annotation_frames: List[AnnotationFrame]):
+    import simplejson
     frame_dicts = [{'e': [e.to_dict() for e in f.elements]} for f in annotation_frames]
     frame_jsons = [
         simplejson.dumps(
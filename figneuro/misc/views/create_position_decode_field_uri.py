@@ -1,7 +1,7 @@
 import numpy as np
-from typing import List
-import kachery_cloud as kcl
-import simplejson
+from typing import List, Union
+from ...storage import StorageBackend
+from ...views.compression import store_jsonl_text
 import base64
 
 class PositionDecodeFieldFrame():
@@ -25,11 +25,13 @@ class PositionDecodeFieldBin():
     def to_dict(self):
         return {'x': self.x, 'y': self.y, 'w': self.w, 'h': self.h}
 
-def create_position_decode_field_uri(*, frames: List[PositionDecodeFieldFrame], bins: List[PositionDecodeFieldBin], max_value: float):
+def create_position_decode_field_uri(*, frames: List[PositionDecodeFieldFrame], bins: List[PositionDecodeFieldBin], max_value: float, backend: Union[str, StorageBackend, None]=None, compress: Union[bool, None]=None):
     text = create_position_decode_field_jsonl_text(frames=frames, bins=bins, max_value=max_value)
-    return kcl.store_text(text, label='position_decode_field.jsonl')
+    # compressed in blocks of records if compress is True (see store_jsonl_text)
+    return store_jsonl_text(text, label='position_decode_field.jsonl', backend=backend, compress=compress)
 
 def create_position_decode_field_jsonl_text(*, frames: List[PositionDecodeFieldFrame], bins: List[PositionDecodeFieldBin], max_value: float):
+    import simplejson
     frame_dicts = [{'i': uint16_array_to_b64(f.indices), 'v': uint16_array_to_b64(f.values)} for f in frames]
     frame_jsons = [
         simplejson.dumps(
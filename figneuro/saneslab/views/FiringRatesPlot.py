@@ -1,18 +1,26 @@
 import numpy as np
 from typing import List, Union
 from .View import View
+from ...spike_sorting.views.SpikeTrains import SpikeTrains, check_spike_times, spike_trains_from_items, spike_trains_view_dict
 
 
 class FiringRatesPlotItem:
     """
     Spike train for a single unit in a raster plot
+
+    The spike times are spike_times_sec, or spike_frames (integer sample
+    indices) along with the sampling_frequency of the FiringRatesPlot.
     """
     def __init__(self,
         unit_id: Union[int, str],
-        spike_times_sec: np.array
+        spike_times_sec: Union[np.array, None]=None,
+        *,
+        spike_frames: Union[np.ndarray, None]=None
     ) -> None:
+        check_spike_times(spike_times_sec, spike_frames)
         self.unit_id = unit_id
         self.spike_times_sec = spike_times_sec
+        self.spike_frames = spike_frames
     def to_dict(self):
         ret = {
             'unitId': self.unit_id,
@@ -23,20 +31,35 @@ class FiringRatesPlotItem:
 class FiringRatesPlot(View):
     """
     Raster plot view
+
+    plots is a list of FiringRatesPlotItem or a SpikeTrains
     """
     def __init__(self, *,
         start_time_sec: float,
         end_time_sec: float,
-        plots: List[FiringRatesPlotItem],
+        plots: Union[List[FiringRatesPlotItem], SpikeTrains],
         hide_toolbar: bool=False,
+        sampling_frequency: Union[float, None]=None,
         **kwargs
     ) -> None:
         super().__init__('saneslab.FiringRatesPlot', **kwargs)
+        if not isinstance(plots, SpikeTrains):
+            converted = spike_trains_from_items(plots, sampling_frequency=sampling_frequency)
+            if converted is not None:
+                plots = converted[0]
         self._start_time_sec = start_time_sec
         self._end_time_sec = end_time_sec
         self._plots = plots
         self._hide_toolbar = hide_toolbar
+        if isinstance(plots, SpikeTrains):
+            self.type = 'figneuro.SpikeTrainsView'
     def to_dict(self) -> dict:
+        if isinstance(self._plots, SpikeTrains):
+            return spike_trains_view_dict('saneslab.FiringRatesPlot', self._plots, items_key='plots', data={
+                'startTimeSec': self._start_time_sec,
+                'endTimeSec': self._end_time_sec,
+                'hideToolbar': self._hide_toolbar
+            })
         ret = {
             'type': self.type,
             'startTimeSec': self._start_time_sec,
@@ -1,8 +1,6 @@
 from typing import List, Optional
 import numpy as np
-import figurl as fig
 from .View import View
-from numba import jit
 
 class SparseAudioSpectrogram(View):
     def __init__(self, *,
@@ -41,8 +39,18 @@ class SparseAudioSpectrogram(View):
     def child_views(self) -> List[View]:
         return []
 
-@jit(nopython=True)
+_get_sparse_representation_of_vector_jit = None
+
 def _get_sparse_representation_of_vector(vec: np.array, max_delta: int):
+    # numba is imported, and the function compiled, the first time a
+    # spectrogram is serialized rather than when the module is imported
+    global _get_sparse_representation_of_vector_jit
+    if _get_sparse_representation_of_vector_jit is None:
+        from numba import jit
+        _get_sparse_representation_of_vector_jit = jit(nopython=True)(_sparse_representation_of_vector)
+    return _get_sparse_representation_of_vector_jit(vec, max_delta)
+
+def _sparse_representation_of_vector(vec: np.array, max_delta: int):
     values = []
     indices_delta = []
     last_i = 0
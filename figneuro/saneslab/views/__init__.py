@@ -1,3 +1,17 @@
-from .SparseAudioSpectrogram import SparseAudioSpectrogram
-from .FiringRatesPlot import FiringRatesPlot, FiringRatesPlotItem
-from .Camera import Camera
\ No newline at end of file
+from typing import TYPE_CHECKING
+from ..._lazy_exports import lazy_exports
+
+
+# The submodules are imported when a name is first accessed, so that
+# importing the package does not import all the views and their dependencies
+lazy_exports(__name__, {
+    'SparseAudioSpectrogram': 'SparseAudioSpectrogram',
+    'FiringRatesPlot': 'FiringRatesPlot',
+    'FiringRatesPlotItem': 'FiringRatesPlot',
+    'Camera': 'Camera'
+})
+
+if TYPE_CHECKING:
+    from .SparseAudioSpectrogram import SparseAudioSpectrogram
+    from .FiringRatesPlot import FiringRatesPlot, FiringRatesPlotItem
+    from .Camera import Camera
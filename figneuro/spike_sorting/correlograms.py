@@ -0,0 +1,335 @@
+from typing import Any, Dict, List, Sequence, Tuple, Union
+import numpy as np
+
+
+# Correlograms of spike trains given as sample indices (frames)
+#
+# The bins are the ones of examples/spike_sorting/helpers/compute_correlogram_data.py:
+# an odd number of bins of bin_size_msec centered on lag 0, with the count
+# of each bin symmetric in the lag. Lags are converted to bins with a
+# lookup table over the lags in frames, so no floating point arithmetic
+# is done per spike pair. The spike pairs within the window are found with
+# searchsorted on the sorted spike trains and counted with a single
+# np.bincount, in blocks of at most _MAX_NUM_PAIRS_PER_BLOCK pairs.
+
+UnitId = Union[int, str]
+
+_MAX_NUM_PAIRS_PER_BLOCK = 2**24
+
+def compute_correlogram(
+    times1: np.ndarray,
+    times2: Union[np.ndarray, None]=None,
+    *,
+    sampling_frequency: float,
+    window_size_msec: float,
+    bin_size_msec: float
+) -> Dict[str, np.ndarray]:
+    """
+    The autocorrelogram of times1 or, if times2 is given, the cross
+    correlogram of times1 and times2 (spike times in frames). Returns
+    {'bin_edges_sec': ..., 'bin_counts': ...} like compute_correlogram_data
+    in the spike sorting examples.
+    """
+    bins = _CorrelogramBins(sampling_frequency=sampling_frequency, window_size_msec=window_size_msec, bin_size_msec=bin_size_msec)
+    t1 = _sorted_frames(times1)
+    counts = np.zeros((bins.num_bins,), dtype=np.int64)
+    if times2 is None:
+        # positive lags only; the counts are mirrored
+        hi = np.searchsorted(t1, t1 + bins.max_lag, side='right')
+        lo = np.arange(1, len(t1) + 1)
+        for (start, end), block_counts, j in _iter_window_pairs(lo, hi):
+            half_counts = np.bincount(bins.lut[t1[j] - np.repeat(t1[start:end], block_counts)], minlength=bins.num_bins_half)
+            counts[bins.num_bins_half - 1:] += half_counts
+            counts[bins.num_bins_half - 1::-1] += half_counts
+    else:
+        t2 = _sorted_frames(times2)
+        lo = np.searchsorted(t2, t1 - bins.max_lag, side='left')
+        hi = np.searchsorted(t2, t1 + bins.max_lag, side='right')
+        for (start, end), block_counts, j in _iter_window_pairs(lo, hi):
+            lags = t2[j] - np.repeat(t1[start:end], block_counts)
+            k = bins.lut[np.abs(lags)]
+            counts += np.bincount(np.where(lags >= 0, bins.num_bins_half - 1 + k, bins.num_bins_half - 1 - k), minlength=bins.num_bins)
+    return {
+        'bin_edges_sec': bins.bin_edges_sec,
+        'bin_counts': counts.astype(np.int32)
+    }
+
+def compute_correlograms(
+    spike_trains: Dict[UnitId, np.ndarray],
+    *,
+    sampling_frequency: float,
+    window_size_msec: float,
+    bin_size_msec: float,
+    unit_ids: Union[Sequence[UnitId], None]=None,
+    pairs: Union[Sequence[Tuple[UnitId, UnitId]], None]=None,
+    num_workers: int=1
+) -> Dict[str, Any]:
+    """
+    The correlograms of all pairs of units (spike trains in frames by unit
+    ID), computed in one pass over the merged spike train
+
+    Returns {'bin_edges_sec': ..., 'unit_ids': [...], 'bin_counts': ...}
+    where bin_counts[i1, i2] is the cross correlogram of unit_ids[i1] and
+    unit_ids[i2] (the same as compute_correlogram(times1, times2)), and
+    bin_counts[i, i] is the autocorrelogram of unit_ids[i]. This is the
+    dense form of the CrossCorrelograms view:
+    CrossCorrelograms(**compute_correlograms(...)).
+
+    Only the units in unit_ids (all units by default) or, if pairs is
+    given, the units of those pairs are included (to count only the
+    given pairs, use compute_pair_correlograms). With num_workers > 1 the
+    merged spike train is split into that many shards, which are counted
+    in a process pool.
+    """
+    bins = _CorrelogramBins(sampling_frequency=sampling_frequency, window_size_msec=window_size_msec, bin_size_msec=bin_size_msec)
+    unit_ids = _included_unit_ids(list(spike_trains.keys()), unit_ids=unit_ids, pairs=pairs)
+    num_units = len(unit_ids)
+    trains = [np.asarray(spike_trains[unit_id]).astype(np.int64, copy=False) for unit_id in unit_ids]
+    times = np.concatenate(trains) if num_units > 0 else np.zeros((0,), dtype=np.int64)
+    labels = np.concatenate([np.full(len(a), ii, dtype=np.int64) for ii, a in enumerate(trains)]) if num_units > 0 else np.zeros((0,), dtype=np.int64)
+    order = np.argsort(times, kind='stable')
+    times = times[order]
+    labels = labels[order]
+    # pair_counts[i1, i2, k] is the number of pairs of a spike of unit i1
+    # and a later spike of unit i2 with lag in bin k of the positive half
+    shards = _split_evenly(len(times), num_workers)
+    if num_workers > 1 and len(shards) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            futures = []
+            for start, end in shards:
+                # only the spikes of the shard and those within the window
+                # after it are sent to the worker
+                stop = int(np.searchsorted(times, times[end - 1] + bins.max_lag, side='right'))
+                futures.append(executor.submit(_count_pairs, times[start:stop], labels[start:stop], bins.lut, num_units, bins.num_bins_half, 0, end - start))
+            pair_counts = sum([f.result() for f in futures])
+    else:
+        pair_counts = sum([_count_pairs(times, labels, bins.lut, num_units, bins.num_bins_half, start, end) for start, end in shards])
+    half = bins.num_bins_half
+    bin_counts = np.zeros((num_units, num_units, bins.num_bins), dtype=np.int64)
+    # a spike of unit i2 after a spike of unit i1 is a positive lag of the
+    # cross correlogram of i1 and i2, and a negative lag of that of i2 and i1
+    bin_counts[:, :, half - 1:] += pair_counts
+    bin_counts[:, :, half - 1::-1] += pair_counts.transpose(1, 0, 2)
+    return {
+        'bin_edges_sec': bins.bin_edges_sec,
+        'unit_ids': unit_ids,
+        'bin_counts': bin_counts.astype(np.int32)
+    }
+
+def compute_pair_correlograms(
+    spike_trains: Dict[UnitId, np.ndarray],
+    pairs: Sequence[Tuple[UnitId, UnitId]],
+    *,
+    sampling_frequency: float,
+    window_size_msec: float,
+    bin_size_msec: float,
+    num_workers: int=1
+) -> Dict[str, Any]:
+    """
+    The correlograms of the given pairs of units only (for example the
+    most similar pairs, see top_similarity_pairs), each counted from the
+    spike trains of its two units
+
+    Returns {'bin_edges_sec': ..., 'bin_counts': ...} where bin_counts[p]
+    is the cross correlogram of pairs[p] (the autocorrelogram for a unit
+    paired with itself), as in compute_correlograms. With num_workers > 1
+    the pairs are split into that many shards, which are counted in a
+    process pool, each with the spike trains of its own units only.
+    """
+    bins = _CorrelogramBins(sampling_frequency=sampling_frequency, window_size_msec=window_size_msec, bin_size_msec=bin_size_msec)
+    pairs = [(unit_id1, unit_id2) for unit_id1, unit_id2 in pairs]
+    for u in set([u for p in pairs for u in p]):
+        if u not in spike_trains:
+            raise Exception(f'Unit not found: {u}')
+    if len(pairs) == 0:
+        return {'bin_edges_sec': bins.bin_edges_sec, 'bin_counts': np.zeros((0, bins.num_bins), dtype=np.int32)}
+    opts = {'sampling_frequency': sampling_frequency, 'window_size_msec': window_size_msec, 'bin_size_msec': bin_size_msec}
+    shards = _split_evenly(len(pairs), num_workers)
+    if num_workers > 1 and len(shards) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            futures = [
+                executor.submit(_count_pair_correlograms, pairs[start:end], _unit_spike_trains(spike_trains, pairs[start:end]), opts)
+                for start, end in shards
+            ]
+            parts = [f.result() for f in futures]
+    else:
+        parts = [_count_pair_correlograms(pairs, spike_trains, opts)]
+    return {
+        'bin_edges_sec': bins.bin_edges_sec,
+        'bin_counts': np.concatenate(parts)
+    }
+
+def autocorrelogram_items(
+    sorting: Any,
+    *,
+    window_size_msec: float=50,
+    bin_size_msec: float=1,
+    unit_ids: Union[Sequence[UnitId], None]=None
+):
+    """
+    An AutocorrelogramItem for each unit of a spikeinterface sorting
+    (segment 0)
+    """
+    from .views.Autocorrelograms import AutocorrelogramItem
+    if unit_ids is None:
+        unit_ids = list(sorting.get_unit_ids())
+    ret: List[AutocorrelogramItem] = []
+    for unit_id in unit_ids:
+        a = compute_correlogram(
+            sorting.get_unit_spike_train(unit_id=unit_id, segment_index=0),
+            sampling_frequency=sorting.get_sampling_frequency(),
+            window_size_msec=window_size_msec,
+            bin_size_msec=bin_size_msec
+        )
+        ret.append(AutocorrelogramItem(unit_id=unit_id, bin_edges_sec=a['bin_edges_sec'], bin_counts=a['bin_counts']))
+    return ret
+
+def cross_correlogram_items(
+    sorting: Any,
+    *,
+    window_size_msec: float=50,
+    bin_size_msec: float=1,
+    unit_ids: Union[Sequence[UnitId], None]=None,
+    pairs: Union[Sequence[Tuple[UnitId, UnitId]], None]=None,
+    num_workers: int=1
+):
+    """
+    A CrossCorrelogramItem for each (ordered) pair of units of a
+    spikeinterface sorting (segment 0), or for each of the given pairs
+    (see compute_correlograms)
+    """
+    from .views.CrossCorrelograms import CrossCorrelogramItem
+    if unit_ids is None:
+        unit_ids = list(sorting.get_unit_ids())
+    if pairs is not None:
+        unit_ids = _included_unit_ids(unit_ids, unit_ids=None, pairs=pairs)
+        p = compute_pair_correlograms(
+            {unit_id: sorting.get_unit_spike_train(unit_id=unit_id, segment_index=0) for unit_id in unit_ids},
+            pairs,
+            sampling_frequency=sorting.get_sampling_frequency(),
+            window_size_msec=window_size_msec,
+            bin_size_msec=bin_size_msec,
+            num_workers=num_workers
+        )
+        return [
+            CrossCorrelogramItem(unit_id1=unit_id1, unit_id2=unit_id2, bin_edges_sec=p['bin_edges_sec'], bin_counts=p['bin_counts'][ii])
+            for ii, (unit_id1, unit_id2) in enumerate(pairs)
+        ]
+    a = compute_correlograms(
+        {unit_id: sorting.get_unit_spike_train(unit_id=unit_id, segment_index=0) for unit_id in unit_ids},
+        sampling_frequency=sorting.get_sampling_frequency(),
+        window_size_msec=window_size_msec,
+        bin_size_msec=bin_size_msec,
+        num_workers=num_workers
+    )
+    return [
+        CrossCorrelogramItem(
+            unit_id1=unit_id1,
+            unit_id2=unit_id2,
+            bin_edges_sec=a['bin_edges_sec'],
+            bin_counts=a['bin_counts'][i1, i2]
+        )
+        for i1, unit_id1 in enumerate(a['unit_ids'])
+        for i2, unit_id2 in enumerate(a['unit_ids'])
+    ]
+
+def top_similarity_pairs(similarity_scores: Sequence[Any], k: int) -> List[Tuple[UnitId, UnitId]]:
+    """
+    The k pairs of distinct units with the highest similarity, from a list
+    of UnitSimilarityScore
+    """
+    scores = [s for s in similarity_scores if s.unit_id1 != s.unit_id2]
+    scores = sorted(scores, key=lambda s: -s.similarity)
+    return [(s.unit_id1, s.unit_id2) for s in scores[:k]]
+
+class _CorrelogramBins:
+    def __init__(self, *, sampling_frequency: float, window_size_msec: float, bin_size_msec: float) -> None:
+        num_bins = int(window_size_msec / bin_size_msec)
+        if num_bins % 2 == 0:
+            num_bins = num_bins - 1 # odd number of bins
+        if num_bins < 1:
+            raise Exception(f'Invalid correlogram window size and bin size: {window_size_msec}, {bin_size_msec}')
+        self.num_bins = num_bins
+        self.num_bins_half = (num_bins + 1) // 2
+        bin_edges_msec = np.array((np.arange(num_bins + 1) - num_bins / 2) * bin_size_msec, dtype=np.float32)
+        self.bin_edges_sec = (bin_edges_msec / 1000).astype(np.float32)
+        # the bin of the positive half of each lag in frames, using the
+        # same comparisons as the example helper: a lag is in bin k if it
+        # is in [edge k, edge k + 1) of the positive half
+        max_num_lags = int(np.ceil(float(bin_edges_msec[-1]) / 1000 * sampling_frequency)) + 2
+        lags_msec = np.arange(max_num_lags) / sampling_frequency * 1000
+        k = np.searchsorted(bin_edges_msec[self.num_bins_half:].astype(np.float64), lags_msec, side='right')
+        self.lut = k[k < self.num_bins_half].astype(np.int64)
+        self.max_lag = len(self.lut) - 1
+
+def _count_pairs(times: np.ndarray, labels: np.ndarray, lut: np.ndarray, num_units: int, num_bins_half: int, start: int, end: int) -> np.ndarray:
+    # the pair counts (see compute_correlograms) of the pairs whose first
+    # spike is in [start, end)
+    max_lag = len(lut) - 1
+    hi = np.searchsorted(times, times[start:end] + max_lag, side='right')
+    lo = np.arange(start + 1, end + 1)
+    ret = np.zeros((num_units * num_units * num_bins_half,), dtype=np.int64)
+    first_keys = labels * (num_units * num_bins_half)
+    second_keys = labels * num_bins_half
+    for (block_start, block_end), block_counts, j in _iter_window_pairs(lo, hi):
+        i1, i2 = start + block_start, start + block_end
+        keys = np.repeat(first_keys[i1:i2], block_counts) + second_keys[j] + lut[times[j] - np.repeat(times[i1:i2], block_counts)]
+        ret += np.bincount(keys, minlength=len(ret))
+    return ret.reshape((num_units, num_units, num_bins_half))
+
+def _count_pair_correlograms(pairs: List[Tuple[UnitId, UnitId]], spike_trains: Dict[UnitId, np.ndarray], opts: Dict[str, float]) -> np.ndarray:
+    sorted_trains = {u: _sorted_frames(spike_trains[u]) for u in set([u for p in pairs for u in p])}
+    return np.stack([
+        compute_correlogram(sorted_trains[unit_id1], sorted_trains[unit_id2] if unit_id2 != unit_id1 else None, **opts)['bin_counts']
+        for unit_id1, unit_id2 in pairs
+    ])
+
+def _unit_spike_trains(spike_trains: Dict[UnitId, np.ndarray], pairs: List[Tuple[UnitId, UnitId]]) -> Dict[UnitId, np.ndarray]:
+    return {u: spike_trains[u] for u in set([u for p in pairs for u in p])}
+
+def _iter_window_pairs(lo: np.ndarray, hi: np.ndarray):
+    # the pairs (i, j) with j in [lo[i], hi[i]), in blocks of bounded size:
+    # yields the range of i of the block, the number of pairs of each i
+    # and the j of every pair (for the values of i, repeat by the counts)
+    counts = np.maximum(hi - lo, 0)
+    cumulative = np.cumsum(counts)
+    start = 0
+    while start < len(counts):
+        base = cumulative[start - 1] if start > 0 else 0
+        # at least one spike per block
+        end = max(int(np.searchsorted(cumulative, base + _MAX_NUM_PAIRS_PER_BLOCK, side='right')), start + 1)
+        block_counts = counts[start:end]
+        num_pairs = int(block_counts.sum())
+        if num_pairs > 0:
+            # position of each pair within the window of its first spike
+            first = np.cumsum(block_counts) - block_counts
+            j = np.arange(num_pairs) - np.repeat(first - lo[start:end], block_counts)
+            yield (start, end), block_counts, j
+        start = end
+
+def _split_evenly(n: int, num_shards: int) -> List[Tuple[int, int]]:
+    num_shards = max(min(num_shards, n), 1)
+    edges = np.linspace(0, n, num_shards + 1).astype(int)
+    return [(int(edges[ii]), int(edges[ii + 1])) for ii in range(num_shards)]
+
+def _included_unit_ids(all_unit_ids: List[UnitId], *, unit_ids: Union[Sequence[UnitId], None], pairs: Union[Sequence[Tuple[UnitId, UnitId]], None]) -> List[UnitId]:
+    if pairs is not None:
+        in_pairs = set([u for p in pairs for u in p])
+        for u in in_pairs:
+            if u not in all_unit_ids:
+                raise Exception(f'Unit not found: {u}')
+        return [u for u in all_unit_ids if u in in_pairs]
+    if unit_ids is not None:
+        for u in unit_ids:
+            if u not in all_unit_ids:
+                raise Exception(f'Unit not found: {u}')
+        return list(unit_ids)
+    return all_unit_ids
+
+def _sorted_frames(times: np.ndarray) -> np.ndarray:
+    a = np.asarray(times).astype(np.int64, copy=False)
+    if len(a) > 1 and np.any(np.diff(a) < 0):
+        a = np.sort(a)
+    return a
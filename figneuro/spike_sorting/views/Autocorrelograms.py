@@ -1,6 +1,7 @@
 import numpy as np
 from typing import List, Union
 from .View import View
+from .correlogram_arrays import compact_bin_counts, ordered_unique, shared_bin_edges
 
 
 class AutocorrelogramItem:
@@ -25,14 +26,51 @@ class AutocorrelogramItem:
 class Autocorrelograms(View):
     """
     Autocorrelograms view
+
+    Either a list of AutocorrelogramItem, or the dense form: bin_edges_sec
+    shared by all the autocorrelograms, unit_ids and bin_counts of shape
+    (len(unit_ids), num_bins). With dense=True, item lists that share
+    their bin edges are also sent in the dense form. The dense form is
+    only rendered by the figneuro-views app.
     """
     def __init__(self,
-        autocorrelograms: List[AutocorrelogramItem],
+        autocorrelograms: Union[List[AutocorrelogramItem], None]=None,
+        *,
+        bin_edges_sec: Union[np.ndarray, List[float], None]=None,
+        unit_ids: Union[List[Union[int, str]], None]=None,
+        bin_counts: Union[np.ndarray, None]=None,
+        dense: bool=False,
         **kwargs
     ) -> None:
         super().__init__('Autocorrelograms', **kwargs)
         self._autocorrelograms = autocorrelograms
+        self._dense: Union[dict, None] = None
+        if autocorrelograms is not None:
+            if bin_counts is not None:
+                raise Exception('Specify either autocorrelograms or bin_counts, not both')
+            if dense:
+                self._dense = _dense_from_items(autocorrelograms)
+        else:
+            if bin_edges_sec is None or unit_ids is None or bin_counts is None:
+                raise Exception('bin_edges_sec, unit_ids and bin_counts are required when autocorrelograms is not given')
+            bin_counts = np.asarray(bin_counts)
+            if bin_counts.shape != (len(unit_ids), len(bin_edges_sec) - 1):
+                raise Exception(f'Unexpected shape of bin_counts: {bin_counts.shape}')
+            self._dense = {
+                'bin_edges_sec': np.asarray(bin_edges_sec, dtype=np.float32),
+                'unit_ids': list(unit_ids),
+                'bin_counts': bin_counts
+            }
+        if self._dense is not None:
+            self.type = 'figneuro.DenseAutocorrelograms'
     def to_dict(self) -> dict:
+        if self._dense is not None:
+            return {
+                'type': self.type,
+                'binEdgesSec': self._dense['bin_edges_sec'],
+                'unitIds': self._dense['unit_ids'],
+                'binCounts': compact_bin_counts(self._dense['bin_counts'])
+            }
         ret = {
             'type': self.type,
             'autocorrelograms': [a.to_dict() for a in self._autocorrelograms]
@@ -40,3 +78,17 @@ class Autocorrelograms(View):
         return ret
     def child_views(self) -> List[View]:
         return []
+
+def _dense_from_items(items: List[AutocorrelogramItem]) -> Union[dict, None]:
+    # None if the items are better sent as they are
+    bin_edges_sec = shared_bin_edges(items)
+    if bin_edges_sec is None:
+        return None
+    unit_ids, _ = ordered_unique([a.unit_id for a in items])
+    if len(unit_ids) < len(items):
+        return None
+    return {
+        'bin_edges_sec': bin_edges_sec,
+        'unit_ids': unit_ids,
+        'bin_counts': np.stack([np.asarray(a.bin_counts) for a in items])
+    }
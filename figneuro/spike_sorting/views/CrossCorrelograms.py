@@ -1,6 +1,7 @@
 import numpy as np
 from typing import List, Union
 from .View import View
+from .correlogram_arrays import compact_bin_counts, ordered_unique, shared_bin_edges
 
 
 class CrossCorrelogramItem:
@@ -28,17 +29,68 @@ class CrossCorrelogramItem:
 class CrossCorrelograms(View):
     """
     Cross correlograms view
+
+    Either a list of CrossCorrelogramItem, or the dense form: bin_edges_sec
+    shared by all the correlograms, unit_ids (and unit_ids2 for the second
+    unit, if not the same) and bin_counts of shape
+    (len(unit_ids), len(unit_ids2), num_bins), for example the output of
+    figneuro.spike_sorting.correlograms.compute_correlograms. With
+    dense=True, item lists that share their bin edges and fill at least
+    half of the grid of unit pairs are also sent in the dense form. The
+    dense form is only rendered by the figneuro-views app.
     """
     def __init__(self,
-        cross_correlograms: List[CrossCorrelogramItem],
+        cross_correlograms: Union[List[CrossCorrelogramItem], None]=None,
         *,
+        bin_edges_sec: Union[np.ndarray, List[float], None]=None,
+        unit_ids: Union[List[Union[int, str]], None]=None,
+        unit_ids2: Union[List[Union[int, str]], None]=None,
+        bin_counts: Union[np.ndarray, None]=None,
         hide_unit_selector: bool=False,
+        dense: bool=False,
         **kwargs
     ) -> None:
         super().__init__('CrossCorrelograms', **kwargs)
         self._cross_correlograms = cross_correlograms
         self._hide_unit_selector = hide_unit_selector
+        self._dense: Union[dict, None] = None
+        if cross_correlograms is not None:
+            if bin_counts is not None:
+                raise Exception('Specify either cross_correlograms or bin_counts, not both')
+            if dense:
+                self._dense = _dense_from_items(cross_correlograms)
+        else:
+            if bin_edges_sec is None or unit_ids is None or bin_counts is None:
+                raise Exception('bin_edges_sec, unit_ids and bin_counts are required when cross_correlograms is not given')
+            if unit_ids2 is None:
+                unit_ids2 = unit_ids
+            bin_counts = np.asarray(bin_counts)
+            if bin_counts.shape != (len(unit_ids), len(unit_ids2), len(bin_edges_sec) - 1):
+                raise Exception(f'Unexpected shape of bin_counts: {bin_counts.shape}')
+            self._dense = {
+                'bin_edges_sec': np.asarray(bin_edges_sec, dtype=np.float32),
+                'unit_ids': list(unit_ids),
+                'unit_ids2': list(unit_ids2),
+                'bin_counts': bin_counts,
+                'pair_mask': None
+            }
+        if self._dense is not None:
+            self.type = 'figneuro.DenseCrossCorrelograms'
     def to_dict(self) -> dict:
+        if self._dense is not None:
+            d = self._dense
+            ret = {
+                'type': self.type,
+                'binEdgesSec': d['bin_edges_sec'],
+                'unitIds': d['unit_ids'],
+                'binCounts': compact_bin_counts(d['bin_counts']),
+                'hideUnitSelector': self._hide_unit_selector
+            }
+            if d['unit_ids2'] != d['unit_ids']:
+                ret['unitIds2'] = d['unit_ids2']
+            if d['pair_mask'] is not None:
+                ret['pairMask'] = d['pair_mask']
+            return ret
         ret = {
             'type': self.type,
             'crossCorrelograms': [a.to_dict() for a in self._cross_correlograms],
@@ -47,3 +99,28 @@ class CrossCorrelograms(View):
         return ret
     def child_views(self) -> List[View]:
         return []
+
+def _dense_from_items(items: List[CrossCorrelogramItem]) -> Union[dict, None]:
+    # None if the items are better sent as they are
+    bin_edges_sec = shared_bin_edges(items)
+    if bin_edges_sec is None:
+        return None
+    unit_ids, index1 = ordered_unique([a.unit_id1 for a in items])
+    unit_ids2, index2 = ordered_unique([a.unit_id2 for a in items])
+    pair_mask = np.zeros((len(unit_ids), len(unit_ids2)), dtype=np.uint8)
+    i1 = np.array([index1[a.unit_id1] for a in items])
+    i2 = np.array([index2[a.unit_id2] for a in items])
+    pair_mask[i1, i2] = 1
+    num_pairs = int(np.count_nonzero(pair_mask))
+    if num_pairs < len(items) or num_pairs * 2 < pair_mask.size:
+        # repeated pairs, or mostly empty
+        return None
+    bin_counts = np.zeros((len(unit_ids), len(unit_ids2), len(bin_edges_sec) - 1))
+    bin_counts[i1, i2] = np.stack([np.asarray(a.bin_counts) for a in items])
+    return {
+        'bin_edges_sec': bin_edges_sec,
+        'unit_ids': unit_ids,
+        'unit_ids2': unit_ids2,
+        'bin_counts': bin_counts,
+        'pair_mask': pair_mask if num_pairs < pair_mask.size else None
+    }
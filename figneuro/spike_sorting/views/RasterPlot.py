@@ -1,18 +1,30 @@
 import numpy as np
 from typing import List, Union
 from .View import View
+from .SpikeTrains import SpikeTrains, check_spike_times, frames_as_uint32, spike_trains_from_items, spike_trains_view_dict
+from .spike_density import spike_count_pyramid
+from ...views.ChunkedArray import ChunkedArray
 
 
 class RasterPlotItem:
     """
     Spike train for a single unit in a raster plot
+
+    For long recordings pass ChunkedArray(spike_times_sec) so that the
+    spike times are loaded in chunks. Alternatively give spike_frames
+    (integer sample indices), along with the sampling_frequency of the
+    RasterPlot, for exact spike times.
     """
     def __init__(self,
         unit_id: Union[int, str],
-        spike_times_sec: np.array
+        spike_times_sec: Union[np.array, ChunkedArray, None]=None,
+        *,
+        spike_frames: Union[np.ndarray, None]=None
     ) -> None:
+        check_spike_times(spike_times_sec, spike_frames)
         self.unit_id = unit_id
         self.spike_times_sec = spike_times_sec
+        self.spike_frames = spike_frames
     def to_dict(self):
         ret = {
             'unitId': self.unit_id,
@@ -23,20 +35,48 @@ class RasterPlotItem:
 class RasterPlot(View):
     """
     Raster plot view
+
+    plots is a list of RasterPlotItem or a SpikeTrains
+
+    For long recordings use density_pyramid=True. Spike counts of each
+    unit are then precomputed at several time resolutions (see
+    spike_density.py) and the spikes of all units are sent as chunks in
+    time order. The figneuro-views app shows the counts when zoomed out
+    and loads the spikes of the visible time range when zoomed in, so the
+    first view loads quickly whatever the length of the recording.
     """
     def __init__(self, *,
         start_time_sec: float,
         end_time_sec: float,
-        plots: List[RasterPlotItem],
+        plots: Union[List[RasterPlotItem], SpikeTrains],
         hide_toolbar: bool=False,
+        density_pyramid: bool=False,
+        sampling_frequency: Union[float, None]=None,
         **kwargs
     ) -> None:
         super().__init__('RasterPlot', **kwargs)
+        if not isinstance(plots, SpikeTrains):
+            converted = spike_trains_from_items(plots, sampling_frequency=sampling_frequency)
+            if converted is not None:
+                plots = converted[0]
         self._start_time_sec = start_time_sec
         self._end_time_sec = end_time_sec
         self._plots = plots
         self._hide_toolbar = hide_toolbar
+        self._density_pyramid = density_pyramid
+        if density_pyramid:
+            self.type = 'figneuro.MultiscaleRasterPlot'
+        elif isinstance(plots, SpikeTrains):
+            self.type = 'figneuro.SpikeTrainsView'
     def to_dict(self) -> dict:
+        if self._density_pyramid:
+            return self._create_multiscale_data()
+        if isinstance(self._plots, SpikeTrains):
+            return spike_trains_view_dict('RasterPlot', self._plots, items_key='plots', data={
+                'startTimeSec': self._start_time_sec,
+                'endTimeSec': self._end_time_sec,
+                'hideToolbar': self._hide_toolbar
+            })
         ret = {
             'type': self.type,
             'startTimeSec': self._start_time_sec,
@@ -47,3 +87,56 @@ class RasterPlot(View):
         return ret
     def child_views(self) -> List[View]:
         return []
+    def _create_multiscale_data(self) -> dict:
+        unit_ids, spike_times_sec, unit_indices, order = _merged_spike_times(self._plots)
+        levels = spike_count_pyramid(
+            spike_times_sec,
+            unit_indices,
+            num_units=len(unit_ids),
+            start_time_sec=self._start_time_sec,
+            end_time_sec=self._end_time_sec
+        )
+        if isinstance(self._plots, SpikeTrains):
+            # integer frames, which the viewer converts to seconds
+            frames, frame_offset = frames_as_uint32(self._plots.spike_frames[order])
+            ct = ChunkedArray(frames, times=spike_times_sec)
+            spikes = {'spikeFrames': ct, 'samplingFrequency': self._plots.sampling_frequency}
+            if frame_offset != 0:
+                spikes['frameOffset'] = frame_offset
+        else:
+            ct = ChunkedArray(spike_times_sec)
+            spikes = {'spikeTimesSec': ct}
+        return {
+            'type': self.type,
+            'startTimeSec': self._start_time_sec,
+            'endTimeSec': self._end_time_sec,
+            'unitIds': unit_ids,
+            'numSpikes': len(spike_times_sec),
+            **spikes,
+            'spikeUnitIndices': ChunkedArray(unit_indices, times=spike_times_sec, chunk_size=ct.chunk_size),
+            'levels': [
+                {
+                    'binSizeSec': bin_size_sec,
+                    # chunked along time, with the start time of each bin
+                    'counts': ChunkedArray(counts, axis=1, times=self._start_time_sec + np.arange(counts.shape[1]) * bin_size_sec)
+                }
+                for bin_size_sec, counts in levels
+            ],
+            'hideToolbar': self._hide_toolbar
+        }
+
+def _merged_spike_times(plots: Union[List[RasterPlotItem], SpikeTrains]):
+    # the spikes of all the units in time order, with the unit index of
+    # each and the order relative to plots
+    if isinstance(plots, SpikeTrains):
+        unit_ids = plots.unit_ids
+        spike_times_sec = plots.spike_frames / plots.sampling_frequency
+        unit_indices = np.repeat(np.arange(plots.num_units), np.diff(plots.unit_offsets))
+    else:
+        unit_ids = [a.unit_id for a in plots]
+        trains = [np.asarray(a.spike_times_sec.data if isinstance(a.spike_times_sec, ChunkedArray) else a.spike_times_sec) for a in plots]
+        spike_times_sec = np.concatenate([t.astype(np.float64) for t in trains]) if len(trains) > 0 else np.zeros((0,))
+        unit_indices = np.repeat(np.arange(len(trains)), [len(t) for t in trains])
+    order = np.argsort(spike_times_sec, kind='stable')
+    index_dtype = np.uint16 if len(unit_ids) <= np.iinfo(np.uint16).max + 1 else np.uint32
+    return unit_ids, spike_times_sec[order], unit_indices[order].astype(index_dtype), order
@@ -1,20 +1,31 @@
 import numpy as np
 from typing import List, Union
 from .View import View
+from .SpikeTrains import SpikeTrains, check_spike_times, spike_trains_from_items, spike_trains_view_dict
+from .SpikeSubsampling import SpikeSubsampling, subsample_items, subsample_spike_trains, subsampled_view_dict
 
 
 class SpikeAmplitudesItem:
     """
     Spike amplitudes for a single unit
+
+    The spike times are spike_times_sec, or spike_frames (integer sample
+    indices) along with the sampling_frequency of the SpikeAmplitudes view.
     """
     def __init__(self,
         unit_id: Union[int, str],
-        spike_times_sec: np.array,
-        spike_amplitudes: np.array
+        spike_times_sec: Union[np.array, None]=None,
+        spike_amplitudes: Union[np.array, None]=None,
+        *,
+        spike_frames: Union[np.ndarray, None]=None
     ) -> None:
+        check_spike_times(spike_times_sec, spike_frames)
+        if spike_amplitudes is None:
+            raise Exception('spike_amplitudes is required')
         self.unit_id = unit_id
         self.spike_times_sec = spike_times_sec
         self.spike_amplitudes = spike_amplitudes
+        self.spike_frames = spike_frames
     def to_dict(self):
         ret = {
             'unitId': self.unit_id,
@@ -26,27 +37,65 @@ class SpikeAmplitudesItem:
 class SpikeAmplitudes(View):
     """
     Spike amplitudes view
+
+    plots is a list of SpikeAmplitudesItem, or a SpikeTrains together
+    with spike_amplitudes in the order of its spike_frames. With
+    subsampling, only some of the spikes of each unit are shown (see
+    SpikeSubsampling).
     """
     def __init__(self, *,
         start_time_sec: float,
         end_time_sec: float,
-        plots: List[SpikeAmplitudesItem],
+        plots: Union[List[SpikeAmplitudesItem], SpikeTrains],
+        spike_amplitudes: Union[np.ndarray, None]=None,
         hide_unit_selector: bool=False,
+        subsampling: Union[SpikeSubsampling, None]=None,
+        sampling_frequency: Union[float, None]=None,
         **kwargs
     ) -> None:
         super().__init__('SpikeAmplitudes', **kwargs)
+        if not isinstance(plots, SpikeTrains):
+            converted = spike_trains_from_items(plots, sampling_frequency=sampling_frequency, value_attrs={'spikeAmplitudes': 'spike_amplitudes'})
+            if converted is not None:
+                plots, spike_data = converted
+                spike_amplitudes = spike_data['spikeAmplitudes']
         self._start_time_sec = start_time_sec
         self._end_time_sec = end_time_sec
         self._plots = plots
+        self._spike_amplitudes = spike_amplitudes
         self._hide_unit_selector = hide_unit_selector
+        self._subsampling = subsampling
+        if isinstance(plots, SpikeTrains):
+            if spike_amplitudes is None:
+                raise Exception('spike_amplitudes is required when plots is a SpikeTrains')
+            self.type = 'figneuro.SpikeTrainsView'
+        if subsampling is not None:
+            self.type = 'figneuro.SubsampledView'
     def to_dict(self) -> dict:
+        if self._subsampling is None:
+            return self._view_dict(self._plots, self._spike_amplitudes)
+        opts = dict(subsampling=self._subsampling, start_time_sec=self._start_time_sec, end_time_sec=self._end_time_sec)
+        if isinstance(self._plots, SpikeTrains):
+            plots, spike_data, record = subsample_spike_trains(self._plots, {'spikeAmplitudes': self._spike_amplitudes}, **opts)
+            view_data = self._view_dict(plots, spike_data['spikeAmplitudes'])
+        else:
+            items, record = subsample_items(self._plots, value_attrs=['spike_amplitudes'], **opts)
+            view_data = self._view_dict(items, None)
+        return subsampled_view_dict(view_data, record)
+    def child_views(self) -> List[View]:
+        return []
+    def _view_dict(self, plots: Union[List[SpikeAmplitudesItem], SpikeTrains], spike_amplitudes: Union[np.ndarray, None]) -> dict:
+        if isinstance(plots, SpikeTrains):
+            return spike_trains_view_dict('SpikeAmplitudes', plots, items_key='units', data={
+                'startTimeSec': self._start_time_sec,
+                'endTimeSec': self._end_time_sec,
+                'hideUnitSelector': self._hide_unit_selector
+            }, spike_data={'spikeAmplitudes': spike_amplitudes})
         ret = {
-            'type': self.type,
+            'type': 'SpikeAmplitudes',
             'startTimeSec': self._start_time_sec,
             'endTimeSec': self._end_time_sec,
-            'units': [a.to_dict() for a in self._plots],
+            'units': [a.to_dict() for a in plots],
             'hideUnitSelector': self._hide_unit_selector
         }
         return ret
-    def child_views(self) -> List[View]:
-        return []
@@ -1,22 +1,33 @@
 from typing import Any, Dict, List, Tuple, Union
 import numpy as np
 from .View import View
+from .SpikeTrains import SpikeTrains, check_spike_times, spike_trains_from_items, spike_trains_view_dict
+from .SpikeSubsampling import SpikeSubsampling, subsample_items, subsample_spike_trains, subsampled_view_dict
 
 
 class SpikeLocationsItem:
     """
     Single unit spike locations
+
+    The spike times are spike_times_sec, or spike_frames (integer sample
+    indices) along with the sampling_frequency of the SpikeLocations view.
     """
     def __init__(self,
         unit_id: Union[int, str],
-        spike_times_sec: np.array,
-        x_locations: np.array,
-        y_locations: np.array
+        spike_times_sec: Union[np.array, None]=None,
+        x_locations: Union[np.array, None]=None,
+        y_locations: Union[np.array, None]=None,
+        *,
+        spike_frames: Union[np.ndarray, None]=None
     ) -> None:
+        check_spike_times(spike_times_sec, spike_frames)
+        if x_locations is None or y_locations is None:
+            raise Exception('x_locations and y_locations are required')
         self.unit_id = unit_id
         self.spike_times_sec = spike_times_sec
         self.x_locations = x_locations
         self.y_locations = y_locations
+        self.spike_frames = spike_frames
     def to_dict(self):
         ret = {
             'unitId': self.unit_id,
@@ -29,27 +40,72 @@ class SpikeLocationsItem:
 class SpikeLocations(View):
     """
     Spike locations view
+
+    units is a list of SpikeLocationsItem, or a SpikeTrains together with
+    x_locations and y_locations in the order of its spike_frames. With
+    subsampling, only some of the spikes of each unit are shown (see
+    SpikeSubsampling).
     """
     def __init__(self,
-        units: List[SpikeLocationsItem], *,
+        units: Union[List[SpikeLocationsItem], SpikeTrains], *,
         x_range: Tuple[float, float],
         y_range: Tuple[float, float],
         hide_unit_selector: bool,
         channel_locations: Dict[str, Any],
         disable_auto_rotate: bool=False,
+        x_locations: Union[np.ndarray, None]=None,
+        y_locations: Union[np.ndarray, None]=None,
+        subsampling: Union[SpikeSubsampling, None]=None,
+        sampling_frequency: Union[float, None]=None,
         **kwargs
     ) -> None:
         super().__init__('SpikeLocations', **kwargs)
+        if not isinstance(units, SpikeTrains):
+            converted = spike_trains_from_items(units, sampling_frequency=sampling_frequency, value_attrs={'xLocations': 'x_locations', 'yLocations': 'y_locations'})
+            if converted is not None:
+                units, spike_data = converted
+                x_locations = spike_data['xLocations']
+                y_locations = spike_data['yLocations']
         self._units = units
         self._x_range = x_range
         self._y_range = y_range
         self._hide_unit_selector = hide_unit_selector
         self._channel_locations = channel_locations
         self._disable_auto_rotate = disable_auto_rotate
+        self._x_locations = x_locations
+        self._y_locations = y_locations
+        self._subsampling = subsampling
+        if isinstance(units, SpikeTrains):
+            if x_locations is None or y_locations is None:
+                raise Exception('x_locations and y_locations are required when units is a SpikeTrains')
+            self.type = 'figneuro.SpikeTrainsView'
+        if subsampling is not None:
+            self.type = 'figneuro.SubsampledView'
     def to_dict(self) -> dict:
+        if self._subsampling is None:
+            return self._view_dict(self._units, {'xLocations': self._x_locations, 'yLocations': self._y_locations})
+        # the time range is that of the spikes
+        if isinstance(self._units, SpikeTrains):
+            units, spike_data, record = subsample_spike_trains(self._units, {'xLocations': self._x_locations, 'yLocations': self._y_locations}, subsampling=self._subsampling)
+            view_data = self._view_dict(units, spike_data)
+        else:
+            items, record = subsample_items(self._units, value_attrs=['x_locations', 'y_locations'], subsampling=self._subsampling)
+            view_data = self._view_dict(items, {})
+        return subsampled_view_dict(view_data, record)
+    def child_views(self) -> List[View]:
+        return []
+    def _view_dict(self, units: Union[List[SpikeLocationsItem], SpikeTrains], spike_data: Dict[str, Any]) -> dict:
+        if isinstance(units, SpikeTrains):
+            return spike_trains_view_dict('SpikeLocations', units, items_key='units', data={
+                'xRange': [self._x_range[0], self._x_range[1]],
+                'yRange': [self._y_range[0], self._y_range[1]],
+                'hideUnitSelector': self._hide_unit_selector,
+                'channelLocations': self._channel_locations,
+                'disableAutoRotate': self._disable_auto_rotate
+            }, spike_data=spike_data)
         ret = {
-            'type': self.type,
-            'units': [a.to_dict() for a in self._units],
+            'type': 'SpikeLocations',
+            'units': [a.to_dict() for a in units],
             'xRange': [self._x_range[0], self._x_range[1]],
             'yRange': [self._y_range[0], self._y_range[1]],
             'hideUnitSelector': self._hide_unit_selector,
@@ -57,5 +113,3 @@ class SpikeLocations(View):
             'disableAutoRotate': self._disable_auto_rotate
         }
         return ret
-    def child_views(self) -> List[View]:
-        return []
@@ -0,0 +1,164 @@
+import copy
+from typing import Any, Dict, List, Tuple, Union
+import numpy as np
+from .SpikeTrains import SpikeTrains
+
+
+class SpikeSubsampling:
+    """
+    Subsampling of the spikes of the SpikeAmplitudes and SpikeLocations
+    views
+
+    The time range is divided into num_time_bins bins, and at most
+    max_spikes_per_bin spikes of each unit are kept in each bin, chosen at
+    random (with the given seed, so the same data give the same figure).
+    The spikes with the minimum and the maximum value (amplitude, or x and
+    y location) of each unit in each bin are always kept, so outliers
+    remain visible. The fraction of the spikes of each unit that are shown
+    is recorded in the view data.
+    """
+    def __init__(self, *,
+        max_spikes_per_bin: int=50,
+        num_time_bins: int=200,
+        seed: int=0
+    ) -> None:
+        if max_spikes_per_bin < 1 or num_time_bins < 1:
+            raise Exception(f'Invalid subsampling: {max_spikes_per_bin} spikes per bin, {num_time_bins} bins')
+        self.max_spikes_per_bin = max_spikes_per_bin
+        self.num_time_bins = num_time_bins
+        self.seed = seed
+    def select(self,
+        spike_times_sec: np.ndarray,
+        unit_indices: np.ndarray,
+        values: List[np.ndarray],
+        *,
+        start_time_sec: float,
+        end_time_sec: float
+    ) -> np.ndarray:
+        """
+        The indices (in increasing order) of the spikes that are kept, for
+        the spikes of all the units at once
+        """
+        n = len(spike_times_sec)
+        if n == 0:
+            return np.zeros((0,), dtype=np.int64)
+        num_bins = self.num_time_bins
+        duration = end_time_sec - start_time_sec
+        if duration > 0:
+            bins = np.clip(np.floor((spike_times_sec - start_time_sec) * (num_bins / duration)), 0, num_bins - 1).astype(np.int64)
+        else:
+            bins = np.zeros(n, dtype=np.int64)
+        groups = unit_indices.astype(np.int64) * num_bins + bins
+        # one sort puts the groups (unit and bin) together, each in random
+        # order
+        rng = np.random.default_rng(self.seed)
+        order = np.argsort(groups + rng.random(n), kind='stable')
+        g = groups[order]
+        is_start = np.empty(n, dtype=bool)
+        is_start[0] = True
+        is_start[1:] = g[1:] != g[:-1]
+        starts = np.flatnonzero(is_start)
+        group_pos = np.cumsum(is_start) - 1
+        keep = np.arange(n) - starts[group_pos] < self.max_spikes_per_bin
+        for v in values:
+            vs = np.asarray(v)[order]
+            for reduce in [np.fmin, np.fmax]:
+                extreme = reduce.reduceat(vs, starts)
+                pos = np.flatnonzero(vs == extreme[group_pos])
+                # the first one, if the extreme value occurs more than once
+                first = np.ones(len(pos), dtype=bool)
+                first[1:] = group_pos[pos[1:]] != group_pos[pos[:-1]]
+                keep[pos[first]] = True
+        return np.sort(order[keep])
+
+def subsample_items(
+    items: List[Any],
+    *,
+    value_attrs: List[str],
+    subsampling: SpikeSubsampling,
+    start_time_sec: Union[float, None]=None,
+    end_time_sec: Union[float, None]=None
+) -> Tuple[List[Any], Dict[str, Any]]:
+    """
+    Copies of the view items (one per unit, with spike_times_sec and the
+    per-spike arrays of value_attrs) with only the kept spikes, and the
+    subsampling record (see subsampled_view_dict)
+    """
+    trains = [np.asarray(a.spike_times_sec) for a in items]
+    num_spikes = np.array([len(t) for t in trains], dtype=np.int64)
+    spike_times_sec = np.concatenate(trains) if len(trains) > 0 else np.zeros((0,))
+    unit_indices = np.repeat(np.arange(len(items)), num_spikes)
+    values = [np.concatenate([np.asarray(getattr(a, attr)) for a in items]) for attr in value_attrs] if len(items) > 0 else []
+    start_time_sec, end_time_sec = _time_range(spike_times_sec, start_time_sec, end_time_sec)
+    kept = subsampling.select(spike_times_sec, unit_indices, values, start_time_sec=start_time_sec, end_time_sec=end_time_sec)
+    num_kept = np.bincount(unit_indices[kept], minlength=len(items))
+    # kept is in increasing order, so it splits into the units in order
+    offsets = np.concatenate([[0], np.cumsum(num_kept)])
+    all_offsets = np.concatenate([[0], np.cumsum(num_spikes)])
+    ret = []
+    for i, a in enumerate(items):
+        inds = kept[offsets[i]:offsets[i + 1]] - all_offsets[i]
+        b = copy.copy(a)
+        b.spike_times_sec = trains[i][inds]
+        for attr in value_attrs:
+            setattr(b, attr, np.asarray(getattr(a, attr))[inds])
+        ret.append(b)
+    return ret, _subsampling_record([a.unit_id for a in items], num_spikes, num_kept, subsampling)
+
+def subsample_spike_trains(
+    spike_trains: SpikeTrains,
+    spike_data: Dict[str, np.ndarray],
+    *,
+    subsampling: SpikeSubsampling,
+    start_time_sec: Union[float, None]=None,
+    end_time_sec: Union[float, None]=None
+) -> Tuple[SpikeTrains, Dict[str, np.ndarray], Dict[str, Any]]:
+    """
+    The kept spikes of a SpikeTrains and its per-spike arrays, and the
+    subsampling record (see subsampled_view_dict)
+    """
+    spike_times_sec = spike_trains.spike_frames / spike_trains.sampling_frequency
+    num_spikes = np.diff(spike_trains.unit_offsets)
+    unit_indices = np.repeat(np.arange(spike_trains.num_units), num_spikes)
+    start_time_sec, end_time_sec = _time_range(spike_times_sec, start_time_sec, end_time_sec)
+    kept = subsampling.select(spike_times_sec, unit_indices, list(spike_data.values()), start_time_sec=start_time_sec, end_time_sec=end_time_sec)
+    num_kept = np.bincount(unit_indices[kept], minlength=spike_trains.num_units)
+    unit_offsets = np.zeros(spike_trains.num_units + 1, dtype=np.int64)
+    np.cumsum(num_kept, out=unit_offsets[1:])
+    st = SpikeTrains(
+        unit_ids=spike_trains.unit_ids,
+        spike_frames=spike_trains.spike_frames[kept],
+        unit_offsets=unit_offsets,
+        sampling_frequency=spike_trains.sampling_frequency
+    )
+    return st, {k: np.asarray(v)[kept] for k, v in spike_data.items()}, _subsampling_record(spike_trains.unit_ids, num_spikes, num_kept, subsampling)
+
+def subsampled_view_dict(view_data: dict, record: Dict[str, Any]) -> dict:
+    """
+    The data of a view whose spikes were subsampled: the view data along
+    with the number of spikes and the fraction shown for each unit
+    """
+    return {
+        'type': 'figneuro.SubsampledView',
+        'subsampling': record,
+        'view': view_data
+    }
+
+def _subsampling_record(unit_ids: List[Union[int, str]], num_spikes: np.ndarray, num_kept: np.ndarray, subsampling: SpikeSubsampling) -> Dict[str, Any]:
+    return {
+        'unitIds': list(unit_ids),
+        'numSpikes': num_spikes.astype(np.uint32),
+        'ratios': (num_kept / np.maximum(num_spikes, 1)).astype(np.float32),
+        'numShownSpikes': int(num_kept.sum()),
+        'totalNumSpikes': int(num_spikes.sum()),
+        'maxSpikesPerBin': subsampling.max_spikes_per_bin,
+        'numTimeBins': subsampling.num_time_bins,
+        'seed': subsampling.seed
+    }
+
+def _time_range(spike_times_sec: np.ndarray, start_time_sec: Union[float, None], end_time_sec: Union[float, None]) -> Tuple[float, float]:
+    if start_time_sec is None:
+        start_time_sec = float(spike_times_sec.min()) if len(spike_times_sec) > 0 else 0
+    if end_time_sec is None:
+        end_time_sec = float(spike_times_sec.max()) if len(spike_times_sec) > 0 else 0
+    return start_time_sec, end_time_sec
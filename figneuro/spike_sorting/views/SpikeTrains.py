@@ -0,0 +1,230 @@
+from typing import Any, Dict, List, Tuple, Union
+import numpy as np
+
+
+class SpikeTrains:
+    """
+    The spike trains of all the units of a sorting in one array
+
+    spike_frames holds the spikes of unit_ids[0], then those of
+    unit_ids[1], and so on, each in time order, and the spikes of
+    unit_ids[i] are spike_frames[unit_offsets[i]:unit_offsets[i + 1]]
+    (CSR layout). It can be used in place of the list of items of the
+    RasterPlot, SpikeAmplitudes, SpikeLocations and FiringRatesPlot views,
+    and is sent as two arrays rather than one item per unit.
+
+    Build it with from_sorting, from_times_labels or
+    from_unit_spike_frames. Per-spike values for the views (amplitudes,
+    locations) are in the order of spike_frames; sort_index (if not None)
+    gives the position in the source of each spike, so values in the
+    source order can be reordered with values[spike_trains.sort_index].
+
+    The frames are sent as integers (uint32, relative to an offset if
+    needed) and converted to seconds in the viewer, so spike times are
+    exact however long the recording.
+    """
+    def __init__(self, *,
+        unit_ids: List[Union[int, str]],
+        spike_frames: np.ndarray,
+        unit_offsets: np.ndarray,
+        sampling_frequency: float,
+        sort_index: Union[np.ndarray, None]=None
+    ) -> None:
+        if len(unit_offsets) != len(unit_ids) + 1:
+            raise Exception(f'Expected {len(unit_ids) + 1} unit offsets, got {len(unit_offsets)}')
+        if unit_offsets[0] != 0 or unit_offsets[-1] != len(spike_frames) or np.any(np.diff(unit_offsets) < 0):
+            raise Exception('Invalid unit offsets')
+        self.unit_ids = list(unit_ids)
+        self.spike_frames = np.asarray(spike_frames)
+        self.unit_offsets = np.asarray(unit_offsets)
+        self.sampling_frequency = float(sampling_frequency)
+        self.sort_index = sort_index
+    @staticmethod
+    def from_times_labels(
+        times: np.ndarray,
+        labels: np.ndarray,
+        *,
+        sampling_frequency: float,
+        unit_ids: Union[List[Union[int, str]], None]=None
+    ) -> 'SpikeTrains':
+        """
+        From the frames and the unit IDs of all the spikes, in any order
+
+        unit_ids defaults to the distinct labels in sorted order. Spikes
+        whose label is not in unit_ids are left out.
+        """
+        times = np.asarray(times)
+        labels = np.asarray(labels)
+        if len(times) != len(labels):
+            raise Exception(f'Different numbers of times and labels: {len(times)} {len(labels)}')
+        if unit_ids is None:
+            unit_ids_array, unit_indices = np.unique(labels, return_inverse=True)
+            unit_ids = unit_ids_array.tolist()
+            keep = None
+        else:
+            unit_ids_array = np.asarray(unit_ids)
+            order = np.argsort(unit_ids_array, kind='stable')
+            pos = np.clip(np.searchsorted(unit_ids_array[order], labels), 0, max(len(order) - 1, 0))
+            if len(order) > 0:
+                keep = unit_ids_array[order][pos] == labels
+                unit_indices = order[pos]
+            else:
+                # no units, so every spike is left out
+                keep = np.zeros(len(labels), dtype=bool)
+                unit_indices = np.zeros(len(labels), dtype=np.int64)
+        # by unit, then by time
+        sort_index = np.lexsort((times, unit_indices))
+        if keep is not None:
+            sort_index = sort_index[keep[sort_index]]
+        counts = np.bincount(unit_indices[sort_index], minlength=len(unit_ids))
+        unit_offsets = np.zeros(len(unit_ids) + 1, dtype=np.int64)
+        np.cumsum(counts, out=unit_offsets[1:])
+        return SpikeTrains(
+            unit_ids=list(unit_ids),
+            spike_frames=times[sort_index],
+            unit_offsets=unit_offsets,
+            sampling_frequency=sampling_frequency,
+            sort_index=sort_index
+        )
+    @staticmethod
+    def from_sorting(sorting: Any, *, segment_index: int=0, unit_ids: Union[List[Union[int, str]], None]=None) -> 'SpikeTrains':
+        """
+        From one segment of a spikeinterface sorting
+
+        The spikes are read in one call (to_spike_vector, or
+        get_all_spike_trains for older versions of spikeinterface).
+        sort_index refers to the order of those spikes.
+        """
+        all_unit_ids = list(sorting.get_unit_ids())
+        if unit_ids is None:
+            unit_ids = all_unit_ids
+        if hasattr(sorting, 'to_spike_vector'):
+            v = sorting.to_spike_vector()
+            v = v[v['segment_index'] == segment_index]
+            times = v['sample_index']
+            labels = np.asarray(all_unit_ids)[v['unit_index']]
+        else:
+            times, labels = sorting.get_all_spike_trains()[segment_index]
+        return SpikeTrains.from_times_labels(
+            times,
+            labels,
+            sampling_frequency=sorting.get_sampling_frequency(),
+            unit_ids=unit_ids
+        )
+    @staticmethod
+    def from_unit_spike_frames(
+        unit_ids: List[Union[int, str]],
+        spike_frames: List[np.ndarray],
+        *,
+        sampling_frequency: float
+    ) -> 'SpikeTrains':
+        """
+        From the spike frames of each unit (kept in the given order)
+        """
+        if len(spike_frames) != len(unit_ids):
+            raise Exception(f'Different numbers of units and spike trains: {len(unit_ids)} {len(spike_frames)}')
+        unit_offsets = np.zeros(len(unit_ids) + 1, dtype=np.int64)
+        np.cumsum([len(a) for a in spike_frames], out=unit_offsets[1:])
+        return SpikeTrains(
+            unit_ids=unit_ids,
+            spike_frames=np.concatenate([np.asarray(a) for a in spike_frames]) if len(spike_frames) > 0 else np.zeros((0,), dtype=np.int64),
+            unit_offsets=unit_offsets,
+            sampling_frequency=sampling_frequency
+        )
+    @property
+    def num_units(self) -> int:
+        return len(self.unit_ids)
+    @property
+    def num_spikes(self) -> int:
+        return len(self.spike_frames)
+    def get_unit_spike_train(self, unit_id: Union[int, str]) -> np.ndarray:
+        i = self.unit_ids.index(unit_id)
+        return self.spike_frames[self.unit_offsets[i]:self.unit_offsets[i + 1]]
+    def to_dict(self) -> dict:
+        # the viewer converts the frames to seconds in float64
+        frames, frame_offset = frames_as_uint32(self.spike_frames)
+        ret = {
+            'unitIds': self.unit_ids,
+            'spikeFrames': frames,
+            'unitOffsets': _as_uint32(self.unit_offsets, label='unit offsets'),
+            'samplingFrequency': self.sampling_frequency
+        }
+        if frame_offset != 0:
+            ret['frameOffset'] = frame_offset
+        return ret
+
+def spike_trains_view_dict(
+    view_type: str,
+    spike_trains: SpikeTrains,
+    *,
+    items_key: str,
+    data: Dict[str, Any],
+    spike_data: Union[Dict[str, np.ndarray], None]=None
+) -> dict:
+    """
+    The data of a view whose items (one per unit) are built from a
+    SpikeTrains in the viewer: data with data[items_key] set to the items,
+    each with unitId, spikeTimesSec and the unit's part of the arrays of
+    spike_data
+    """
+    spike_data = spike_data or {}
+    for k, v in spike_data.items():
+        if len(v) != spike_trains.num_spikes:
+            raise Exception(f'Expected {spike_trains.num_spikes} values for {k}, got {len(v)}')
+    return {
+        'type': 'figneuro.SpikeTrainsView',
+        'viewType': view_type,
+        'itemsKey': items_key,
+        'spikeTrains': spike_trains.to_dict(),
+        'spikeData': spike_data,
+        'data': data
+    }
+
+def spike_trains_from_items(
+    items: List[Any],
+    *,
+    sampling_frequency: Union[float, None],
+    value_attrs: Union[Dict[str, str], None]=None
+) -> Union[Tuple[SpikeTrains, Dict[str, np.ndarray]], None]:
+    """
+    The SpikeTrains of view items given with spike_frames (and their
+    per-spike arrays by data key, from the item attributes of
+    value_attrs), or None if the items have spike times in seconds
+    """
+    with_frames = [a.spike_frames is not None for a in items]
+    if not any(with_frames):
+        return None
+    if not all(with_frames):
+        raise Exception('Either all or none of the items must have spike_frames')
+    if sampling_frequency is None:
+        raise Exception('sampling_frequency is required for items with spike_frames')
+    spike_trains = SpikeTrains.from_unit_spike_frames(
+        [a.unit_id for a in items],
+        [a.spike_frames for a in items],
+        sampling_frequency=sampling_frequency
+    )
+    spike_data = {
+        key: np.concatenate([np.asarray(getattr(a, attr)) for a in items]) if len(items) > 0 else np.zeros((0,), dtype=np.float32)
+        for key, attr in (value_attrs or {}).items()
+    }
+    return spike_trains, spike_data
+
+def check_spike_times(spike_times_sec: Any, spike_frames: Any):
+    if (spike_times_sec is None) == (spike_frames is None):
+        raise Exception('Specify either spike_times_sec or spike_frames')
+
+def frames_as_uint32(spike_frames: np.ndarray) -> Tuple[np.ndarray, int]:
+    """
+    Spike frames as uint32, relative to an offset (the first frame) if
+    they do not fit, for example late in a long recording, and the offset
+    """
+    frame_offset = 0
+    if len(spike_frames) > 0 and (spike_frames.min() < 0 or spike_frames.max() > np.iinfo(np.uint32).max):
+        frame_offset = int(spike_frames.min())
+    frames = spike_frames - frame_offset if frame_offset != 0 else spike_frames
+    return _as_uint32(frames, label='spike frames (the span of the frames is too large)'), frame_offset
+
+def _as_uint32(x: np.ndarray, *, label: str) -> np.ndarray:
+    if len(x) > 0 and (x.min() < 0 or x.max() > np.iinfo(np.uint32).max):
+        raise Exception(f'Unable to serialize {label} as uint32')
+    return x.astype(np.uint32)
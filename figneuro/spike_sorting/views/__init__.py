@@ -1,15 +1,58 @@
-from .Autocorrelograms import AutocorrelogramItem, Autocorrelograms
-from .AverageWaveforms import AverageWaveformItem, AverageWaveforms
-from .CrossCorrelograms import CrossCorrelogramItem, CrossCorrelograms
-from .RasterPlot import RasterPlotItem, RasterPlot
-from .UnitsTable import UnitsTableColumn, UnitsTableRow, UnitsTable
-from .UnitSimilarityMatrix import UnitSimilarityScore, UnitSimilarityMatrix
-from .View import View
-from .ElectrodeGeometry import ElectrodeGeometry
-from .SpikeAmplitudes import SpikeAmplitudes, SpikeAmplitudesItem
-from .UnitLocations import UnitLocations, UnitLocationsItem
-from .UnitMetricsGraph import UnitMetricsGraphMetric, UnitMetricsGraphUnit, UnitMetricsGraph
-from .SortingCuration2 import SortingCuration2
-from .SortingSelection import SortingSelection
-from .SpikeLocations import SpikeLocations, SpikeLocationsItem
-from .ConfusionMatrix import ConfusionMatrix, UnitEventCount, MatchingUnitEventCount
\ No newline at end of file
+from typing import TYPE_CHECKING
+from ..._lazy_exports import lazy_exports
+
+
+# The submodules are imported when a name is first accessed, so that
+# importing the package does not import all the views and their dependencies
+lazy_exports(__name__, {
+    'AutocorrelogramItem': 'Autocorrelograms',
+    'Autocorrelograms': 'Autocorrelograms',
+    'AverageWaveformItem': 'AverageWaveforms',
+    'AverageWaveforms': 'AverageWaveforms',
+    'CrossCorrelogramItem': 'CrossCorrelograms',
+    'CrossCorrelograms': 'CrossCorrelograms',
+    'RasterPlotItem': 'RasterPlot',
+    'RasterPlot': 'RasterPlot',
+    'UnitsTableColumn': 'UnitsTable',
+    'UnitsTableRow': 'UnitsTable',
+    'UnitsTable': 'UnitsTable',
+    'UnitSimilarityScore': 'UnitSimilarityMatrix',
+    'UnitSimilarityMatrix': 'UnitSimilarityMatrix',
+    'View': 'View',
+    'ElectrodeGeometry': 'ElectrodeGeometry',
+    'SpikeAmplitudes': 'SpikeAmplitudes',
+    'SpikeAmplitudesItem': 'SpikeAmplitudes',
+    'UnitLocations': 'UnitLocations',
+    'UnitLocationsItem': 'UnitLocations',
+    'UnitMetricsGraphMetric': 'UnitMetricsGraph',
+    'UnitMetricsGraphUnit': 'UnitMetricsGraph',
+    'UnitMetricsGraph': 'UnitMetricsGraph',
+    'SortingCuration2': 'SortingCuration2',
+    'SortingSelection': 'SortingSelection',
+    'SpikeLocations': 'SpikeLocations',
+    'SpikeLocationsItem': 'SpikeLocations',
+    'SpikeTrains': 'SpikeTrains',
+    'SpikeSubsampling': 'SpikeSubsampling',
+    'ConfusionMatrix': 'ConfusionMatrix',
+    'UnitEventCount': 'ConfusionMatrix',
+    'MatchingUnitEventCount': 'ConfusionMatrix'
+})
+
+if TYPE_CHECKING:
+    from .Autocorrelograms import AutocorrelogramItem, Autocorrelograms
+    from .AverageWaveforms import AverageWaveformItem, AverageWaveforms
+    from .CrossCorrelograms import CrossCorrelogramItem, CrossCorrelograms
+    from .RasterPlot import RasterPlotItem, RasterPlot
+    from .UnitsTable import UnitsTableColumn, UnitsTableRow, UnitsTable
+    from .UnitSimilarityMatrix import UnitSimilarityScore, UnitSimilarityMatrix
+    from .View import View
+    from .ElectrodeGeometry import ElectrodeGeometry
+    from .SpikeAmplitudes import SpikeAmplitudes, SpikeAmplitudesItem
+    from .UnitLocations import UnitLocations, UnitLocationsItem
+    from .UnitMetricsGraph import UnitMetricsGraphMetric, UnitMetricsGraphUnit, UnitMetricsGraph
+    from .SortingCuration2 import SortingCuration2
+    from .SortingSelection import SortingSelection
+    from .SpikeLocations import SpikeLocations, SpikeLocationsItem
+    from .SpikeTrains import SpikeTrains
+    from .SpikeSubsampling import SpikeSubsampling
+    from .ConfusionMatrix import ConfusionMatrix, UnitEventCount, MatchingUnitEventCount
@@ -0,0 +1,47 @@
+from typing import Any, List, Tuple, Union
+import numpy as np
+
+
+def compact_bin_counts(bin_counts: Any) -> np.ndarray:
+    """
+    Correlogram bin counts as uint16 if they fit, otherwise as int32 (or
+    as float32 if they are not whole numbers)
+    """
+    a = np.asarray(bin_counts)
+    if a.size == 0:
+        return a.astype(np.uint16)
+    if a.dtype.kind == 'f' and not np.all(np.rint(a) == a):
+        return a.astype(np.float32)
+    min_val, max_val = a.min(), a.max()
+    if min_val >= 0 and max_val <= np.iinfo(np.uint16).max:
+        return a.astype(np.uint16)
+    if min_val >= np.iinfo(np.int32).min and max_val <= np.iinfo(np.int32).max:
+        return a.astype(np.int32)
+    return a.astype(np.float32)
+
+def shared_bin_edges(items: List[Any]) -> Union[np.ndarray, None]:
+    """
+    The bin edges (float32) of a list of correlogram items, or None if the
+    items do not all have the same bin edges and number of bins
+    """
+    if len(items) == 0:
+        return None
+    bin_edges_sec = np.asarray(items[0].bin_edges_sec, dtype=np.float32)
+    for item in items:
+        if len(item.bin_counts) != len(bin_edges_sec) - 1:
+            return None
+        if item.bin_edges_sec is items[0].bin_edges_sec:
+            continue
+        if not np.array_equal(np.asarray(item.bin_edges_sec, dtype=np.float32), bin_edges_sec):
+            return None
+    return bin_edges_sec
+
+def ordered_unique(ids: List[Any]) -> Tuple[List[Any], dict]:
+    """
+    The distinct ids in order of first appearance, and the index of each
+    """
+    index: dict = {}
+    for id in ids:
+        if id not in index:
+            index[id] = len(index)
+    return list(index.keys()), index
@@ -0,0 +1,53 @@
+from typing import List, Tuple
+import numpy as np
+
+
+def spike_count_pyramid(
+    spike_times_sec: np.ndarray,
+    unit_indices: np.ndarray,
+    *,
+    num_units: int,
+    start_time_sec: float,
+    end_time_sec: float,
+    factor: int=4,
+    min_num_bins: int=1000,
+    max_num_cells: int=2**24,
+    min_bin_size_sec: float=1e-3
+) -> List[Tuple[float, np.ndarray]]:
+    """
+    Spike counts of each unit in bins of increasing duration, finest first
+
+    Returns (bin size in seconds, counts) for each level, where counts has
+    shape (num_units, num_bins) and the bins divide [start_time_sec,
+    end_time_sec] evenly. The coarsest level has min_num_bins bins and each
+    level has factor times as many bins as the next one, up to a finest
+    level with at most max_num_cells counts and bins of at least
+    min_bin_size_sec. The finest level is counted in one pass over the
+    spikes and the others are sums of groups of factor bins.
+    """
+    if factor < 2:
+        raise Exception(f'Invalid factor: {factor}')
+    duration = end_time_sec - start_time_sec
+    if duration <= 0:
+        raise Exception(f'Invalid time range: {start_time_sec} {end_time_sec}')
+    num_bins = min_num_bins
+    while num_units * num_bins * factor <= max_num_cells and duration / (num_bins * factor) >= min_bin_size_sec:
+        num_bins *= factor
+    # spikes outside the time range are not counted
+    inside = (spike_times_sec >= start_time_sec) & (spike_times_sec <= end_time_sec)
+    bin_inds = np.floor((spike_times_sec[inside] - start_time_sec) * (num_bins / duration)).astype(np.int64)
+    flat_inds = unit_indices[inside].astype(np.int64) * num_bins + np.minimum(bin_inds, num_bins - 1)
+    counts = np.bincount(flat_inds, minlength=num_units * num_bins).reshape(num_units, num_bins)
+    ret: List[Tuple[float, np.ndarray]] = []
+    while True:
+        ret.append((duration / num_bins, _compact_counts(counts)))
+        if num_bins <= min_num_bins:
+            break
+        num_bins //= factor
+        counts = counts.reshape(num_units, num_bins, factor).sum(axis=2)
+    return ret
+
+def _compact_counts(counts: np.ndarray) -> np.ndarray:
+    if counts.size == 0 or counts.max() <= np.iinfo(np.uint16).max:
+        return counts.astype(np.uint16)
+    return counts.astype(np.uint32)
@@ -0,0 +1,38 @@
+from typing import List, Tuple, Union
+from .StorageBackend import StorageBackend
+
+
+class KacheryStorageBackend(StorageBackend):
+    """
+    Stores figure data in kachery cloud (or in the local kachery store if local=True)
+    """
+    def __init__(self, *, local: bool=False, num_workers: int=4) -> None:
+        self._local = local
+        self._num_workers = num_workers
+    def store_file(self, filename: str, *, label: Union[str, None]=None) -> str:
+        import kachery_cloud as kcl
+        return kcl.store_file(filename, label=label, local=self._local)
+    def load_file(self, uri: str) -> Union[str, None]:
+        import kachery_cloud as kcl
+        return kcl.load_file(uri, local_only=self._local)
+    def cache_namespace(self) -> str:
+        import kachery_cloud as kcl
+        # the kachery cloud directory distinguishes sandbox and
+        # non-sandbox stores
+        return f'kachery|{kcl.get_kachery_cloud_dir()}|local={self._local}'
+    def set_mutable(self, key: str, value: str) -> None:
+        import kachery_cloud as kcl
+        # this version of kachery cloud only has mutables in the local
+        # store, so live figures are only updated in Jupyter
+        kcl.set_mutable_local(key, value)
+    def get_mutable(self, key: str) -> Union[str, None]:
+        import kachery_cloud as kcl
+        return kcl.get_mutable_local(key)
+    def put_many(self, files: List[Tuple[str, Union[str, None]]]) -> List[str]:
+        # kachery cloud has no batch upload, so the files are uploaded
+        # concurrently instead
+        if len(files) <= 1 or self._num_workers <= 1:
+            return super().put_many(files)
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(self._num_workers, len(files))) as executor:
+            return list(executor.map(lambda a: self.store_file(a[0], label=a[1]), files))
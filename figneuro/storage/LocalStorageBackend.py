@@ -0,0 +1,81 @@
+import os
+import shutil
+import hashlib
+import threading
+from typing import Union
+from urllib.parse import quote
+from .StorageBackend import StorageBackend
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Content-addressed store in a local directory
+
+    Files are stored by their SHA-1 hash and are referred to with the same
+    sha1://<hash>?label=<label> URIs as kachery, so figures can move between
+    this store and kachery without changing their data.
+    """
+    def __init__(self, directory: str) -> None:
+        self._directory = os.path.abspath(directory)
+    @property
+    def directory(self):
+        return self._directory
+    def store_file(self, filename: str, *, label: Union[str, None]=None) -> str:
+        sha1 = _compute_file_sha1(filename)
+        path = self.path_for_sha1(sha1)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # copy then rename, so that a partially written file is never
+            # taken for a stored one (concurrent uploads of the same file
+            # from several threads each use their own temporary file)
+            tmp_path = f'{path}.tmp.{os.getpid()}.{threading.get_ident()}'
+            shutil.copyfile(filename, tmp_path)
+            os.replace(tmp_path, path)
+        uri = f'sha1://{sha1}'
+        if label is not None:
+            uri = f'{uri}?label={quote(label)}'
+        return uri
+    def load_file(self, uri: str) -> Union[str, None]:
+        sha1 = _sha1_from_uri(uri)
+        if sha1 is None:
+            return None
+        path = self.path_for_sha1(sha1)
+        return path if os.path.exists(path) else None
+    def has_file(self, uri: str) -> bool:
+        return self.load_file(uri) is not None
+    def cache_namespace(self) -> str:
+        return f'local|{self._directory}'
+    def set_mutable(self, key: str, value: str) -> None:
+        path = self.path_for_mutable(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # readers never see a partially written value
+        tmp_path = f'{path}.tmp.{os.getpid()}.{threading.get_ident()}'
+        with open(tmp_path, 'w') as f:
+            f.write(value)
+        os.replace(tmp_path, path)
+    def get_mutable(self, key: str) -> Union[str, None]:
+        path = self.path_for_mutable(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            return f.read()
+    def path_for_sha1(self, sha1: str):
+        return f'{self._directory}/sha1/{sha1[0:2]}/{sha1[2:4]}/{sha1[4:6]}/{sha1}'
+    def path_for_mutable(self, key: str):
+        h = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return f'{self._directory}/mutable/{h[0:2]}/{h}'
+
+def _compute_file_sha1(filename: str):
+    h = hashlib.sha1()
+    with open(filename, 'rb') as f:
+        while True:
+            chunk = f.read(2**20)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+def _sha1_from_uri(uri: str) -> Union[str, None]:
+    if not uri.startswith('sha1://'):
+        return None
+    return uri[len('sha1://'):].split('?')[0].split('/')[0]
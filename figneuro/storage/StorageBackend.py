@@ -0,0 +1,85 @@
+import json
+import tempfile
+from abc import abstractmethod
+from typing import Any, List, Tuple, Union
+
+
+class StorageBackend:
+    """
+    Base class for the stores that figure data is uploaded to
+    """
+    @abstractmethod
+    def store_file(self, filename: str, *, label: Union[str, None]=None) -> str:
+        return ''
+    @abstractmethod
+    def load_file(self, uri: str) -> Union[str, None]:
+        """
+        Return the path of a local copy of the file, or None if it is not available
+        """
+        return None
+    @abstractmethod
+    def cache_namespace(self) -> str:
+        """
+        Identifies the store in the upload cache, so that URIs from different
+        stores are never mixed up
+        """
+        return ''
+    def has_file(self, uri: str) -> bool:
+        """
+        Whether the file is still in the store, used to check upload cache
+        hits. Stores that cannot check this cheaply assume that it is.
+        """
+        return True
+    def set_mutable(self, key: str, value: str) -> None:
+        """
+        Set the value of a mutable entry. Unlike files, mutables can change
+        after they are stored (used for manifests of live figures).
+        """
+        raise Exception(f'{type(self).__name__} does not support mutables')
+    def get_mutable(self, key: str) -> Union[str, None]:
+        raise Exception(f'{type(self).__name__} does not support mutables')
+    def put_many(self, files: List[Tuple[str, Union[str, None]]]) -> List[str]:
+        """
+        Store a batch of (filename, label) files and return their URIs in order
+        """
+        return [self.store_file(filename, label=label) for filename, label in files]
+    async def store_file_async(self, filename: str, *, label: Union[str, None]=None) -> str:
+        """
+        Async version of store_file. Backends without an async client run
+        store_file in the default executor of the event loop.
+        """
+        import asyncio
+        import functools
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(self.store_file, filename, label=label))
+    async def load_file_async(self, uri: str) -> Union[str, None]:
+        import asyncio
+        import functools
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(self.load_file, uri))
+    async def put_many_async(self, files: List[Tuple[str, Union[str, None]]]) -> List[str]:
+        import asyncio
+        return list(await asyncio.gather(*[
+            self.store_file_async(filename, label=label)
+            for filename, label in files
+        ]))
+    def store_text(self, text: str, *, label: Union[str, None]=None) -> str:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fname = f'{tmpdir}/file.dat'
+            with open(fname, 'w') as f:
+                f.write(text)
+            return self.store_file(fname, label=label)
+    def store_json(self, x: Any, *, label: Union[str, None]=None) -> str:
+        text = json.dumps(x, separators=(',', ':'), indent=None, allow_nan=False, sort_keys=True)
+        return self.store_text(text, label=label)
+    def load_text(self, uri: str) -> Union[str, None]:
+        fname = self.load_file(uri)
+        if fname is None:
+            return None
+        with open(fname, 'r') as f:
+            return f.read()
+    def load_json(self, uri: str) -> Union[Any, None]:
+        text = self.load_text(uri)
+        if text is None:
+            return None
+        return json.loads(text)
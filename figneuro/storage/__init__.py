@@ -0,0 +1,18 @@
+from typing import TYPE_CHECKING
+from .._lazy_exports import lazy_exports
+
+
+# The submodules are imported when a name is first accessed, so that
+# importing the package does not import all the views and their dependencies
+lazy_exports(__name__, {
+    'StorageBackend': 'StorageBackend',
+    'KacheryStorageBackend': 'KacheryStorageBackend',
+    'LocalStorageBackend': 'LocalStorageBackend',
+    'get_storage_backend': 'get_storage_backend'
+})
+
+if TYPE_CHECKING:
+    from .StorageBackend import StorageBackend
+    from .KacheryStorageBackend import KacheryStorageBackend
+    from .LocalStorageBackend import LocalStorageBackend
+    from .get_storage_backend import get_storage_backend
@@ -0,0 +1,33 @@
+import os
+from typing import Dict, Union
+from .StorageBackend import StorageBackend
+from .KacheryStorageBackend import KacheryStorageBackend
+from .LocalStorageBackend import LocalStorageBackend
+
+
+_backends: Dict[str, StorageBackend] = {}
+
+def get_storage_backend(backend: Union[str, StorageBackend, None]=None, *, local: bool=False) -> StorageBackend:
+    """
+    Get a storage backend by name: 'kachery' (the default) or 'local'
+
+    If backend is None, the name is taken from the FIGNEURO_STORAGE_BACKEND
+    environment variable. The local store is in FIGNEURO_LOCAL_STORE_DIR
+    (default ~/.figneuro/store). Backends are created once and reused.
+    """
+    if isinstance(backend, StorageBackend):
+        return backend
+    if backend is None:
+        backend = os.getenv('FIGNEURO_STORAGE_BACKEND', 'kachery')
+    if backend == 'kachery':
+        key = f'kachery|local={local}'
+        if key not in _backends:
+            _backends[key] = KacheryStorageBackend(local=local)
+    elif backend == 'local':
+        directory = os.getenv('FIGNEURO_LOCAL_STORE_DIR', os.path.expanduser('~/.figneuro/store'))
+        key = f'local|{directory}'
+        if key not in _backends:
+            _backends[key] = LocalStorageBackend(directory)
+    else:
+        raise Exception(f'Unknown storage backend: {backend}')
+    return _backends[key]
@@ -0,0 +1,81 @@
+import os
+from typing import Any, List, Tuple, Union
+import numpy as np
+from .LazyArray import LazyArray, as_lazy_array, is_non_decreasing
+
+
+class ChunkedArray:
+    """
+    An array that is published as fixed-size chunks that are stored
+    separately, so that the figneuro-views app can load only the chunks
+    covering the visible time range
+
+    Use it in place of a numpy array in the data of a view, for example
+    RasterPlotItem(unit_id, ChunkedArray(spike_times_sec)). The array is
+    split along axis into chunks of chunk_size entries (by default about
+    FIGNEURO_CHUNK_NUM_BYTES bytes each, 1 MB if not set). times gives the
+    time of each entry along axis and must be non-decreasing; for a 1D
+    array it defaults to the array itself (for example spike times).
+
+    If scale is given, data holds quantized values (int16 or uint8) that
+    stand for data * scale + offset (see quantization.py).
+
+    data and times can also be memmaps, h5py or zarr datasets or
+    LazyArrays, in which case each chunk is only read from its source when
+    it is serialized.
+    """
+    def __init__(self,
+        data: Union[np.ndarray, LazyArray],
+        *,
+        times: Union[np.ndarray, LazyArray, None]=None,
+        axis: int=0,
+        chunk_size: Union[int, None]=None,
+        scale: Union[float, None]=None,
+        offset: float=0
+    ) -> None:
+        data = _as_data(data)
+        if times is not None:
+            times = _as_data(times)
+        if axis < 0 or axis >= data.ndim:
+            raise Exception(f'Invalid axis for chunked array of shape {data.shape}: {axis}')
+        num_entries = data.shape[axis]
+        if times is None and data.ndim == 1:
+            times = data
+        if times is not None:
+            if times.shape != (num_entries,):
+                raise Exception(f'Times of chunked array must have shape ({num_entries},), got {times.shape}')
+            if not is_non_decreasing(times):
+                raise Exception('Times of chunked array must be non-decreasing')
+        if chunk_size is None:
+            chunk_num_bytes = int(os.getenv('FIGNEURO_CHUNK_NUM_BYTES', str(2**20)))
+            entry_num_bytes = max(data.nbytes // max(num_entries, 1), 1)
+            chunk_size = max(chunk_num_bytes // entry_num_bytes, 1)
+        if chunk_size < 1:
+            raise Exception(f'Invalid chunk size: {chunk_size}')
+        self.data = data
+        self.times = times
+        self.axis = axis
+        self.chunk_size = chunk_size
+        self.scale = scale
+        self.offset = offset
+    @property
+    def num_chunks(self) -> int:
+        return (self.data.shape[self.axis] + self.chunk_size - 1) // self.chunk_size
+    def chunk_range(self, chunk_index: int) -> Tuple[int, int]:
+        start = chunk_index * self.chunk_size
+        return start, min(start + self.chunk_size, self.data.shape[self.axis])
+    def get_chunk(self, chunk_index: int) -> np.ndarray:
+        start, end = self.chunk_range(chunk_index)
+        index: List[Union[slice, int]] = [slice(None)] * self.data.ndim
+        index[self.axis] = slice(start, end)
+        return np.ascontiguousarray(self.data[tuple(index)])
+    def time_bounds(self, chunk_index: int) -> Union[Tuple[float, float], None]:
+        if self.times is None:
+            return None
+        start, end = self.chunk_range(chunk_index)
+        return float(self.times[start]), float(self.times[end - 1])
+
+def _as_data(x: Any) -> Union[np.ndarray, LazyArray]:
+    # sources that are not in memory are read chunk by chunk
+    lazy = as_lazy_array(x)
+    return lazy if lazy is not None else x
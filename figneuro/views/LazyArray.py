@@ -0,0 +1,153 @@
+import os
+import copy
+from typing import Any, Callable, Iterator, Tuple, Union
+import numpy as np
+
+
+class LazyArray:
+    """
+    An array that stays in its source until the view data is serialized,
+    and is then read in chunks, so that a figure can be built from data
+    that does not fit in memory
+
+    The source can be a numpy memmap, an h5py or zarr dataset (or anything
+    else with shape, dtype and numpy-style slicing), or an object that
+    supports the buffer protocol. If dtype is given, the entries are
+    converted to it chunk by chunk. Chunks are about FIGNEURO_CHUNK_NUM_BYTES
+    bytes (1 MB if not set).
+
+    Use it in place of a numpy array in the data of a view, or as the
+    data of a ChunkedArray.
+    """
+    def __init__(self, source: Any, *, dtype: Union[str, np.dtype, None]=None) -> None:
+        if not _is_array_like(source):
+            # a view of the buffer, not a copy
+            source = np.asarray(memoryview(source))
+        self._source = source
+        self._transform: Union[Callable[[np.ndarray], np.ndarray], None] = None
+        self.shape: Tuple[int, ...] = tuple([int(n) for n in source.shape])
+        self.dtype = np.dtype(dtype) if dtype is not None else np.dtype(source.dtype)
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+    @property
+    def size(self) -> int:
+        return int(np.prod(self.shape))
+    @property
+    def nbytes(self) -> int:
+        return self.size * self.dtype.itemsize
+    def __len__(self) -> int:
+        return self.shape[0]
+    def __getitem__(self, index: Any) -> np.ndarray:
+        """
+        Read part of the array from the source
+        """
+        a = np.asarray(self._source[index])
+        if self._transform is not None:
+            a = self._transform(a)
+        return a.astype(self.dtype, copy=False)
+    def iter_chunks(self, *, chunk_size: Union[int, None]=None) -> Iterator[np.ndarray]:
+        """
+        Read the array in chunks of chunk_size entries along the first axis
+        """
+        if self.ndim == 0:
+            yield self[()]
+            return
+        if chunk_size is None:
+            chunk_size = self.default_chunk_size()
+        for start in range(0, self.shape[0], chunk_size):
+            yield self[start:start + chunk_size]
+    def default_chunk_size(self) -> int:
+        chunk_num_bytes = int(os.getenv('FIGNEURO_CHUNK_NUM_BYTES', str(2**20)))
+        entry_num_bytes = max(self.nbytes // max(self.shape[0], 1), 1) if self.ndim > 0 else 1
+        return max(chunk_num_bytes // entry_num_bytes, 1)
+    def astype(self, dtype: Union[str, np.dtype]) -> 'LazyArray':
+        ret = copy.copy(self)
+        ret.dtype = np.dtype(dtype)
+        return ret
+    def column(self, j: int) -> 'LazyArray':
+        """
+        The lazy array of x[:, j] for a 2D array x
+        """
+        if self.ndim != 2:
+            raise Exception(f'Expected a 2D lazy array, got shape {self.shape}')
+        return LazyArray(_Column(self, j))
+    def map(self, func: Callable[[np.ndarray], np.ndarray], *, dtype: Union[str, np.dtype]) -> 'LazyArray':
+        """
+        A lazy array whose chunks are func applied to the chunks of this
+        one, converted to dtype. func must work entry by entry.
+        """
+        ret = copy.copy(self)
+        transform = self._transform
+        if transform is None:
+            ret._transform = lambda a: func(a.astype(self.dtype, copy=False))
+        else:
+            ret._transform = lambda a: func(transform(a).astype(self.dtype, copy=False))
+        ret.dtype = np.dtype(dtype)
+        return ret
+    def min_max(self) -> Tuple[float, float]:
+        """
+        The minimum and maximum of the finite entries (nan if there are none)
+        """
+        min_val, max_val = np.inf, -np.inf
+        for chunk in self.iter_chunks():
+            finite = chunk[np.isfinite(chunk)] if chunk.dtype.kind == 'f' else chunk
+            if finite.size > 0:
+                min_val = min(min_val, float(finite.min()))
+                max_val = max(max_val, float(finite.max()))
+        if min_val > max_val:
+            return np.nan, np.nan
+        return min_val, max_val
+
+def as_lazy_array(x: Any) -> Union[LazyArray, None]:
+    """
+    x as a LazyArray if it is a memmap, an h5py or zarr dataset or a
+    LazyArray, or None if it is an ordinary (in-memory) array
+    """
+    if isinstance(x, LazyArray):
+        return x
+    if isinstance(x, np.memmap):
+        return LazyArray(x)
+    if isinstance(x, np.ndarray):
+        return None
+    if _is_array_like(x):
+        return LazyArray(x)
+    return None
+
+def contains_lazy_arrays(x: Any) -> bool:
+    if isinstance(x, LazyArray):
+        return True
+    elif isinstance(x, dict):
+        return any([contains_lazy_arrays(v) for v in x.values()])
+    elif isinstance(x, (list, tuple)):
+        return any([contains_lazy_arrays(v) for v in x])
+    return False
+
+def is_non_decreasing(x: Union[np.ndarray, LazyArray]) -> bool:
+    if not isinstance(x, LazyArray):
+        return bool(len(x) <= 1 or np.all(np.diff(x) >= 0))
+    last = None
+    for chunk in x.iter_chunks():
+        if len(chunk) == 0:
+            continue
+        if np.any(np.diff(chunk) < 0) or (last is not None and chunk[0] < last):
+            return False
+        last = chunk[-1]
+    return True
+
+def _is_array_like(x: Any) -> bool:
+    return hasattr(x, 'shape') and hasattr(x, 'dtype') and hasattr(x, '__getitem__')
+
+class _Column:
+    # the source of LazyArray.column
+    def __init__(self, x: LazyArray, j: int) -> None:
+        self._x = x
+        self._j = j
+        self.shape = (x.shape[0],)
+        self.dtype = x.dtype
+    def __getitem__(self, index: Any) -> np.ndarray:
+        if isinstance(index, tuple):
+            if len(index) != 1:
+                raise Exception(f'Invalid index for a 1D array: {index}')
+            index = index[0]
+        return self._x[index, self._j]
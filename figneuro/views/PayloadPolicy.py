@@ -0,0 +1,178 @@
+import os
+from typing import Any, List, Literal, Union
+import numpy as np
+from .LazyArray import LazyArray
+
+
+class PayloadPolicy:
+    """
+    Rules applied to the data of every view when a figure is published
+
+    By default only lossless conversions are made: integer arrays of types
+    that cannot be serialized (int64, uint64, int8) are down-cast to int16,
+    int32 or uint32 when the values fit, float16 arrays become float32, and
+    float64 arrays become float32 only if every value is unchanged. Other
+    float64 arrays are published as float64, which takes twice the space.
+
+    Lossy down-casting of float64 arrays is opt-in: with float_rtol > 0
+    (for example 1e-6) they are down-cast to float32 when that keeps the
+    error within float_rtol of the range of the values. If the values are
+    far from zero relative to their range (for example times in seconds
+    since the start of a long recording) they are stored as float32
+    relative to an offset, and the figneuro-views app adds the offset back.
+    Arrays that cannot be down-cast within the tolerance are left as they
+    are.
+
+    If max_num_bytes is set, publishing a figure whose serialized view data
+    is larger prints a warning, or raises if on_budget_exceeded='error'.
+    """
+    def __init__(self, *,
+        downcast: bool=True,
+        float_rtol: float=0,
+        use_offsets: bool=True,
+        max_num_bytes: Union[int, None]=None,
+        on_budget_exceeded: Literal['warn', 'error']='warn'
+    ) -> None:
+        if on_budget_exceeded not in ['warn', 'error']:
+            raise Exception(f'Invalid value for on_budget_exceeded: {on_budget_exceeded}')
+        self.downcast = downcast
+        self.float_rtol = float_rtol
+        self.use_offsets = use_offsets
+        self.max_num_bytes = max_num_bytes
+        self.on_budget_exceeded = on_budget_exceeded
+    def namespace(self) -> str:
+        # identifies the options that affect the published data
+        return f'downcast={self.downcast}|floatRtol={self.float_rtol}|useOffsets={self.use_offsets}'
+    def apply(self, data: Any) -> Any:
+        """
+        Return a copy of the view data with the arrays down-cast (the
+        arrays that are not changed are not copied)
+        """
+        if not self.downcast:
+            return data
+        return _apply(data, policy=self)
+    def check_budget(self, num_bytes: int):
+        if self.max_num_bytes is None or num_bytes <= self.max_num_bytes:
+            return
+        msg = f'Figure payload of {num_bytes} bytes exceeds the budget of {self.max_num_bytes} bytes'
+        if self.on_budget_exceeded == 'error':
+            raise Exception(msg)
+        print(f'WARNING: {msg}')
+
+def get_default_payload_policy() -> PayloadPolicy:
+    """
+    The policy used when none is given. Down-casting can be disabled with
+    FIGNEURO_PAYLOAD_DOWNCAST=0, lossy down-casting of float64 arrays can be
+    enabled with FIGNEURO_PAYLOAD_FLOAT_RTOL (for example 1e-6), and a
+    budget in bytes can be set with FIGNEURO_PAYLOAD_BUDGET (with
+    FIGNEURO_PAYLOAD_BUDGET_ACTION=error to raise instead of warn).
+    """
+    max_num_bytes = os.getenv('FIGNEURO_PAYLOAD_BUDGET', None)
+    on_budget_exceeded = os.getenv('FIGNEURO_PAYLOAD_BUDGET_ACTION', 'warn')
+    return PayloadPolicy(
+        downcast=os.getenv('FIGNEURO_PAYLOAD_DOWNCAST', '1') != '0',
+        float_rtol=float(os.getenv('FIGNEURO_PAYLOAD_FLOAT_RTOL', '0')),
+        max_num_bytes=int(max_num_bytes) if max_num_bytes else None,
+        on_budget_exceeded='error' if on_budget_exceeded == 'error' else 'warn'
+    )
+
+def contains_offset_arrays(x: Any) -> bool:
+    if isinstance(x, dict):
+        if x.get('_type', None) == 'offsetArray':
+            return True
+        return any([contains_offset_arrays(v) for v in x.values()])
+    elif isinstance(x, (list, tuple)):
+        return any([contains_offset_arrays(v) for v in x])
+    return False
+
+# integer types that the serializers support, smallest first
+_INT_TYPES: List[Any] = [np.int16, np.int32, np.uint32]
+
+def _apply(x: Any, *, policy: PayloadPolicy):
+    if isinstance(x, np.ndarray):
+        return _downcast_array(x, policy=policy)
+    elif isinstance(x, LazyArray):
+        return _downcast_lazy_array(x, policy=policy)
+    elif isinstance(x, dict):
+        return {key: _apply(val, policy=policy) for key, val in x.items()}
+    elif isinstance(x, (list, tuple)):
+        return [_apply(val, policy=policy) for val in x]
+    elif hasattr(x, 'to_dict') and not isinstance(x, type):
+        return _apply(x.to_dict(), policy=policy)
+    else:
+        return x
+
+def _downcast_array(x: np.ndarray, *, policy: PayloadPolicy):
+    if x.dtype.name == 'float64':
+        return _downcast_float64(x, policy=policy)
+    elif x.dtype.name == 'float16':
+        return x.astype(np.float32)
+    elif x.dtype.name in ['int64', 'uint64', 'int8']:
+        if x.size == 0:
+            return x.astype(np.int32)
+        min_val, max_val = int(x.min()), int(x.max())
+        for t in _INT_TYPES:
+            info = np.iinfo(t)
+            if info.min <= min_val and max_val <= info.max:
+                return x.astype(t)
+        return x
+    return x
+
+def _downcast_float64(x: np.ndarray, *, policy: PayloadPolicy):
+    finite = np.isfinite(x)
+    if not np.any(finite):
+        return x.astype(np.float32)
+    xf = x[finite]
+    min_val, max_val = float(xf.min()), float(xf.max())
+    if np.abs(xf).max() > np.finfo(np.float32).max:
+        return x
+    tolerance = policy.float_rtol * ((max_val - min_val) if max_val > min_val else max(abs(max_val), 1))
+    y = x.astype(np.float32)
+    if np.abs(y[finite].astype(np.float64) - xf).max() <= tolerance:
+        return y
+    if policy.use_offsets:
+        # relative to the minimum the values need far fewer significant digits
+        offset = min_val
+        y = (x - offset).astype(np.float32)
+        if np.abs(y[finite].astype(np.float64) + offset - xf).max() <= tolerance:
+            return {'_type': 'offsetArray', 'offset': offset, 'data': y}
+    return x
+
+def _downcast_lazy_array(x: LazyArray, *, policy: PayloadPolicy):
+    # the same rules as for in-memory arrays, checked chunk by chunk; the
+    # result is again a lazy array
+    if x.dtype.name == 'float64':
+        min_val, max_val = x.min_max()
+        if np.isnan(min_val):
+            return x.map(lambda a: a.astype(np.float32), dtype=np.float32)
+        if max(abs(min_val), abs(max_val)) > np.finfo(np.float32).max:
+            return x
+        tolerance = policy.float_rtol * ((max_val - min_val) if max_val > min_val else max(abs(max_val), 1))
+        if _max_lazy_error(x, offset=0) <= tolerance:
+            return x.map(lambda a: a.astype(np.float32), dtype=np.float32)
+        if policy.use_offsets:
+            offset = min_val
+            if _max_lazy_error(x, offset=offset) <= tolerance:
+                return {'_type': 'offsetArray', 'offset': offset, 'data': x.map(lambda a: (a - offset).astype(np.float32), dtype=np.float32)}
+        return x
+    elif x.dtype.name == 'float16':
+        return x.map(lambda a: a.astype(np.float32), dtype=np.float32)
+    elif x.dtype.name in ['int64', 'uint64', 'int8']:
+        if x.size == 0:
+            return x.map(lambda a: a.astype(np.int32), dtype=np.int32)
+        min_val, max_val = x.min_max()
+        for t in _INT_TYPES:
+            info = np.iinfo(t)
+            if info.min <= min_val and max_val <= info.max:
+                return x.map(lambda a: a.astype(t), dtype=t)
+        return x
+    return x
+
+def _max_lazy_error(x: LazyArray, *, offset: float) -> float:
+    ret = 0.0
+    for chunk in x.iter_chunks():
+        finite = chunk[np.isfinite(chunk)]
+        if finite.size > 0:
+            y = (finite - offset).astype(np.float32)
+            ret = max(ret, float(np.abs(y.astype(np.float64) + offset - finite).max()))
+    return ret
@@ -0,0 +1,194 @@
+import json
+import math
+import time
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Union
+import numpy as np
+from .ChunkedArray import ChunkedArray
+from .LazyArray import LazyArray
+
+
+class ViewPublishReport:
+    """
+    What was recorded for one leaf view while publishing a figure
+    """
+    def __init__(self, *, view_type: str, view_id: str) -> None:
+        self.view_type = view_type
+        self.view_id = view_id
+        # wall time in seconds per phase (to_dict, hash, serialize, store)
+        self.timings: Dict[str, float] = {}
+        # serialized size of the view data and of each of its top-level fields
+        self.num_bytes: int = 0
+        self.field_num_bytes: Dict[str, int] = {}
+        self.num_arrays: int = 0
+        self.array_num_bytes: int = 0
+        # bytes actually written to the store (0 on an upload cache hit)
+        self.stored_num_bytes: int = 0
+        self.cache_hit: bool = False
+        # not serialized or uploaded because it did not change since it
+        # was last published
+        self.unchanged: bool = False
+    @property
+    def total_sec(self):
+        return sum(self.timings.values())
+    def to_dict(self):
+        return {
+            'viewType': self.view_type,
+            'viewId': self.view_id,
+            'timings': dict(self.timings),
+            'totalSec': self.total_sec,
+            'numBytes': self.num_bytes,
+            'fieldNumBytes': dict(self.field_num_bytes),
+            'numArrays': self.num_arrays,
+            'arrayNumBytes': self.array_num_bytes,
+            'storedNumBytes': self.stored_num_bytes,
+            'cacheHit': self.cache_hit,
+            'unchanged': self.unchanged
+        }
+
+class PublishReport:
+    """
+    Timings and sizes recorded while publishing a figure
+
+    Pass an instance to View.url(report=...) (or url_async,
+    export_bundle) and inspect it afterwards,
+    either as a structured object (views, phases, to_dict()) or with
+    print_summary(). Phase times are summed over the views; since the
+    views are uploaded concurrently the sum can exceed total_sec.
+    """
+    def __init__(self) -> None:
+        self.views: List[ViewPublishReport] = []
+        self.phases: Dict[str, float] = {}
+        self.total_sec: float = 0
+        self.num_shared_arrays: int = 0
+        self.shared_array_num_bytes: int = 0
+        self._lock = threading.Lock()
+    def add_view(self, *, view_type: str, view_id: str) -> int:
+        with self._lock:
+            self.views.append(ViewPublishReport(view_type=view_type, view_id=view_id))
+            return len(self.views) - 1
+    @contextmanager
+    def time_total(self):
+        # the wall time of a whole publish (url, url_async, export_bundle)
+        timer = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.total_sec = time.perf_counter() - timer
+    @contextmanager
+    def time_phase(self, phase: str, *, view_index: Union[int, None]=None):
+        timer = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(phase, time.perf_counter() - timer, view_index=view_index)
+    def add_time(self, phase: str, elapsed_sec: float, *, view_index: Union[int, None]=None):
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0) + elapsed_sec
+            if view_index is not None:
+                timings = self.views[view_index].timings
+                timings[phase] = timings.get(phase, 0) + elapsed_sec
+    def record_view_data(self, view_index: int, data: Any, *, binary: bool=False):
+        v = self.views[view_index]
+        v.field_num_bytes = {
+            key: _serialized_num_bytes(val, binary=binary)
+            for key, val in data.items()
+        } if isinstance(data, dict) else {}
+        v.num_bytes = _serialized_num_bytes(data, binary=binary)
+        arrays = list(_iterate_arrays(data))
+        v.num_arrays = len(arrays)
+        v.array_num_bytes = sum([a.nbytes for a in arrays])
+    def add_stored_bytes(self, num_bytes: int, *, view_index: Union[int, None]=None):
+        if view_index is None:
+            return
+        with self._lock:
+            self.views[view_index].stored_num_bytes += num_bytes
+    def set_cache_hit(self, view_index: Union[int, None]):
+        if view_index is None:
+            return
+        self.views[view_index].cache_hit = True
+    def set_unchanged(self, view_index: int):
+        self.views[view_index].unchanged = True
+    def to_dict(self):
+        return {
+            'totalSec': self.total_sec,
+            'phases': dict(self.phases),
+            'numSharedArrays': self.num_shared_arrays,
+            'sharedArrayNumBytes': self.shared_array_num_bytes,
+            'views': [v.to_dict() for v in self.views]
+        }
+    def summary(self, *, max_views: int=20, max_fields: int=3) -> str:
+        lines: List[str] = []
+        total_num_bytes = sum([v.num_bytes for v in self.views])
+        lines.append(f'Published {len(self.views)} views in {self.total_sec:.3f} sec ({_format_num_bytes(total_num_bytes)})')
+        for phase, sec in sorted(self.phases.items(), key=lambda a: -a[1]):
+            lines.append(f'    {phase:<16}{sec:10.3f} sec')
+        if self.num_shared_arrays > 0:
+            lines.append(f'Shared arrays: {self.num_shared_arrays} ({_format_num_bytes(self.shared_array_num_bytes)})')
+        views = sorted(self.views, key=lambda v: -v.num_bytes)
+        lines.append('Views by size:')
+        for v in views[:max_views]:
+            cached = ' (unchanged)' if v.unchanged else ' (cached)' if v.cache_hit else ''
+            lines.append(f'    {v.view_id:<6}{v.view_type:<32}{_format_num_bytes(v.num_bytes):>12}{v.total_sec:10.3f} sec{v.num_arrays:6d} arrays{cached}')
+            fields = sorted(v.field_num_bytes.items(), key=lambda a: -a[1])[:max_fields]
+            for key, num_bytes in fields:
+                lines.append(f'          {key:<32}{_format_num_bytes(num_bytes):>12}')
+        if len(views) > max_views:
+            lines.append(f'    ... and {len(views) - max_views} more')
+        return '\n'.join(lines)
+    def print_summary(self, **kwargs):
+        print(self.summary(**kwargs))
+
+def _serialized_num_bytes(x: Any, *, binary: bool) -> int:
+    # The size of the JSON text that the view data is stored as (see
+    # stream_encode.py), computed without encoding it. In the binary
+    # format an array takes its raw size instead of its base64 text.
+    if isinstance(x, (np.ndarray, LazyArray)):
+        if binary:
+            return x.nbytes
+        shape_text = json.dumps([int(n) for n in x.shape], separators=(',', ':'))
+        return len(f'{{"_type":"ndarray","data_b64":"","dtype":"{x.dtype.name}","shape":{shape_text}}}') + 4 * math.ceil(x.nbytes / 3)
+    elif isinstance(x, ChunkedArray):
+        # the chunks are stored as binary payloads
+        return x.data.nbytes
+    elif isinstance(x, dict):
+        return 2 + max(len(x) - 1, 0) + sum([
+            len(json.dumps(str(key))) + 1 + _serialized_num_bytes(val, binary=binary)
+            for key, val in x.items()
+        ])
+    elif isinstance(x, (list, tuple)):
+        return 2 + max(len(x) - 1, 0) + sum([_serialized_num_bytes(val, binary=binary) for val in x])
+    elif isinstance(x, np.integer):
+        return len(json.dumps(int(x)))
+    elif isinstance(x, np.floating):
+        return len(json.dumps(float(x)))
+    elif hasattr(x, 'to_dict'):
+        return _serialized_num_bytes(x.to_dict(), binary=binary)
+    else:
+        try:
+            return len(json.dumps(x).encode('utf-8'))
+        except TypeError:
+            return 0
+
+def _iterate_arrays(x: Any):
+    if isinstance(x, (np.ndarray, LazyArray)):
+        yield x
+    elif isinstance(x, ChunkedArray):
+        yield x.data
+    elif isinstance(x, dict):
+        for val in x.values():
+            yield from _iterate_arrays(val)
+    elif isinstance(x, (list, tuple)):
+        for val in x:
+            yield from _iterate_arrays(val)
+
+def _format_num_bytes(num_bytes: int):
+    if num_bytes < 1e3:
+        return f'{num_bytes} B'
+    elif num_bytes < 1e6:
+        return f'{num_bytes / 1e3:.1f} KB'
+    elif num_bytes < 1e9:
+        return f'{num_bytes / 1e6:.1f} MB'
+    else:
+        return f'{num_bytes / 1e9:.2f} GB'
@@ -1,6 +1,11 @@
 import numpy as np
 from typing import List, Union
-from .View import View
+from ..storage import StorageBackend, get_storage_backend
+from .View import View, _random_id
+from .ChunkedArray import ChunkedArray
+from .LazyArray import LazyArray, as_lazy_array, is_non_decreasing
+from .decimation import min_max_pyramid
+from .quantization import Quantization, choose_quantization
 
 
 class TGDataset:
@@ -36,8 +41,15 @@ class TimeseriesGraph(View):
         hide_x_gridlines: Union[bool, None]=None,
         hide_y_gridlines: Union[bool, None]=None,
         hide_toolbar: bool=False,
+        live: bool=False,
         **kwargs
     ) -> None:
+        """
+        If live is True, data can be appended to the line series after the
+        figure is published (see append). Live updates are local only: they
+        reach the figure displayed in Jupyter from the same Python process,
+        while a figure opened from url() shows the data as published.
+        """
         super().__init__('TimeseriesGraph', **kwargs)
         self._datasets = []
         self._series = []
@@ -48,19 +60,60 @@ class TimeseriesGraph(View):
         self._hide_x_gridlines = hide_x_gridlines
         self._hide_y_gridlines = hide_y_gridlines
         self._hide_toolbar = hide_toolbar
+        self._decimated_series = []
+        self._live_manifest_key = f'figneuro/live/{_random_id()}' if live else None
+        self._live_segments = []
+        # the time of the last point of each series that was appended to
+        self._live_end_times = {}
+        if live:
+            self.type = 'figneuro.LiveTimeseriesGraph'
     def add_line_series(self, *,
             name: str,
             t: np.array,
             y: np.array,
             color: str,
             width: Union[None, int]=None,
-            dash: Union[None, List[int]]=None
+            dash: Union[None, List[int]]=None,
+            decimate: bool=False,
+            max_error: Union[None, float]=None,
+            scale: Union[None, float]=None,
+            offset: float=0
         ):
+        """
+        Add a line series. If decimate is True (opt-in, useful for series
+        of more than about 100000 points) a min/max decimation pyramid is
+        stored along with the series and the viewer draws the level that
+        matches the zoom, loading only the chunks in view. This changes the
+        view type to figneuro.DecimatedTimeseriesGraph, which only the
+        figneuro-views app renders.
+
+        The values can be stored quantized, as uint8 or int16: either give
+        max_error to choose the quantization from the range of y (see
+        choose_quantization), or pass raw int16/uint8 samples as y with the
+        scale and offset that convert them (y * scale + offset).
+
+        t and y can be memmaps, h5py or zarr datasets or LazyArrays. They
+        are then read chunk by chunk when the figure is published, rather
+        than loaded into memory.
+        """
         # allow float64 for time array
         t = self._handle_time_offset_t(t)
+        y = _as_series_array(y)
 
         if t.dtype == np.float64:
             raise Exception('Cannot handle float64 datatype for t parameter in add_line_series')
+        quantization = None
+        if scale is not None:
+            if y.dtype.name not in ['int16', 'uint8']:
+                raise Exception(f'Expected int16 or uint8 datatype for y parameter in add_line_series when scale is given, got {y.dtype.name}')
+            quantization = Quantization(dtype=y.dtype.name, scale=scale, offset=offset)
+        elif max_error is not None:
+            quantization = choose_quantization(y, max_error=max_error)
+            if quantization is None:
+                print(f'WARNING: TimeseriesGraph::add_line_series unable to quantize {name} within max_error. Using float32.')
+                y = y.astype(np.float32)
+            else:
+                y = quantization.quantize(y)
         if y.dtype == np.float64:
             raise Exception('Cannot handle float64 datatype for y parameter in add_line_series')
 
@@ -69,7 +122,59 @@ class TimeseriesGraph(View):
             attributes['width'] = width
         if dash is not None:
             attributes['dash'] = dash
-        self._add_series(type='line', name=name, t=t, y=y, attributes=attributes)
+        self._add_series(type='line', name=name, t=t, y=y, attributes=attributes, decimate=decimate, quantization=quantization)
+        return self
+    def add_line_series_batch(self, *,
+            names: List[str],
+            t: np.array,
+            Y: np.array,
+            colors: Union[str, List[str]],
+            width: Union[None, int]=None,
+            dash: Union[None, List[int]]=None,
+            dataset_name: Union[None, str]=None
+        ):
+        """
+        Add a line series for each column of Y (shape len(t) x len(names)).
+        The series share a single dataset, so t is stored only once. These
+        series are not decimated.
+        """
+        # allow float64 for time array
+        t = self._handle_time_offset_t(t)
+        Y = _as_series_array(Y)
+
+        if t.dtype == np.float64:
+            raise Exception('Cannot handle float64 datatype for t parameter in add_line_series_batch')
+        if Y.dtype == np.float64:
+            raise Exception('Cannot handle float64 datatype for Y parameter in add_line_series_batch')
+        if t.ndim != 1:
+            print('WARNING: TimeseriesGraph::add_line_series_batch t argument is not 1D array. Using squeeze.')
+            t = np.squeeze(t)
+        if Y.ndim != 2 or Y.shape != (len(t), len(names)):
+            raise Exception(f'Y must have shape ({len(t)}, {len(names)}), got {Y.shape}')
+        if isinstance(colors, str):
+            colors = [colors] * len(names)
+        if len(colors) != len(names):
+            raise Exception(f'Expected {len(names)} colors, got {len(colors)}')
+        if dataset_name is None:
+            dataset_name = f'batch{len(self._datasets)}'
+
+        data = {'t': t}
+        for ii in range(len(names)):
+            data[f'y{ii}'] = Y.column(ii) if isinstance(Y, LazyArray) else Y[:, ii]
+        self.add_dataset(TGDataset(name=dataset_name, data=data))
+        for ii, (name, color) in enumerate(zip(names, colors)):
+            attributes = {'color': color}
+            if width is not None:
+                attributes['width'] = width
+            if dash is not None:
+                attributes['dash'] = dash
+            self.add_series(TGSeries(
+                type='line',
+                encoding={'t': 't', 'y': f'y{ii}'},
+                dataset=dataset_name,
+                attributes=attributes,
+                title=name
+            ))
         return self
     def add_marker_series(self, *,
             name: str,
@@ -81,6 +186,7 @@ class TimeseriesGraph(View):
         ):
         # allow float64 for time array
         t = self._handle_time_offset_t(t)
+        y = _as_series_array(y)
         
         if t.dtype == np.float64:
             raise Exception('Cannot handle float64 datatype for t parameter in add_marker_series')
@@ -93,11 +199,64 @@ class TimeseriesGraph(View):
             attributes['shape'] = shape
         self._add_series(type='marker', name=name, t=t, y=y, attributes=attributes)
         return self
+    def append(self, name: str, t_chunk: np.array, y_chunk: np.array, *,
+        backend: Union[str, StorageBackend, None]=None,
+        local: bool=False
+    ):
+        """
+        Append points to the line series (or marker series) name of a live
+        graph. The points are stored as a new segment and listed in the
+        manifest of the graph, so the figure loads only the new points. The
+        view data itself does not change.
+
+        The times of t_chunk must be non-decreasing and must not be earlier
+        than the last time of the series. The manifest is a mutable of the
+        storage backend. With kachery it is kept in the local store, so
+        only figures displayed in Jupyter are updated (see live.py).
+        """
+        if self._live_manifest_key is None:
+            raise Exception('Cannot append to a TimeseriesGraph that was not created with live=True')
+        ds = next((ds for ds in self._datasets if ds._name == name), None)
+        if ds is None:
+            raise Exception(f'No series in TimeseriesGraph: {name}')
+        if any([d['dataset'] == name for d in self._decimated_series]) or isinstance(ds._data.get('t', None), ChunkedArray) or ('y' not in ds._data):
+            raise Exception(f'Cannot append to decimated or batch series: {name}')
+        t_chunk = self._handle_time_offset_t(t_chunk)
+        if t_chunk.dtype == np.float64:
+            raise Exception('Cannot handle float64 datatype for t parameter in append')
+        if t_chunk.ndim != 1 or y_chunk.shape != t_chunk.shape:
+            raise Exception(f'Expected 1D t and y of the same length, got {t_chunk.shape} and {y_chunk.shape}')
+        end_time = self._get_live_end_time(name, ds)
+        if len(t_chunk) > 0:
+            if not is_non_decreasing(t_chunk):
+                raise Exception(f'Times appended to {name} are not in order')
+            if end_time is not None and t_chunk[0] < end_time:
+                raise Exception(f'Times appended to {name} start before the last time of the series')
+        y = ds._data['y']
+        if isinstance(y, dict) and y.get('_type', None) == 'quantizedArray':
+            # same quantization as the rest of the series
+            quantization = Quantization(dtype=y['data'].dtype.name, scale=y['scale'], offset=y['offset'])
+            q = quantization.quantize(y_chunk)
+            if np.any(np.abs(q * quantization.scale + quantization.offset - y_chunk) > quantization.max_error):
+                print(f'WARNING: TimeseriesGraph::append values of {name} are outside the range of its quantization and are clipped.')
+            y_chunk = quantization.to_dict(q)
+        elif y_chunk.dtype == np.float64:
+            raise Exception('Cannot handle float64 datatype for y parameter in append')
+        from .live import store_live_segment, set_live_mutable
+        storage_backend = get_storage_backend(backend, local=local)
+        uri = store_live_segment({'t': t_chunk, 'y': y_chunk}, backend=storage_backend)
+        self._live_segments.append({'dataset': name, 'uri': uri, 'numPoints': len(t_chunk)})
+        if len(t_chunk) > 0:
+            self._live_end_times[name] = t_chunk[-1]
+        set_live_mutable(self._live_manifest_key, {'segments': self._live_segments}, backend=storage_backend)
+        return self
     def add_dataset(self, ds: TGDataset):
         self._datasets.append(ds)
+        self.mark_dirty()
         return self
     def add_series(self, s: TGSeries):
         self._series.append(s)
+        self.mark_dirty()
         return self
     def to_dict(self) -> dict:
         ret = {
@@ -105,6 +264,10 @@ class TimeseriesGraph(View):
             'datasets': [ds.to_dict() for ds in self._datasets],
             'series': [s.to_dict() for s in self._series]
         }
+        if len(self._decimated_series) > 0:
+            ret['decimatedSeries'] = self._decimated_series
+        if self._live_manifest_key is not None:
+            ret['liveManifestKey'] = self._live_manifest_key
         if self._time_offset is not None:
             ret['timeOffset'] = self._time_offset
         if self._legend_opts is not None:
@@ -124,20 +287,28 @@ class TimeseriesGraph(View):
         return super().register_task_handlers(task_backend)
     def child_views(self) -> List[View]:
         return []
-    def _add_series(self, *, type: str, name: str, t: np.ndarray, y: np.ndarray, attributes: dict):
+    def _add_series(self, *, type: str, name: str, t: Union[np.ndarray, LazyArray], y: Union[np.ndarray, LazyArray], attributes: dict, decimate: bool=False, quantization: Union[Quantization, None]=None):
+        if (isinstance(t, LazyArray) and t.ndim != 1) or (isinstance(y, LazyArray) and y.ndim != 1):
+            raise Exception('Lazy t and y arguments of TimeseriesGraph::_add_series must be 1D')
         if t.ndim != 1:
             print('WARNING: TimeseriesGraph::_add_series t argument is not 1D array. Using squeeze.')
             t = np.squeeze(t)
         if y.ndim != 1:
             print('WARNING: TimeseriesGraph::_add_series y argument is not 1D array. Using squeeze.')
             y = np.squeeze(y)
-        ds = TGDataset(
-            name=name,
-            data={
-                't': t,
-                'y': y
-            }
-        )
+        if decimate and not is_non_decreasing(t):
+            print('WARNING: TimeseriesGraph::_add_series t argument is not sorted. Not decimating.')
+            decimate = False
+        if decimate:
+            ds = TGDataset(name=name, data=_chunked_dataset_data(t, y, quantization=quantization))
+        else:
+            ds = TGDataset(
+                name=name,
+                data={
+                    't': t,
+                    'y': quantization.to_dict(y) if quantization is not None else y
+                }
+            )
         s = TGSeries(
             type=type,
             encoding={'t': 't', 'y': 'y'},
@@ -147,7 +318,35 @@ class TimeseriesGraph(View):
         )
         self.add_dataset(ds)
         self.add_series(s)
+        if decimate:
+            self._add_decimation_levels(name=name, t=t, y=y, quantization=quantization)
+    def _add_decimation_levels(self, *, name: str, t: Union[np.ndarray, LazyArray], y: Union[np.ndarray, LazyArray], quantization: Union[Quantization, None]=None):
+        # Each level is a separate dataset. The viewer (which has its own
+        # view type for this) picks the level for the visible time range.
+        levels = []
+        for bin_size, t_level, y_level in min_max_pyramid(t, y):
+            level_name = f'{name}/minmax{bin_size}'
+            self.add_dataset(TGDataset(name=level_name, data=_chunked_dataset_data(t_level, y_level, quantization=quantization)))
+            levels.append({'dataset': level_name, 'binSize': bin_size})
+        self._decimated_series.append({
+            'dataset': name,
+            'numPoints': len(t),
+            'startTime': float(t[0]) if len(t) > 0 else 0,
+            'endTime': float(t[-1]) if len(t) > 0 else 0,
+            'levels': levels
+        })
+        if self._live_manifest_key is None:
+            # (the live view type handles decimated series too)
+            self.type = 'figneuro.DecimatedTimeseriesGraph'
+    def _get_live_end_time(self, name: str, ds: TGDataset):
+        if name in self._live_end_times:
+            return self._live_end_times[name]
+        t = ds._data['t']
+        return t[len(t) - 1] if len(t) > 0 else None
     def _handle_time_offset_t(self, t: np.array):
+        lazy = as_lazy_array(t)
+        if lazy is not None:
+            return self._handle_time_offset_lazy_t(lazy)
         if t.dtype == np.float64:
             # We have a float64, let's see if we have a time offset
             if self._time_offset is None:
@@ -160,3 +359,28 @@ class TimeseriesGraph(View):
                 # if we have a float64, now that we've subtracted the time offset, it's safe to use float32
                 t = t.astype(np.float32)
         return t
+    def _handle_time_offset_lazy_t(self, t: LazyArray):
+        # the same as _handle_time_offset_t, applied chunk by chunk when
+        # the array is read
+        if t.dtype == np.float64 and self._time_offset is None and len(t) > 0:
+            self._time_offset = np.float64(t[0])
+        if self._time_offset is None:
+            return t
+        time_offset = self._time_offset
+        dtype = np.result_type(t.dtype, np.float64)
+        return t.map(lambda a: a - time_offset, dtype=np.float32 if dtype == np.float64 else dtype)
+
+def _as_series_array(x: np.array):
+    # sources that are not in memory are kept as lazy arrays
+    lazy = as_lazy_array(x)
+    return lazy if lazy is not None else x
+
+def _chunked_dataset_data(t: Union[np.ndarray, LazyArray], y: Union[np.ndarray, LazyArray], *, quantization: Union[Quantization, None]=None):
+    # long datasets are stored in chunks, so that the viewer only loads the
+    # part in view
+    ct = ChunkedArray(t)
+    if ct.num_chunks <= 1:
+        return {'t': t, 'y': quantization.to_dict(y) if quantization is not None else y}
+    if quantization is not None:
+        return {'t': ct, 'y': ChunkedArray(y, times=t, chunk_size=ct.chunk_size, scale=quantization.scale, offset=quantization.offset)}
+    return {'t': ct, 'y': ChunkedArray(y, times=t, chunk_size=ct.chunk_size)}
@@ -0,0 +1,118 @@
+import os
+import time
+import sqlite3
+import hashlib
+import numpy as np
+from typing import Any, Union
+from .LazyArray import LazyArray
+
+
+class UploadCache:
+    """
+    Local on-disk cache mapping a hash of view data to the URI it was stored at
+
+    The hash is computed directly on the view data (including the raw
+    bytes of numpy arrays), so a cache hit skips both serialization and
+    upload. The number of entries is bounded; the least recently used
+    entries are evicted first.
+    """
+    def __init__(self, directory: str, *, max_entries: int=10000) -> None:
+        self._directory = directory
+        self._max_entries = max_entries
+        os.makedirs(directory, exist_ok=True)
+        self._db_path = f'{directory}/upload_cache.db'
+        with self._connect() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, uri TEXT NOT NULL, last_access REAL NOT NULL)')
+    def key_for(self, data: Any, *, namespace: str='') -> str:
+        h = hashlib.blake2b(digest_size=20)
+        h.update(namespace.encode('utf-8'))
+        _hash_data(data, h)
+        return h.hexdigest()
+    def get(self, key: str) -> Union[str, None]:
+        with self._connect() as conn:
+            row = conn.execute('SELECT uri FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute('UPDATE entries SET last_access = ? WHERE key = ?', (time.time(), key))
+        return row[0]
+    def set(self, key: str, uri: str):
+        with self._connect() as conn:
+            conn.execute('INSERT OR REPLACE INTO entries (key, uri, last_access) VALUES (?, ?, ?)', (key, uri, time.time()))
+            num_entries = conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+            if num_entries > self._max_entries:
+                conn.execute(
+                    'DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY last_access ASC LIMIT ?)',
+                    (num_entries - self._max_entries,)
+                )
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM entries')
+    def _connect(self):
+        # a new connection for every operation so the cache can be
+        # used from the upload worker threads
+        return _closing_connection(sqlite3.connect(self._db_path, timeout=30))
+
+_global_upload_cache: Union[UploadCache, None] = None
+
+def get_upload_cache() -> UploadCache:
+    """
+    The default upload cache. The location and size can be configured with
+    the FIGNEURO_UPLOAD_CACHE_DIR and FIGNEURO_UPLOAD_CACHE_MAX_ENTRIES
+    environment variables.
+    """
+    global _global_upload_cache
+    directory = os.getenv('FIGNEURO_UPLOAD_CACHE_DIR', os.path.expanduser('~/.figneuro/upload_cache'))
+    max_entries = int(os.getenv('FIGNEURO_UPLOAD_CACHE_MAX_ENTRIES', '10000'))
+    if _global_upload_cache is None or _global_upload_cache._directory != directory or _global_upload_cache._max_entries != max_entries:
+        _global_upload_cache = UploadCache(directory, max_entries=max_entries)
+    return _global_upload_cache
+
+class UnhashableDataException(Exception):
+    pass
+
+def _hash_data(x: Any, h):
+    # Every value is prefixed with a type tag so that, for example,
+    # the string '1' and the integer 1 hash differently
+    if isinstance(x, np.ndarray):
+        h.update(b'a')
+        h.update(f'{x.dtype.str}{x.shape}'.encode('utf-8'))
+        h.update(memoryview(np.ascontiguousarray(x)).cast('B'))
+    elif isinstance(x, LazyArray):
+        # the same hash as the array read into memory
+        h.update(b'a')
+        h.update(f'{x.dtype.str}{x.shape}'.encode('utf-8'))
+        for chunk in x.iter_chunks():
+            h.update(memoryview(np.ascontiguousarray(chunk)).cast('B'))
+    elif isinstance(x, dict):
+        h.update(f'd{len(x)}'.encode('utf-8'))
+        for key in sorted(x.keys()):
+            _hash_data(key, h)
+            _hash_data(x[key], h)
+    elif isinstance(x, (list, tuple)):
+        h.update(f'l{len(x)}'.encode('utf-8'))
+        for a in x:
+            _hash_data(a, h)
+    elif isinstance(x, str):
+        b = x.encode('utf-8')
+        h.update(f's{len(b)}:'.encode('utf-8'))
+        h.update(b)
+    elif x is None or isinstance(x, (bool, np.bool_)):
+        h.update(f'b{x}'.encode('utf-8'))
+    elif isinstance(x, (int, np.integer)):
+        h.update(f'i{int(x)}'.encode('utf-8'))
+    elif isinstance(x, (float, np.floating)):
+        h.update(f'f{float(x)!r}'.encode('utf-8'))
+    else:
+        raise UnhashableDataException(f'Unable to hash data of type {type(x)}')
+
+class _closing_connection:
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self._conn = conn
+    def __enter__(self):
+        return self._conn
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self._conn.commit()
+        finally:
+            self._conn.close()
@@ -1,29 +1,76 @@
 import os
+import tempfile
+import contextlib
 from abc import abstractmethod
-from typing import List, Union
-import kachery_cloud as kcl
-import figurl as fig
-import uuid
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Tuple, Union
+import numpy as np
+from ..storage import StorageBackend, get_storage_backend
+from .PayloadPolicy import PayloadPolicy, contains_offset_arrays, get_default_payload_policy
+from .PublishReport import PublishReport, _serialized_num_bytes
+from .UploadCache import get_upload_cache, UnhashableDataException
+from .binary_payload import write_binary_payload
+from .chunked_arrays import contains_chunked_arrays, store_chunked_arrays
+from .compression import compress_file
+from .LazyArray import contains_lazy_arrays
+from .live import handle_jupyter_message, register_jupyter_widget
+from .quantization import contains_quantized_arrays
+from .share_arrays import extract_shared_arrays, get_shared_array_keys
+from .stream_encode import iter_encode_data, write_encoded_data
 
+# figurl (which imports kachery_cloud), simplejson, uuid, asyncio and
+# concurrent.futures are imported where they are used, so that importing
+# the views is fast
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+
+# Attributes that do not affect the view data, so setting them does not
+# mark the view as dirty
+_VIEW_BOOKKEEPING_ATTRIBUTES = set(['id', '_jupyter_widget', '_dirty', '_last_data_uri', '_last_publish_namespace', '_last_num_bytes'])
 
 class View:
     """
     Base class for all views
+
+    With incremental publishing (opt-in, url(incremental=True) or
+    FIGNEURO_INCREMENTAL_PUBLISH=1), a view remembers the data URI it was
+    last published to, and until the view changes, publishing it again
+    reuses that URI without calling to_dict() or uploading anything.
+    Setting an attribute marks the view as dirty, but changes made in
+    place (to an array, a list or a nested object) are not seen, so call
+    mark_dirty() after them or stale data is published.
     """
     def __init__(self, view_type: str, *, is_layout: bool=False, height=500) -> None:
+        self._dirty = True
+        self._last_data_uri: Union[str, None] = None
+        self._last_publish_namespace: Union[str, None] = None
+        self._last_num_bytes: int = 0
         self.type = view_type
         self.id = _random_id()
         self.is_layout = is_layout
         self._height = height
         self._jupyter_widget = None
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        if name not in _VIEW_BOOKKEEPING_ATTRIBUTES:
+            object.__setattr__(self, '_dirty', True)
     def set_id(self, id: str):
         self.id = id
+    def mark_dirty(self):
+        self._dirty = True
+    @property
+    def is_dirty(self) -> bool:
+        return self._dirty
     @abstractmethod
     def to_dict(self) -> dict:
         return {}
     @abstractmethod
     def child_views(self) -> List['View']:
         return []
+    def iter_encode(self) -> Iterator[str]:
+        # The JSON text of the view data, in chunks, without building
+        # a serialized copy of the data (see iter_encode_data)
+        return iter_encode_data(self.to_dict())
     def get_descendant_views_including_self(self):
         ret: List[View] = [self]
         for ch in self.child_views():
@@ -31,33 +78,88 @@ class View:
             for v in a:
                 ret.append(v)
         return ret
-    def url(self, *, label: str, state: Union[dict, None]=None, local: Union[bool, None]=None):
-        from .Box import Box
-        from .LayoutItem import LayoutItem
-        if self.is_layout:
-            all_views = self.get_descendant_views_including_self()
-            # set the view IDs to make the figure deterministic
-            for i, vv in enumerate(all_views):
-                vv.set_id(f'{i}')
-            data = {
-                'type': 'MainLayout',
-                'layout': self.to_dict(),
-                'views': [
-                    {
-                        'type': view.type,
-                        'viewId': view.id,
-                        'dataUri': _upload_data_and_return_uri(view.to_dict())
-                    }
-                    for view in all_views if not view.is_layout
-                ]
-            }
+    def url(self, *,
+        label: str,
+        state: Union[dict, None]=None,
+        local: Union[bool, None]=None,
+        num_workers: Union[int, None]=None,
+        use_cache: Union[bool, None]=None,
+        binary: Union[bool, None]=None,
+        compress: Union[bool, None]=None,
+        share_arrays: Union[bool, None]=None,
+        backend: Union[str, StorageBackend, None]=None,
+        report: Union[PublishReport, None]=None,
+        incremental: Union[bool, None]=None,
+        payload_policy: Union[PayloadPolicy, None]=None
+    ):
+        import figurl as fig
+        # if a report is given, timings and sizes are recorded in it
+        opts = _UploadOptions(num_workers=num_workers, use_cache=use_cache, binary=binary, compress=compress, share_arrays=share_arrays, backend=backend, report=report, incremental=incremental, payload_policy=payload_policy)
+        with _time_total(opts):
+            data = self._as_layout()._create_main_layout_data(opts=opts)
             view_url = os.getenv('FIGNEURO_VIEW_URL', 'gs://figurl/figneuro-1')
             F = fig.Figure(view_url=view_url, data=data)
             if state is not None:
                 F.set_state(state)
-            url = F.url(label=label, local=local)
-            return url
-
+            with _time_phase(opts, 'store_figure'):
+                return F.url(label=label, local=local)
+    async def url_async(self, *,
+        label: str,
+        state: Union[dict, None]=None,
+        local: Union[bool, None]=None,
+        num_workers: Union[int, None]=None,
+        use_cache: Union[bool, None]=None,
+        binary: Union[bool, None]=None,
+        compress: Union[bool, None]=None,
+        share_arrays: Union[bool, None]=None,
+        backend: Union[str, StorageBackend, None]=None,
+        report: Union[PublishReport, None]=None,
+        incremental: Union[bool, None]=None,
+        payload_policy: Union[PayloadPolicy, None]=None,
+        executor: Union['Executor', None]=None
+    ):
+        """
+        Like url(), but without blocking the event loop. The leaf views are
+        uploaded concurrently (at most num_workers at a time) through the
+        async storage interface, and serialization runs in the executor
+        (the default executor of the loop if None). The figure is the same
+        as the one that url() produces.
+        """
+        import asyncio
+        import functools
+        import figurl as fig
+        from .publish_async import create_main_layout_data_async
+        opts = _UploadOptions(num_workers=num_workers, use_cache=use_cache, binary=binary, compress=compress, share_arrays=share_arrays, backend=backend, report=report, incremental=incremental, payload_policy=payload_policy)
+        with _time_total(opts):
+            data = await create_main_layout_data_async(self._as_layout(), opts=opts, executor=executor)
+            view_url = os.getenv('FIGNEURO_VIEW_URL', 'gs://figurl/figneuro-1')
+            F = fig.Figure(view_url=view_url, data=data)
+            if state is not None:
+                F.set_state(state)
+            loop = asyncio.get_running_loop()
+            with _time_phase(opts, 'store_figure'):
+                return await loop.run_in_executor(executor, functools.partial(F.url, label=label, local=local))
+    def export_bundle(self, path: str, *,
+        label: str,
+        state: Union[dict, None]=None,
+        num_workers: Union[int, None]=None,
+        binary: Union[bool, None]=None,
+        compress: Union[bool, None]=None,
+        share_arrays: Union[bool, None]=None,
+        report: Union[PublishReport, None]=None,
+        payload_policy: Union[PayloadPolicy, None]=None
+    ):
+        """
+        Write the figure to a local directory that the figneuro-views app
+        can load without network access (see export_bundle.py)
+        """
+        from .export_bundle import export_bundle
+        return export_bundle(self._as_layout(), path, label=label, state=state, num_workers=num_workers, binary=binary, compress=compress, share_arrays=share_arrays, report=report, payload_policy=payload_policy)
+    def _as_layout(self) -> 'View':
+        from .Box import Box
+        from .LayoutItem import LayoutItem
+        if self.is_layout:
+            return self
         # Need to wrap it in a layout
         V = Box(
             direction='horizontal',
@@ -65,13 +167,47 @@ class View:
                 LayoutItem(self)
             ]
         )
-        assert V.is_layout # avoid infinite recursion
-        return V.url(label=label, state=state)
+        assert V.is_layout
+        return V
+    def _create_main_layout_data(self, *, opts: '_UploadOptions', on_view_data: Union[Callable[[Any], None], None]=None):
+        # uploads the data of all the leaf views and returns the MainLayout
+        # figure data. on_view_data (if given) is called with the data of
+        # each view that is uploaded.
+        leaf_views = self._prepare_leaf_views(opts=opts)
+        # only the views that changed since they were last published are
+        # serialized and uploaded
+        dirty_indices = _get_dirty_view_indices(leaf_views, opts=opts)
+        dirty_data_uris, dirty_num_bytes = _publish_leaf_views(leaf_views, dirty_indices, opts=opts, on_view_data=on_view_data)
+        data_uris = _set_published_data_uris(leaf_views, dirty_indices, dirty_data_uris, dirty_num_bytes, opts=opts)
+        return self._main_layout_data(leaf_views, data_uris)
+    def _prepare_leaf_views(self, *, opts: '_UploadOptions') -> List['View']:
+        all_views = self.get_descendant_views_including_self()
+        # set the view IDs to make the figure deterministic
+        for i, vv in enumerate(all_views):
+            vv.set_id(f'{i}')
+        leaf_views = [view for view in all_views if not view.is_layout]
+        if opts.report is not None:
+            for view in leaf_views:
+                opts.report.add_view(view_type=view.type, view_id=view.id)
+        return leaf_views
+    def _main_layout_data(self, leaf_views: List['View'], data_uris: List[str]):
+        return {
+            'type': 'MainLayout',
+            'layout': self.to_dict(),
+            'views': [
+                {
+                    'type': view.type,
+                    'viewId': view.id,
+                    'dataUri': data_uri
+                }
+                for view, data_uri in zip(leaf_views, data_uris)
+            ]
+        }
     def jupyter(self, *, height: Union[int, None]=None):
         if height is None:
             height = self._height
         import figurl_jupyter as fj
-        url = self.url(label='jupyter', local=True, electron=False, listen_port=None)
+        url = self.url(label='jupyter', local=True)
         a = _parse_figurl_url(url)
         view_uri = a['v']
         data_uri = a['d']
@@ -94,12 +230,352 @@ class View:
         display(ipywidget)
     def _set_jupyter_widget(self, W):
         self._jupyter_widget = W
+        register_jupyter_widget(W)
         W.on_message_from_frontend(lambda message: self._on_message(message))
+    def _on_message(self, message: Any):
+        handle_jupyter_message(self._jupyter_widget, message)
+
+class _UploadOptions:
+    """
+    Options for uploading view data, with defaults from environment variables
+    """
+    def __init__(self, *,
+        local: bool=False,
+        num_workers: Union[int, None]=None,
+        use_cache: Union[bool, None]=None,
+        binary: Union[bool, None]=None,
+        compress: Union[bool, None]=None,
+        share_arrays: Union[bool, None]=None,
+        streaming: Union[bool, None]=None,
+        backend: Union[str, StorageBackend, None]=None,
+        report: Union[PublishReport, None]=None,
+        incremental: Union[bool, None]=None,
+        payload_policy: Union[PayloadPolicy, None]=None
+    ) -> None:
+        # The store that the data is uploaded to ('kachery' by default,
+        # see get_storage_backend)
+        self.backend = get_storage_backend(backend, local=local)
+        # The number of concurrent uploads. Use 1 to upload serially.
+        self.num_workers = num_workers if num_workers is not None else int(os.getenv('FIGNEURO_UPLOAD_NUM_WORKERS', '4'))
+        if self.num_workers < 1:
+            raise Exception(f'Invalid number of upload workers: {self.num_workers}')
+        # Unless the cache is disabled, data that was already stored is not
+        # serialized or uploaded again
+        self.use_cache = use_cache if use_cache is not None else os.getenv('FIGNEURO_UPLOAD_CACHE', '1') != '0'
+        # The binary payload format is opt-in
+        self.binary = binary if binary is not None else os.getenv('FIGNEURO_BINARY_PAYLOAD', '0') == '1'
+        # Compressing the view data (with deflate) is opt-in
+        self.compress = compress if compress is not None else os.getenv('FIGNEURO_COMPRESS', '0') == '1'
+        # Storing arrays that are shared between views only once is opt-in
+        self.share_arrays = share_arrays if share_arrays is not None else os.getenv('FIGNEURO_SHARE_ARRAYS', '0') == '1'
+        self.shared_array_min_num_bytes = int(os.getenv('FIGNEURO_SHARED_ARRAY_MIN_NUM_BYTES', '1024'))
+        # JSON data is encoded in chunks straight to a file unless disabled
+        self.streaming = streaming if streaming is not None else os.getenv('FIGNEURO_STREAMING_ENCODE', '1') != '0'
+        # Instrumentation is opt-in
+        self.report = report
+        # Skipping the views that were not marked dirty since they were last
+        # published with the same options is opt-in, because changes made
+        # in place are not seen (see View). Without it, unchanged data is
+        # still not stored again thanks to the upload cache.
+        self.incremental = incremental if incremental is not None else os.getenv('FIGNEURO_INCREMENTAL_PUBLISH', '0') == '1'
+        # Down-casting of arrays and the payload budget (see PayloadPolicy)
+        self.payload_policy = payload_policy if payload_policy is not None else get_default_payload_policy()
+    def publish_namespace(self) -> str:
+        # the data URI of a view depends on these options
+        return f'{self.backend.cache_namespace()}|binary={self.binary}|compress={self.compress}|shareArrays={self.share_arrays}|{self.payload_policy.namespace()}'
+
+def _upload_data_and_return_uri(data, *, local: bool=False, use_cache: Union[bool, None]=None, binary: Union[bool, None]=None, compress: Union[bool, None]=None, backend: Union[str, StorageBackend, None]=None):
+    opts = _UploadOptions(local=local, use_cache=use_cache, binary=binary, compress=compress, backend=backend)
+    return _upload_view_data_and_return_uri(data, opts=opts)
+
+def _get_dirty_view_indices(leaf_views: List[View], *, opts: _UploadOptions) -> List[int]:
+    if not opts.incremental:
+        return list(range(len(leaf_views)))
+    namespace = opts.publish_namespace()
+    ret: List[int] = []
+    for ii, view in enumerate(leaf_views):
+        if view.is_dirty or view._last_data_uri is None or view._last_publish_namespace != namespace:
+            ret.append(ii)
+        elif opts.report is not None:
+            opts.report.set_unchanged(ii)
+    return ret
+
+def _set_published_data_uris(leaf_views: List[View], dirty_indices: List[int], dirty_data_uris: List[str], dirty_num_bytes: List[int], *, opts: _UploadOptions) -> List[str]:
+    # remembers the data URIs of the views that were uploaded and
+    # returns the data URIs of all the views
+    namespace = opts.publish_namespace()
+    for ii, data_uri, num_bytes in zip(dirty_indices, dirty_data_uris, dirty_num_bytes):
+        view = leaf_views[ii]
+        view._last_data_uri = data_uri
+        view._last_publish_namespace = namespace
+        view._last_num_bytes = num_bytes
+        view._dirty = False
+    return [view._last_data_uri for view in leaf_views]
+
+def _leaf_view_to_dict(view: View, view_index: int, *, opts: _UploadOptions):
+    report_view_index = view_index if opts.report is not None else None
+    with _time_phase(opts, 'to_dict', view_index=report_view_index):
+        data = view.to_dict()
+    with _time_phase(opts, 'payload_policy', view_index=report_view_index):
+        return opts.payload_policy.apply(data)
+
+def _publish_leaf_views(leaf_views: List[View], dirty_indices: List[int], *, opts: _UploadOptions, on_view_data: Union[Callable[[Any], None], None]=None) -> Tuple[List[str], List[int]]:
+    # returns the data URIs and the sizes of the dirty views
+    if _needs_all_view_datas(opts):
+        dirty_datas = _map_with_workers(lambda ii: _leaf_view_to_dict(leaf_views[ii], ii, opts=opts), dirty_indices, num_workers=opts.num_workers)
+        dirty_num_bytes = _check_payload_budget(leaf_views, dirty_indices, dirty_datas, opts=opts)
+        if on_view_data is not None:
+            for data in dirty_datas:
+                on_view_data(data)
+        dirty_data_uris = _upload_view_data_and_return_uris(dirty_datas, opts=opts, view_indices=dirty_indices)
+        return dirty_data_uris, dirty_num_bytes
+    # Otherwise each view is serialized and uploaded by one worker, and
+    # its data is dropped once it is stored, so that at most num_workers
+    # views are held in memory at a time.
+    def publish(ii: int):
+        data = _leaf_view_to_dict(leaf_views[ii], ii, opts=opts)
+        if on_view_data is not None:
+            on_view_data(data)
+        uri = _upload_view_data_and_return_uri(data, opts=opts, view_index=ii if opts.report is not None else None)
+        return uri, _serialized_num_bytes(data, binary=opts.binary)
+    results = _map_with_workers(publish, dirty_indices, num_workers=opts.num_workers)
+    return [a[0] for a in results], [a[1] for a in results]
+
+def _needs_all_view_datas(opts: _UploadOptions) -> bool:
+    # the arrays shared between views are found in the data of all the
+    # views, and the payload budget is checked before anything is uploaded
+    return opts.share_arrays or opts.payload_policy.max_num_bytes is not None
+
+def _check_payload_budget(leaf_views: List[View], dirty_indices: List[int], dirty_datas: List[Any], *, opts: _UploadOptions) -> List[int]:
+    # checks the size of the figure (before anything is uploaded) and
+    # returns the sizes of the views that are uploaded
+    dirty_num_bytes = [_serialized_num_bytes(data, binary=opts.binary) for data in dirty_datas]
+    dirty_index_set = set(dirty_indices)
+    clean_num_bytes = sum([view._last_num_bytes for ii, view in enumerate(leaf_views) if ii not in dirty_index_set])
+    opts.payload_policy.check_budget(sum(dirty_num_bytes) + clean_num_bytes)
+    return dirty_num_bytes
+
+def _upload_view_data_and_return_uri(data, *, opts: _UploadOptions, shared_array_uris: Union[Dict[str, str], None]=None, view_index: Union[int, None]=None):
+    data = _upload_chunked_arrays(data, opts=opts, view_index=view_index)
+    cache_key, uri, shared_array_uris_for_view = _look_up_view_data(data, opts=opts, shared_array_uris=shared_array_uris, view_index=view_index)
+    if uri is not None:
+        return uri
+    with tempfile.TemporaryDirectory() as tmpdir:
+        payload_uri = None
+        if opts.binary or opts.compress:
+            if opts.binary:
+                fname = _write_binary_payload_file(data, tmpdir=tmpdir, opts=opts, view_index=view_index)
+            else:
+                fname = _write_data_json_file(data, tmpdir=tmpdir, opts=opts, view_index=view_index)
+            if opts.compress:
+                fname = _compress_payload_file(fname, opts=opts, view_index=view_index)
+            payload_uri = _store_file(fname, label=os.path.basename(fname), opts=opts, view_index=view_index)
+        document = _view_data_document(data, payload_uri=payload_uri, shared_array_uris=shared_array_uris_for_view, opts=opts)
+        fname = _write_data_json_file(document, tmpdir=tmpdir, opts=opts, view_index=view_index)
+        uri = _store_file(fname, label=None, opts=opts, view_index=view_index)
+    if cache_key is not None:
+        get_upload_cache().set(cache_key, uri)
+    return uri
+
+def _look_up_view_data(data, *, opts: _UploadOptions, shared_array_uris: Union[Dict[str, str], None], view_index: Union[int, None]):
+    # returns the cache key, the URI if the data was already stored, and
+    # the shared arrays referenced by this view
+    if opts.report is not None and view_index is not None:
+        opts.report.record_view_data(view_index, data, binary=opts.binary)
+    shared_array_uris_for_view = {
+        key: shared_array_uris[key]
+        for key in get_shared_array_keys(data)
+    } if shared_array_uris else {}
+    with _time_phase(opts, 'hash', view_index=view_index):
+        cache_key = _get_cache_key({'data': data, 'sharedArrays': shared_array_uris_for_view}, opts=opts, namespace=f'binary={opts.binary}|compress={opts.compress}')
+        uri = _get_cached_uri(cache_key, opts=opts)
+    if uri is not None and opts.report is not None:
+        opts.report.set_cache_hit(view_index)
+    return cache_key, uri, shared_array_uris_for_view
+
+def _view_data_document(data, *, payload_uri: Union[str, None], shared_array_uris: Dict[str, str], opts: _UploadOptions):
+    # the document that is stored at the data URI of the view
+    if payload_uri is not None:
+        # The view data becomes a small JSON document pointing to the
+        # binary container or the compressed JSON. The figneuro-views app
+        # loads the payload and renders the original view.
+        envelope = {
+            'type': 'figneuro.Payload',
+            'encoding': 'binary' if opts.binary else 'json',
+            'payloadUri': payload_uri
+        }
+        if opts.compress:
+            envelope['compression'] = 'deflate'
+    elif shared_array_uris or contains_offset_arrays(data) or contains_quantized_arrays(data) or contains_chunked_arrays(data):
+        # the figneuro-views app resolves the shared array references and
+        # the offset, quantized and chunked arrays before rendering the view
+        envelope = {
+            'type': 'figneuro.Payload',
+            'encoding': 'json',
+            'data': data
+        }
+    else:
+        return data
+    if shared_array_uris:
+        envelope['sharedArrays'] = shared_array_uris
+    return envelope
+
+def _compress_payload_file(fname: str, *, opts: _UploadOptions, view_index: Union[int, None]=None):
+    compressed_fname = f'{fname}.z'
+    with _time_phase(opts, 'compress', view_index=view_index):
+        compress_file(fname, compressed_fname)
+    return compressed_fname
+
+def _write_binary_payload_file(data, *, tmpdir: str, opts: _UploadOptions, view_index: Union[int, None]=None):
+    fname = f'{tmpdir}/data.fnbp'
+    with _time_phase(opts, 'serialize', view_index=view_index):
+        with open(fname, 'wb') as f:
+            write_binary_payload(data, f)
+    return fname
+
+def _write_data_json_file(data, *, tmpdir: str, opts: _UploadOptions, view_index: Union[int, None]=None):
+    fname = f'{tmpdir}/data.json'
+    with _time_phase(opts, 'serialize', view_index=view_index):
+        if opts.streaming or contains_lazy_arrays(data):
+            # Write the JSON text to the file in chunks, so that neither a serialized
+            # copy of the data nor the full text is held in memory (lazy
+            # arrays are only ever read in chunks)
+            with open(fname, 'w') as f:
+                write_encoded_data(data, f)
+        else:
+            import figurl as fig
+            import simplejson
+            with open(fname, 'w') as f:
+                f.write(simplejson.dumps(fig.serialize_data(data, allow_float64=True), separators=(',', ':'), indent=None, allow_nan=False, sort_keys=True))
+    return fname
+
+def _store_file(fname: str, *, label: Union[str, None], opts: _UploadOptions, view_index: Union[int, None]=None):
+    with _time_phase(opts, 'store', view_index=view_index):
+        uri = opts.backend.store_file(fname, label=label)
+    if opts.report is not None:
+        opts.report.add_stored_bytes(os.path.getsize(fname), view_index=view_index)
+    return uri
+
+def _time_total(opts: _UploadOptions):
+    if opts.report is None:
+        return contextlib.nullcontext()
+    return opts.report.time_total()
+
+def _time_phase(opts: _UploadOptions, phase: str, *, view_index: Union[int, None]=None):
+    if opts.report is None:
+        return contextlib.nullcontext()
+    return opts.report.time_phase(phase, view_index=view_index)
+
+def _upload_shared_arrays_and_return_uris(shared_arrays: Dict[str, np.ndarray], *, opts: _UploadOptions) -> Dict[str, str]:
+    # There are often many small shared arrays, so the ones that are not
+    # already in the upload cache are stored with a single put_many call
+    ret, cache_keys = _look_up_shared_arrays(shared_arrays, opts=opts)
+    keys_to_store = [key for key in shared_arrays.keys() if key not in ret]
+    if len(keys_to_store) > 0:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            files = _write_shared_array_files(shared_arrays, keys_to_store, tmpdir=tmpdir)
+            uris = opts.backend.put_many(files)
+        _set_shared_array_uris(ret, cache_keys, keys_to_store, uris)
+    return ret
+
+def _upload_chunked_arrays(data, *, opts: _UploadOptions, view_index: Union[int, None]=None):
+    # Each ChunkedArray is replaced by an index of its chunks. The chunks
+    # are stored (and cached) the same way as shared arrays, num_workers
+    # at a time as they are read, so that a lazy source is never held in
+    # memory.
+    if not contains_chunked_arrays(data):
+        return data
+    with _time_phase(opts, 'chunked_arrays', view_index=view_index):
+        return store_chunked_arrays(
+            data,
+            payload_policy=opts.payload_policy,
+            store_chunks=lambda chunks: _upload_shared_arrays_and_return_uris(chunks, opts=opts),
+            batch_size=opts.num_workers
+        )
+
+def _look_up_shared_arrays(shared_arrays: Dict[str, np.ndarray], *, opts: _UploadOptions):
+    ret: Dict[str, str] = {}
+    cache_keys: Dict[str, Union[str, None]] = {}
+    for key, array in shared_arrays.items():
+        cache_keys[key] = _get_cache_key(array, opts=opts, namespace='sharedArray')
+        uri = _get_cached_uri(cache_keys[key], opts=opts)
+        if uri is not None:
+            ret[key] = uri
+    return ret, cache_keys
+
+def _write_shared_array_files(shared_arrays: Dict[str, np.ndarray], keys: List[str], *, tmpdir: str):
+    files: List[Tuple[str, Union[str, None]]] = []
+    for ii, key in enumerate(keys):
+        fname = f'{tmpdir}/array{ii}.fnbp'
+        with open(fname, 'wb') as f:
+            write_binary_payload(shared_arrays[key], f)
+        files.append((fname, 'array.fnbp'))
+    return files
+
+def _set_shared_array_uris(ret: Dict[str, str], cache_keys: Dict[str, Union[str, None]], keys: List[str], uris: List[str]):
+    for key, uri in zip(keys, uris):
+        ret[key] = uri
+        if cache_keys[key] is not None:
+            get_upload_cache().set(cache_keys[key], uri)
+
+def _get_cached_uri(cache_key: Union[str, None], *, opts: _UploadOptions) -> Union[str, None]:
+    # A cache hit is only used if the file is still in the store (a local
+    # store directory may have been deleted since). Otherwise the data is
+    # stored again and the entry is replaced.
+    if cache_key is None:
+        return None
+    uri = get_upload_cache().get(cache_key)
+    if uri is not None and not opts.backend.has_file(uri):
+        return None
+    return uri
+
+def _get_cache_key(data, *, opts: _UploadOptions, namespace: str) -> Union[str, None]:
+    if not opts.use_cache:
+        return None
+    try:
+        # the backend namespace makes sure URIs from different stores are
+        # never mixed up
+        return get_upload_cache().key_for(data, namespace=f'{opts.backend.cache_namespace()}|{namespace}')
+    except UnhashableDataException:
+        return None
+
+def _upload_view_data_and_return_uris(datas: List[Any], *, opts: _UploadOptions, view_indices: Union[List[int], None]=None):
+    # view_indices are the indices of the views in the publish report
+    shared_array_uris: Dict[str, str] = {}
+    if opts.share_arrays:
+        # arrays that appear in more than one view are stored only once
+        with _time_phase(opts, 'share_arrays'):
+            datas, shared_arrays = extract_shared_arrays(datas, min_num_bytes=opts.shared_array_min_num_bytes)
+            shared_array_uris = _upload_shared_arrays_and_return_uris(shared_arrays, opts=opts)
+        _record_shared_arrays(shared_arrays, opts=opts)
+    return _map_with_workers(
+        lambda ii: _upload_view_data_and_return_uri(datas[ii], opts=opts, shared_array_uris=shared_array_uris, view_index=_report_view_index(ii, view_indices, opts=opts)),
+        list(range(len(datas))),
+        num_workers=opts.num_workers
+    )
+
+def _report_view_index(ii: int, view_indices: Union[List[int], None], *, opts: _UploadOptions):
+    if opts.report is None:
+        return None
+    return view_indices[ii] if view_indices is not None else ii
+
+def _record_shared_arrays(shared_arrays: Dict[str, np.ndarray], *, opts: _UploadOptions):
+    if opts.report is not None:
+        opts.report.num_shared_arrays = len(shared_arrays)
+        opts.report.shared_array_num_bytes = sum([a.nbytes for a in shared_arrays.values()])
 
-def _upload_data_and_return_uri(data, *, local: bool=False):
-    return kcl.store_json(fig.serialize_data(data), local=local)
+def _map_with_workers(func: Callable[[Any], Any], items: List[Any], *, num_workers: int):
+    num_workers = min(num_workers, len(items))
+    if num_workers <= 1:
+        return [func(item) for item in items]
+    from concurrent.futures import ThreadPoolExecutor
+    # executor.map returns the results in the order of the items,
+    # so the figure stays deterministic
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        return list(executor.map(func, items))
 
 def _random_id():
+    import uuid
     return str(uuid.uuid4())[-12:]
 
 def _parse_figurl_url(uri: str):
@@ -1,9 +1,39 @@
-from .View import View
-from .Box import Box
-from .LayoutItem import LayoutItem
-from .Markdown import Markdown
-from .MountainLayout import MountainLayout, MountainLayoutItem
-from .Splitter import Splitter
-from .TabLayout import TabLayout, TabLayoutItem
-from .TimeseriesGraph import TimeseriesGraph
-from .Empty import Empty
\ No newline at end of file
+from typing import TYPE_CHECKING
+from .._lazy_exports import lazy_exports
+
+
+# The submodules are imported when a name is first accessed, so that
+# importing the package does not import all the views and their dependencies
+lazy_exports(__name__, {
+    'View': 'View',
+    'Box': 'Box',
+    'LayoutItem': 'LayoutItem',
+    'Markdown': 'Markdown',
+    'MountainLayout': 'MountainLayout',
+    'MountainLayoutItem': 'MountainLayout',
+    'Splitter': 'Splitter',
+    'TabLayout': 'TabLayout',
+    'TabLayoutItem': 'TabLayout',
+    'TimeseriesGraph': 'TimeseriesGraph',
+    'Empty': 'Empty',
+    'ChunkedArray': 'ChunkedArray',
+    'LazyArray': 'LazyArray',
+    'PayloadPolicy': 'PayloadPolicy',
+    'PublishReport': 'PublishReport',
+    'ViewPublishReport': 'PublishReport'
+})
+
+if TYPE_CHECKING:
+    from .View import View
+    from .Box import Box
+    from .LayoutItem import LayoutItem
+    from .Markdown import Markdown
+    from .MountainLayout import MountainLayout, MountainLayoutItem
+    from .Splitter import Splitter
+    from .TabLayout import TabLayout, TabLayoutItem
+    from .TimeseriesGraph import TimeseriesGraph
+    from .Empty import Empty
+    from .ChunkedArray import ChunkedArray
+    from .LazyArray import LazyArray
+    from .PayloadPolicy import PayloadPolicy
+    from .PublishReport import PublishReport, ViewPublishReport
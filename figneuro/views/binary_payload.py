@@ -0,0 +1,117 @@
+import json
+import struct
+import numpy as np
+from typing import Any, BinaryIO, List, Union
+from .LazyArray import LazyArray
+
+
+# Binary payload container (version 1)
+#
+#   magic           8 bytes     b'FNBP0001'
+#   header length   4 bytes     uint32, little-endian
+#   header          JSON text (utf-8)
+#   padding         zeros up to the next multiple of 8 bytes
+#   array buffers   little-endian array data, each starting at a multiple of 8 bytes
+#
+# The header is {"data": ..., "arrays": [...]}. Every numpy array in the data is
+# replaced by {"_type": "ndarrayRef", "index": i} and arrays[i] is
+# {"dtype": ..., "shape": [...], "offset": ..., "byteLength": ...} where offset
+# is relative to the start of the (aligned) array buffers section.
+
+BINARY_PAYLOAD_MAGIC = b'FNBP0001'
+_ALIGNMENT = 8
+_SUPPORTED_DTYPES = ['int8', 'uint8', 'int16', 'uint16', 'int32', 'uint32', 'float32', 'float64']
+
+def write_binary_payload(data: Any, f: BinaryIO):
+    arrays: List[Union[np.ndarray, LazyArray]] = []
+    header_data = _replace_arrays_by_refs(data, arrays, label='')
+    array_infos = []
+    pos = 0
+    for a in arrays:
+        array_infos.append({
+            'dtype': a.dtype.name,
+            'shape': list(a.shape),
+            'offset': pos,
+            'byteLength': a.nbytes
+        })
+        pos = _align(pos + a.nbytes)
+    header_bytes = json.dumps(
+        {'data': header_data, 'arrays': array_infos},
+        separators=(',', ':'), indent=None, allow_nan=False, sort_keys=True
+    ).encode('utf-8')
+    f.write(BINARY_PAYLOAD_MAGIC)
+    f.write(struct.pack('<I', len(header_bytes)))
+    f.write(header_bytes)
+    _write_padding(f, len(BINARY_PAYLOAD_MAGIC) + 4 + len(header_bytes))
+    for a in arrays:
+        if isinstance(a, LazyArray):
+            # read from the source one chunk at a time
+            for chunk in a.iter_chunks():
+                f.write(memoryview(_little_endian_contiguous(chunk)).cast('B'))
+        else:
+            # written straight from the array memory
+            f.write(memoryview(a).cast('B'))
+        _write_padding(f, a.nbytes)
+
+def read_binary_payload(buf: bytes) -> Any:
+    if buf[:len(BINARY_PAYLOAD_MAGIC)] != BINARY_PAYLOAD_MAGIC:
+        raise Exception('Not a figneuro binary payload')
+    header_start = len(BINARY_PAYLOAD_MAGIC) + 4
+    header_length = struct.unpack('<I', buf[len(BINARY_PAYLOAD_MAGIC):header_start])[0]
+    header = json.loads(buf[header_start:header_start + header_length].decode('utf-8'))
+    data_start = _align(header_start + header_length)
+    arrays = []
+    for info in header['arrays']:
+        dtype = np.dtype(info['dtype']).newbyteorder('<')
+        a = np.frombuffer(buf, dtype=dtype, count=info['byteLength'] // dtype.itemsize, offset=data_start + info['offset'])
+        arrays.append(a.reshape(info['shape']))
+    return _replace_refs_by_arrays(header['data'], arrays)
+
+def _replace_arrays_by_refs(x: Any, arrays: List[Union[np.ndarray, LazyArray]], *, label: str):
+    if isinstance(x, np.integer):
+        return int(x)
+    elif isinstance(x, np.floating):
+        return float(x)
+    elif isinstance(x, dict):
+        ret = {}
+        for key, val in x.items():
+            if not isinstance(key, str):
+                raise Exception(f'Binary payload: keys must be string not {str(type(key))}: {label}')
+            ret[key] = _replace_arrays_by_refs(val, arrays, label=f'{label}.{key}')
+        return ret
+    elif isinstance(x, (list, tuple)):
+        return [_replace_arrays_by_refs(val, arrays, label=f'{label}[{ii}]') for ii, val in enumerate(x)]
+    elif isinstance(x, np.ndarray):
+        if x.dtype.name not in _SUPPORTED_DTYPES:
+            raise Exception(f'Unable to write numpy array with dtype {x.dtype.name} to binary payload: {label}')
+        arrays.append(_little_endian_contiguous(x))
+        return {'_type': 'ndarrayRef', 'index': len(arrays) - 1}
+    elif isinstance(x, LazyArray):
+        if x.dtype.name not in _SUPPORTED_DTYPES:
+            raise Exception(f'Unable to write lazy array with dtype {x.dtype.name} to binary payload: {label}')
+        arrays.append(x)
+        return {'_type': 'ndarrayRef', 'index': len(arrays) - 1}
+    else:
+        return x
+
+def _replace_refs_by_arrays(x: Any, arrays: List[np.ndarray]):
+    if isinstance(x, dict):
+        if x.get('_type', None) == 'ndarrayRef':
+            return arrays[x['index']]
+        return {key: _replace_refs_by_arrays(val, arrays) for key, val in x.items()}
+    elif isinstance(x, list):
+        return [_replace_refs_by_arrays(val, arrays) for val in x]
+    else:
+        return x
+
+def _little_endian_contiguous(x: np.ndarray):
+    # this does not copy unless the array is non-contiguous or big-endian
+    return np.ascontiguousarray(x).astype(x.dtype.newbyteorder('<'), copy=False)
+
+def _write_padding(f: BinaryIO, num_bytes_written: int):
+    num_padding_bytes = _align(num_bytes_written) - num_bytes_written
+    if num_padding_bytes > 0:
+        f.write(b'\0' * num_padding_bytes)
+
+def _align(pos: int):
+    return ((pos + _ALIGNMENT - 1) // _ALIGNMENT) * _ALIGNMENT
@@ -0,0 +1,144 @@
+from typing import Any, Callable, Dict, Generator, List, Tuple, Union
+import numpy as np
+from .ChunkedArray import ChunkedArray
+from .PayloadPolicy import PayloadPolicy
+from .share_arrays import _array_hash
+
+
+# A ChunkedArray in the view data is published as
+#
+#   {"_type": "chunkedArray", "dtype": ..., "shape": [...], "axis": ...,
+#    "scale"?: ..., "offset"?: ..., "chunks": [{"uri": ..., "start": ...,
+#    "end": ..., "tStart"?: ..., "tEnd"?: ...}, ...]}
+#
+# where each chunk is stored as a binary payload containing the entries
+# start..end along axis, and tStart/tEnd are the times of the first and
+# last entries. If the array was down-cast relative to an offset (see
+# PayloadPolicy), the offset is added to every chunk when it is loaded.
+# Quantized values are multiplied by the scale before the offset is added.
+
+def contains_chunked_arrays(x: Any) -> bool:
+    if isinstance(x, ChunkedArray):
+        return True
+    elif isinstance(x, dict):
+        if x.get('_type', None) == 'chunkedArray':
+            return True
+        return any([contains_chunked_arrays(v) for v in x.values()])
+    elif isinstance(x, (list, tuple)):
+        return any([contains_chunked_arrays(v) for v in x])
+    return False
+
+def store_chunked_arrays(
+    data: Any,
+    *,
+    payload_policy: PayloadPolicy,
+    store_chunks: Callable[[Dict[str, np.ndarray]], Dict[str, str]],
+    batch_size: int=1
+) -> Any:
+    """
+    Replace each ChunkedArray in the view data by its index
+
+    The chunks are stored as they are read: store_chunks is called with
+    batches of at most batch_size chunks by content hash and returns their
+    URIs by hash. Only the current batch is held in memory, so a lazy
+    source is never loaded as a whole.
+    """
+    steps = iter_chunk_batches(data, payload_policy=payload_policy, batch_size=batch_size)
+    uris = None
+    while True:
+        done, x = next_chunk_batch(steps, uris)
+        if done:
+            return x
+        uris = store_chunks(x)
+
+def iter_chunk_batches(data: Any, *, payload_policy: PayloadPolicy, batch_size: int=1) -> Generator[Dict[str, np.ndarray], Dict[str, str], Any]:
+    """
+    The steps of store_chunked_arrays, for callers that store the chunks
+    themselves (for example from an event loop): yields the batches of
+    chunks by hash, is sent their URIs by hash, and returns the view data
+    with the indexes
+    """
+    batches = _ChunkBatches(batch_size=batch_size)
+    ret = yield from _extract_chunks(data, batches=batches, payload_policy=payload_policy)
+    yield from batches.flush()
+    return ret
+
+def next_chunk_batch(steps: Generator[Dict[str, np.ndarray], Dict[str, str], Any], uris: Union[Dict[str, str], None]) -> Tuple[bool, Any]:
+    """
+    Send the URIs of the last batch (None at first) to iter_chunk_batches
+    and return (False, the next batch), or (True, the view data) once all
+    the chunks are stored
+    """
+    try:
+        return False, steps.send(uris)
+    except StopIteration as e:
+        return True, e.value
+
+class _ChunkBatches:
+    def __init__(self, *, batch_size: int) -> None:
+        self._batch_size = max(batch_size, 1)
+        self._chunks: Dict[str, np.ndarray] = {}
+        # the chunk infos waiting for the URI of their chunk
+        self._pending: List[Tuple[str, Dict[str, Any]]] = []
+    def add(self, chunk: np.ndarray, info: Dict[str, Any]):
+        key = _array_hash(chunk)
+        self._chunks[key] = chunk
+        self._pending.append((key, info))
+        if len(self._chunks) >= self._batch_size:
+            yield from self.flush()
+    def flush(self):
+        if len(self._pending) == 0:
+            return
+        uris = yield self._chunks
+        for key, info in self._pending:
+            info['uri'] = uris[key]
+        self._chunks = {}
+        self._pending = []
+
+def _extract_chunks(x: Any, *, batches: _ChunkBatches, payload_policy: PayloadPolicy):
+    if isinstance(x, ChunkedArray):
+        return (yield from _chunked_array_index(x, batches=batches, payload_policy=payload_policy))
+    elif isinstance(x, dict):
+        ret = {}
+        for key, val in x.items():
+            ret[key] = yield from _extract_chunks(val, batches=batches, payload_policy=payload_policy)
+        return ret
+    elif isinstance(x, (list, tuple)):
+        ret_list = []
+        for val in x:
+            ret_list.append((yield from _extract_chunks(val, batches=batches, payload_policy=payload_policy)))
+        return ret_list
+    return x
+
+def _chunked_array_index(x: ChunkedArray, *, batches: _ChunkBatches, payload_policy: PayloadPolicy):
+    # the whole array is down-cast at once, so that all the chunks have
+    # the same dtype and offset
+    data = payload_policy.apply(x.data) if x.scale is None else x.data
+    offset = None
+    if isinstance(data, dict):
+        offset = data['offset']
+        data = data['data']
+    if x.scale is not None:
+        offset = x.offset
+    y = ChunkedArray(data, times=x.times, axis=x.axis, chunk_size=x.chunk_size)
+    chunk_infos = []
+    for ii in range(y.num_chunks):
+        start, end = y.chunk_range(ii)
+        info: Dict[str, Any] = {'start': start, 'end': end}
+        time_bounds = y.time_bounds(ii)
+        if time_bounds is not None:
+            info['tStart'], info['tEnd'] = time_bounds
+        chunk_infos.append(info)
+        yield from batches.add(y.get_chunk(ii), info)
+    ret: Dict[str, Any] = {
+        '_type': 'chunkedArray',
+        'dtype': data.dtype.name,
+        'shape': [int(n) for n in data.shape],
+        'axis': x.axis,
+        'chunks': chunk_infos
+    }
+    if x.scale is not None:
+        ret['scale'] = float(x.scale)
+    if offset is not None:
+        ret['offset'] = offset
+    return ret
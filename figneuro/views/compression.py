@@ -0,0 +1,112 @@
+import os
+import json
+import zlib
+import struct
+import tempfile
+from typing import Any, List, Tuple, Union
+from ..storage import StorageBackend, get_storage_backend
+
+
+# Compressed figure files use deflate in the zlib format (RFC 1950), which
+# the browser decodes with DecompressionStream('deflate').
+
+COMPRESSED_JSONL_MAGIC = b'FNZJSONL'
+_DEFAULT_LEVEL = 6
+_READ_CHUNK_NUM_BYTES = 2**20
+
+def compress_file(input_fname: str, output_fname: str, *, level: int=_DEFAULT_LEVEL):
+    """
+    Compress a file in chunks, so the whole file is never held in memory
+    """
+    c = zlib.compressobj(level)
+    with open(input_fname, 'rb') as fin, open(output_fname, 'wb') as fout:
+        while True:
+            chunk = fin.read(_READ_CHUNK_NUM_BYTES)
+            if not chunk:
+                break
+            fout.write(c.compress(chunk))
+        fout.write(c.flush())
+
+# Compressed JSONL container (version 1)
+#
+#   magic           8 bytes     b'FNZJSONL'
+#   header length   4 bytes     uint32, little-endian
+#   header          JSON text (utf-8)
+#   blocks          zlib-compressed blocks of records
+#
+# The header is {"version": 1, "codec": "deflate", "header": <the header
+# record of the JSONL text>, "numRecords": n, "blocks": [[firstRecord,
+# offset, byteLength], ...]} where offset is relative to the end of the
+# header. Each block holds consecutive records separated by '\n', so a
+# record is read by fetching and decompressing a single block.
+
+def compress_jsonl_text(text: str, *, block_num_bytes: int=2**16, level: int=_DEFAULT_LEVEL) -> bytes:
+    """
+    Convert a JSONL text (a header record followed by one record per line,
+    as created by create_annotations_jsonl_text) to a compressed container
+
+    Records are grouped into blocks of about block_num_bytes of text.
+    """
+    lines = text.split('\n')
+    header_record = json.loads(lines[0])
+    records = lines[1:]
+    blocks: List[Tuple[int, bytes]] = []
+    first_record = 0
+    while first_record < len(records):
+        num_bytes = 0
+        end_record = first_record
+        while end_record < len(records) and (end_record == first_record or num_bytes + len(records[end_record]) <= block_num_bytes):
+            num_bytes += len(records[end_record]) + 1
+            end_record += 1
+        block_text = '\n'.join(records[first_record:end_record])
+        blocks.append((first_record, zlib.compress(block_text.encode('utf-8'), level)))
+        first_record = end_record
+    block_infos = []
+    offset = 0
+    for first_record, b in blocks:
+        block_infos.append([first_record, offset, len(b)])
+        offset += len(b)
+    header_bytes = json.dumps({
+        'version': 1,
+        'codec': 'deflate',
+        'header': header_record,
+        'numRecords': len(records),
+        'blocks': block_infos
+    }, separators=(',', ':'), indent=None, allow_nan=False, sort_keys=True).encode('utf-8')
+    return b''.join(
+        [COMPRESSED_JSONL_MAGIC, struct.pack('<I', len(header_bytes)), header_bytes] +
+        [b for _, b in blocks]
+    )
+
+def read_compressed_jsonl(buf: bytes) -> Tuple[Any, List[Any]]:
+    """
+    Read a compressed JSONL container, returning the header record and
+    the records
+    """
+    if buf[:len(COMPRESSED_JSONL_MAGIC)] != COMPRESSED_JSONL_MAGIC:
+        raise Exception('Not a compressed JSONL file')
+    header_start = len(COMPRESSED_JSONL_MAGIC) + 4
+    header_length = struct.unpack('<I', buf[len(COMPRESSED_JSONL_MAGIC):header_start])[0]
+    header = json.loads(buf[header_start:header_start + header_length].decode('utf-8'))
+    data_start = header_start + header_length
+    records: List[Any] = []
+    for _, offset, byte_length in header['blocks']:
+        block_text = zlib.decompress(buf[data_start + offset:data_start + offset + byte_length]).decode('utf-8')
+        records.extend([json.loads(line) for line in block_text.split('\n')])
+    return header['header'], records
+
+def store_jsonl_text(text: str, *, label: str, backend: Union[str, StorageBackend, None]=None, compress: Union[bool, None]=None) -> str:
+    """
+    Store a JSONL text, as a compressed container if compress is True
+    (by default if the FIGNEURO_COMPRESS environment variable is 1)
+    """
+    if compress is None:
+        compress = os.getenv('FIGNEURO_COMPRESS', '0') == '1'
+    b = get_storage_backend(backend)
+    if not compress:
+        return b.store_text(text, label=label)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fname = f'{tmpdir}/file.dat'
+        with open(fname, 'wb') as f:
+            f.write(compress_jsonl_text(text))
+        return b.store_file(fname, label=f'{label}.z')
@@ -0,0 +1,86 @@
+from typing import List, Tuple, Union
+import numpy as np
+from .LazyArray import LazyArray
+
+
+# For series that are read from a lazy source, the finest levels (which
+# take about as much memory as the series itself) are left out: the first
+# level has at most this many bins
+_LAZY_MAX_NUM_BINS = 2**21
+
+def min_max_pyramid(t: Union[np.ndarray, LazyArray], y: Union[np.ndarray, LazyArray], *, factor: int=4, min_num_bins: int=1000) -> List[Tuple[int, np.ndarray, np.ndarray]]:
+    """
+    Min/max decimation levels of a line series, finest first
+
+    Level k groups the samples into bins of factor**k samples and keeps the
+    minimum and the maximum of each bin (in time order), so a line drawn
+    through the points of a level has the same envelope as the full
+    series. Returns (bin size, t, y) for each level. Coarser levels are
+    added as long as they have more than min_num_bins bins. Each level is
+    computed from the previous one, so building the pyramid takes O(n)
+    time.
+
+    If t or y is a LazyArray, the series is read in chunks and the levels
+    start at the first one with at most 2**21 bins.
+    """
+    if factor < 2:
+        raise Exception(f'Invalid decimation factor: {factor}')
+    ret: List[Tuple[int, np.ndarray, np.ndarray]] = []
+    # indices, times and values of the minimum and the maximum of each bin
+    bin_size = 1
+    if isinstance(t, LazyArray) or isinstance(y, LazyArray):
+        bin_size = factor
+        while (len(y) + bin_size - 1) // bin_size > _LAZY_MAX_NUM_BINS:
+            bin_size *= factor
+        lo, hi = _lazy_min_max_bins(t, y, bin_size=bin_size)
+        if len(lo[0]) > min_num_bins:
+            ret.append((bin_size, *_level_points(lo, hi)))
+    else:
+        lo = hi = (np.arange(len(y)), t, y)
+    while len(lo[0]) > factor * min_num_bins:
+        lo = _reduce_bins(*lo, factor=factor, arg_func=np.argmin)
+        hi = _reduce_bins(*hi, factor=factor, arg_func=np.argmax)
+        bin_size *= factor
+        ret.append((bin_size, *_level_points(lo, hi)))
+    return ret
+
+def _level_points(lo: Tuple[np.ndarray, np.ndarray, np.ndarray], hi: Tuple[np.ndarray, np.ndarray, np.ndarray]):
+    # the minimum and the maximum of each bin, in time order
+    lo_first = lo[0] <= hi[0]
+    t = np.stack([np.where(lo_first, lo[1], hi[1]), np.where(lo_first, hi[1], lo[1])], axis=1).ravel()
+    y = np.stack([np.where(lo_first, lo[2], hi[2]), np.where(lo_first, hi[2], lo[2])], axis=1).ravel()
+    return t, y
+
+def _lazy_min_max_bins(t: Union[np.ndarray, LazyArray], y: Union[np.ndarray, LazyArray], *, bin_size: int):
+    # bins of bin_size samples, computed one chunk (a whole number of bins)
+    # at a time
+    chunk_size = y.default_chunk_size() if isinstance(y, LazyArray) else 2**20
+    chunk_size = max(chunk_size // bin_size, 1) * bin_size
+    lo_parts = []
+    hi_parts = []
+    for start in range(0, len(y), chunk_size):
+        tc = np.asarray(t[start:start + chunk_size])
+        yc = np.asarray(y[start:start + chunk_size])
+        inds = np.arange(start, start + len(yc))
+        lo_parts.append(_reduce_bins(inds, tc, yc, factor=bin_size, arg_func=np.argmin))
+        hi_parts.append(_reduce_bins(inds, tc, yc, factor=bin_size, arg_func=np.argmax))
+    if len(lo_parts) == 0:
+        empty = (np.zeros((0,), dtype=np.int64), np.zeros((0,), dtype=t.dtype), np.zeros((0,), dtype=y.dtype))
+        return empty, empty
+    lo = tuple([np.concatenate([p[i] for p in lo_parts]) for i in range(3)])
+    hi = tuple([np.concatenate([p[i] for p in hi_parts]) for i in range(3)])
+    return lo, hi
+
+def _reduce_bins(inds: np.ndarray, times: np.ndarray, vals: np.ndarray, *, factor: int, arg_func):
+    num_bins = (len(inds) + factor - 1) // factor
+    # repeating the last entry in the final partial bin does not change
+    # its minimum or maximum
+    pad = num_bins * factor - len(inds)
+    if pad > 0:
+        inds = np.pad(inds, (0, pad), mode='edge')
+        times = np.pad(times, (0, pad), mode='edge')
+        vals = np.pad(vals, (0, pad), mode='edge')
+    padded_vals = vals.reshape(num_bins, factor)
+    j = arg_func(padded_vals, axis=1)
+    r = np.arange(num_bins)
+    return inds.reshape(num_bins, factor)[r, j], times.reshape(num_bins, factor)[r, j], padded_vals[r, j]
@@ -0,0 +1,105 @@
+import os
+import json
+import shutil
+from typing import TYPE_CHECKING, Any, List, Set, Union
+from ..storage import LocalStorageBackend, get_storage_backend
+from .PayloadPolicy import PayloadPolicy
+from .PublishReport import PublishReport
+if TYPE_CHECKING:
+    from .View import _UploadOptions
+
+
+# An offline figure bundle is a directory containing
+#
+#   manifest.json    {"type": "figneuro.Bundle", "version": 1, "label": ...,
+#                     "viewUrl": ..., "dataUri": ..., "state"?: ...,
+#                     "files": {"sha1://...": "store/sha1/..."}}
+#   store/           a LocalStorageBackend store with the MainLayout document,
+#                    the data of all the views and any side files (such as
+#                    annotations or position decode field JSONL) that the views
+#                    refer to
+#
+# The figneuro-views app loads a bundle with ?bundle=<url of the directory>.
+
+def export_bundle(view, path: str, *,
+    label: str,
+    state: Union[dict, None]=None,
+    num_workers: Union[int, None]=None,
+    binary: Union[bool, None]=None,
+    compress: Union[bool, None]=None,
+    share_arrays: Union[bool, None]=None,
+    report: Union[PublishReport, None]=None,
+    payload_policy: Union[PayloadPolicy, None]=None
+):
+    from .View import _UploadOptions, _time_total
+    os.makedirs(path, exist_ok=True)
+    # The upload cache and the data URIs remembered by the views are not
+    # used, because they would outlive the bundle directory (and the data
+    # of every view is needed to find its side files). The store is
+    # content-addressed, so re-exporting to the same directory does not
+    # rewrite unchanged files.
+    opts = _UploadOptions(num_workers=num_workers, use_cache=False, binary=binary, compress=compress, share_arrays=share_arrays, backend=LocalStorageBackend(f'{path}/store'), incremental=False, report=report, payload_policy=payload_policy)
+    with _time_total(opts):
+        return _export_bundle(view, path, label=label, state=state, opts=opts)
+
+def _export_bundle(view, path: str, *, label: str, state: Union[dict, None], opts: '_UploadOptions'):
+    from .View import _time_phase
+    backend = opts.backend
+    # side files, such as the annotationsUri of an AnnotatedVideo, are
+    # copied into the bundle from the configured storage backend
+    side_file_uris: Set[str] = set()
+    data = view._create_main_layout_data(opts=opts, on_view_data=lambda leaf_data: _collect_sha1_uris(leaf_data, side_file_uris))
+    with _time_phase(opts, 'store_figure'):
+        data_uri = backend.store_json(data, label='figure.json')
+
+    source_backend = get_storage_backend()
+    for uri in sorted(side_file_uris):
+        if backend.load_file(uri) is not None:
+            continue
+        fname = source_backend.load_file(uri)
+        if fname is None:
+            print(f'WARNING: unable to load {uri} for the figure bundle')
+            continue
+        _copy_into_store(fname, uri=uri, backend=backend)
+
+    manifest = {
+        'type': 'figneuro.Bundle',
+        'version': 1,
+        'label': label,
+        'viewUrl': os.getenv('FIGNEURO_VIEW_URL', 'gs://figurl/figneuro-1'),
+        'dataUri': data_uri,
+        'files': {
+            uri: os.path.relpath(backend.load_file(uri), path)
+            for uri in _list_store_uris(backend)
+        }
+    }
+    if state is not None:
+        manifest['state'] = state
+    with open(f'{path}/manifest.json', 'w') as f:
+        json.dump(manifest, f, indent=4, sort_keys=True)
+    return path
+
+def _collect_sha1_uris(x: Any, ret: Set[str]):
+    if isinstance(x, str):
+        if x.startswith('sha1://'):
+            ret.add(x)
+    elif isinstance(x, dict):
+        for val in x.values():
+            _collect_sha1_uris(val, ret)
+    elif isinstance(x, (list, tuple)):
+        for val in x:
+            _collect_sha1_uris(val, ret)
+
+def _copy_into_store(fname: str, *, uri: str, backend: LocalStorageBackend):
+    sha1 = uri[len('sha1://'):].split('?')[0].split('/')[0]
+    path = backend.path_for_sha1(sha1)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    shutil.copyfile(fname, path)
+
+def _list_store_uris(backend: LocalStorageBackend) -> List[str]:
+    ret: List[str] = []
+    for dirpath, _, filenames in os.walk(f'{backend.directory}/sha1'):
+        for fn in filenames:
+            if len(fn) == 40 and '.' not in fn:
+                ret.append(f'sha1://{fn}')
+    return sorted(ret)
@@ -0,0 +1,57 @@
+import os
+import json
+import tempfile
+import weakref
+from typing import Any, Dict
+from ..storage import StorageBackend
+from .binary_payload import write_binary_payload
+
+
+# Live figures keep appended data outside of the (immutable) view data:
+# each append is stored as an immutable segment (a binary payload) and a
+# small mutable manifest lists the segments,
+#
+#   {"segments": [{"dataset": ..., "uri": ..., "numPoints": ...}, ...]}
+#
+# The figneuro-views app polls the manifest and loads only the segments
+# that it has not seen. In Jupyter, the manifest is read through the
+# widget instead (see handle_jupyter_message), and every update is also
+# pushed to the open widgets so that they do not have to poll.
+#
+# Live mode is local only. The kachery backend keeps mutables in the local
+# kachery store (this version of kachery cloud cannot publish them), so a
+# figure opened from url() never sees the appended segments; only the
+# figures displayed in Jupyter from the same Python process are updated.
+
+# The store of each live mutable key, for answering the requests of the
+# widgets
+_mutable_backends: Dict[str, StorageBackend] = {}
+
+# The widgets of the figures displayed in Jupyter
+_jupyter_widgets: 'weakref.WeakSet[Any]' = weakref.WeakSet()
+
+def store_live_segment(data: Any, *, backend: StorageBackend) -> str:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fname = f'{tmpdir}/segment.fnbp'
+        with open(fname, 'wb') as f:
+            write_binary_payload(data, f)
+        return backend.store_file(fname, label=os.path.basename(fname))
+
+def set_live_mutable(key: str, value: Any, *, backend: StorageBackend):
+    text = json.dumps(value, separators=(',', ':'), indent=None, allow_nan=False, sort_keys=True)
+    backend.set_mutable(key, text)
+    _mutable_backends[key] = backend
+    for W in list(_jupyter_widgets):
+        W.send_message_to_frontend({'type': 'figneuro.mutable', 'key': key, 'value': text})
+
+def register_jupyter_widget(W):
+    _jupyter_widgets.add(W)
+
+def handle_jupyter_message(W, message: Any):
+    if not isinstance(message, dict):
+        return
+    if message.get('type', None) == 'figneuro.getMutable':
+        key = message['key']
+        backend = _mutable_backends.get(key, None)
+        value = backend.get_mutable(key) if backend is not None else None
+        W.send_message_to_frontend({'type': 'figneuro.mutable', 'key': key, 'value': value})
@@ -0,0 +1,131 @@
+import os
+import asyncio
+import functools
+import tempfile
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Union
+import numpy as np
+from .View import View, _UploadOptions
+from .View import _get_dirty_view_indices, _set_published_data_uris, _check_payload_budget, _report_view_index, _leaf_view_to_dict, _needs_all_view_datas, _look_up_view_data, _view_data_document, _compress_payload_file, _write_binary_payload_file, _write_data_json_file
+from .View import _look_up_shared_arrays, _write_shared_array_files, _set_shared_array_uris, _record_shared_arrays, _time_phase
+from .PublishReport import _serialized_num_bytes
+from .UploadCache import get_upload_cache
+from .chunked_arrays import contains_chunked_arrays, iter_chunk_batches, next_chunk_batch
+from .share_arrays import extract_shared_arrays
+
+
+# The asyncio counterpart of the publish path in View.py. It is built from
+# the same steps, so that the figure does not depend on which path is used:
+# CPU-bound steps (to_dict, hashing, serialization) run in an executor and
+# the uploads go through the async methods of the storage backend.
+
+async def create_main_layout_data_async(layout_view: View, *, opts: _UploadOptions, executor: Union[Executor, None]=None, on_view_data: Union[Callable[[Any], None], None]=None):
+    leaf_views = layout_view._prepare_leaf_views(opts=opts)
+    dirty_indices = _get_dirty_view_indices(leaf_views, opts=opts)
+    dirty_data_uris, dirty_num_bytes = await _publish_leaf_views_async(leaf_views, dirty_indices, opts=opts, executor=executor, on_view_data=on_view_data)
+    data_uris = _set_published_data_uris(leaf_views, dirty_indices, dirty_data_uris, dirty_num_bytes, opts=opts)
+    return layout_view._main_layout_data(leaf_views, data_uris)
+
+async def _publish_leaf_views_async(leaf_views: List[View], dirty_indices: List[int], *, opts: _UploadOptions, executor: Union[Executor, None], on_view_data: Union[Callable[[Any], None], None]):
+    # at most num_workers views are serialized and uploaded at a time
+    semaphore = asyncio.Semaphore(opts.num_workers)
+    if _needs_all_view_datas(opts):
+        async def to_dict(ii: int):
+            async with semaphore:
+                return await _run(executor, _leaf_view_to_dict, leaf_views[ii], ii, opts=opts)
+        dirty_datas = list(await asyncio.gather(*[to_dict(ii) for ii in dirty_indices]))
+        dirty_num_bytes = _check_payload_budget(leaf_views, dirty_indices, dirty_datas, opts=opts)
+        if on_view_data is not None:
+            for data in dirty_datas:
+                on_view_data(data)
+        dirty_data_uris = await _upload_view_data_and_return_uris_async(dirty_datas, opts=opts, view_indices=dirty_indices, executor=executor)
+        return dirty_data_uris, dirty_num_bytes
+    # otherwise each view is serialized, uploaded and dropped in one task
+    async def publish(ii: int):
+        async with semaphore:
+            data = await _run(executor, _leaf_view_to_dict, leaf_views[ii], ii, opts=opts)
+            if on_view_data is not None:
+                on_view_data(data)
+            uri = await _upload_view_data_and_return_uri_async(data, opts=opts, shared_array_uris={}, view_index=ii if opts.report is not None else None, executor=executor)
+            return uri, await _run(executor, _serialized_num_bytes, data, binary=opts.binary)
+    results = list(await asyncio.gather(*[publish(ii) for ii in dirty_indices]))
+    return [a[0] for a in results], [a[1] for a in results]
+
+async def _upload_view_data_and_return_uris_async(datas: List[Any], *, opts: _UploadOptions, view_indices: List[int], executor: Union[Executor, None]):
+    shared_array_uris: Dict[str, str] = {}
+    if opts.share_arrays:
+        with _time_phase(opts, 'share_arrays'):
+            datas, shared_arrays = await _run(executor, extract_shared_arrays, datas, min_num_bytes=opts.shared_array_min_num_bytes)
+            shared_array_uris = await _upload_shared_arrays_and_return_uris_async(shared_arrays, opts=opts, executor=executor)
+        _record_shared_arrays(shared_arrays, opts=opts)
+    # at most num_workers views are serialized and uploaded at a time
+    semaphore = asyncio.Semaphore(opts.num_workers)
+    async def upload(ii: int):
+        async with semaphore:
+            return await _upload_view_data_and_return_uri_async(
+                datas[ii],
+                opts=opts,
+                shared_array_uris=shared_array_uris,
+                view_index=_report_view_index(ii, view_indices, opts=opts),
+                executor=executor
+            )
+    # gather returns the results in order, so the figure stays deterministic
+    return list(await asyncio.gather(*[upload(ii) for ii in range(len(datas))]))
+
+async def _upload_view_data_and_return_uri_async(data, *, opts: _UploadOptions, shared_array_uris: Dict[str, str], view_index: Union[int, None], executor: Union[Executor, None]):
+    data = await _upload_chunked_arrays_async(data, opts=opts, view_index=view_index, executor=executor)
+    cache_key, uri, shared_array_uris_for_view = await _run(executor, _look_up_view_data, data, opts=opts, shared_array_uris=shared_array_uris, view_index=view_index)
+    if uri is not None:
+        return uri
+    with tempfile.TemporaryDirectory() as tmpdir:
+        payload_uri = None
+        if opts.binary or opts.compress:
+            if opts.binary:
+                fname = await _run(executor, _write_binary_payload_file, data, tmpdir=tmpdir, opts=opts, view_index=view_index)
+            else:
+                fname = await _run(executor, _write_data_json_file, data, tmpdir=tmpdir, opts=opts, view_index=view_index)
+            if opts.compress:
+                fname = await _run(executor, _compress_payload_file, fname, opts=opts, view_index=view_index)
+            payload_uri = await _store_file_async(fname, label=os.path.basename(fname), opts=opts, view_index=view_index)
+        document = _view_data_document(data, payload_uri=payload_uri, shared_array_uris=shared_array_uris_for_view, opts=opts)
+        fname = await _run(executor, _write_data_json_file, document, tmpdir=tmpdir, opts=opts, view_index=view_index)
+        uri = await _store_file_async(fname, label=None, opts=opts, view_index=view_index)
+    if cache_key is not None:
+        await _run(executor, get_upload_cache().set, cache_key, uri)
+    return uri
+
+async def _upload_chunked_arrays_async(data, *, opts: _UploadOptions, view_index: Union[int, None], executor: Union[Executor, None]):
+    if not contains_chunked_arrays(data):
+        return data
+    # The chunks are read in the executor one batch at a time, and each
+    # batch is stored from the event loop (as the shared arrays are), so
+    # that no executor thread waits for an upload
+    steps = iter_chunk_batches(data, payload_policy=opts.payload_policy, batch_size=opts.num_workers)
+    uris = None
+    with _time_phase(opts, 'chunked_arrays', view_index=view_index):
+        while True:
+            done, x = await _run(executor, next_chunk_batch, steps, uris)
+            if done:
+                return x
+            uris = await _upload_shared_arrays_and_return_uris_async(x, opts=opts, executor=executor)
+
+async def _upload_shared_arrays_and_return_uris_async(shared_arrays: Dict[str, np.ndarray], *, opts: _UploadOptions, executor: Union[Executor, None]) -> Dict[str, str]:
+    ret, cache_keys = await _run(executor, _look_up_shared_arrays, shared_arrays, opts=opts)
+    keys_to_store = [key for key in shared_arrays.keys() if key not in ret]
+    if len(keys_to_store) > 0:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            files = await _run(executor, _write_shared_array_files, shared_arrays, keys_to_store, tmpdir=tmpdir)
+            uris = await opts.backend.put_many_async(files)
+        await _run(executor, _set_shared_array_uris, ret, cache_keys, keys_to_store, uris)
+    return ret
+
+async def _store_file_async(fname: str, *, label: Union[str, None], opts: _UploadOptions, view_index: Union[int, None]):
+    with _time_phase(opts, 'store', view_index=view_index):
+        uri = await opts.backend.store_file_async(fname, label=label)
+    if opts.report is not None:
+        opts.report.add_stored_bytes(os.path.getsize(fname), view_index=view_index)
+    return uri
+
+def _run(executor: Union[Executor, None], func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
@@ -0,0 +1,85 @@
+from typing import Any, List, Union
+import numpy as np
+from .LazyArray import LazyArray
+
+
+# A quantized array is published as
+#
+#   {"_type": "quantizedArray", "data": <int16 or uint8 array>, "scale": s, "offset": o}
+#
+# and the figneuro-views app restores the values data * scale + offset
+# (as float32) before rendering the view.
+
+_QUANTIZED_DTYPES = ['uint8', 'int16']
+
+class Quantization:
+    """
+    Maps values to integers of the given dtype as round((y - offset) / scale),
+    with an error of at most scale / 2 within the range of the dtype
+    """
+    def __init__(self, *, dtype: str, scale: float, offset: float) -> None:
+        if dtype not in _QUANTIZED_DTYPES:
+            raise Exception(f'Invalid dtype for quantization: {dtype}')
+        if not scale > 0:
+            raise Exception(f'Invalid scale for quantization: {scale}')
+        self.dtype = dtype
+        self.scale = scale
+        self.offset = offset
+    @property
+    def max_error(self) -> float:
+        return self.scale / 2
+    def quantize(self, y: Union[np.ndarray, LazyArray]) -> Union[np.ndarray, LazyArray]:
+        if y.dtype.name == self.dtype and self.scale == 1 and self.offset == 0:
+            return y
+        if isinstance(y, LazyArray):
+            # quantized chunk by chunk when the array is read
+            return y.map(self.quantize, dtype=self.dtype)
+        info = np.iinfo(self.dtype)
+        q = np.rint((y - self.offset) / self.scale)
+        return np.clip(q, info.min, info.max).astype(self.dtype)
+    def to_dict(self, q: Any) -> dict:
+        return {
+            '_type': 'quantizedArray',
+            'data': q,
+            'scale': float(self.scale),
+            'offset': float(self.offset)
+        }
+
+def choose_quantization(y: Union[np.ndarray, LazyArray], *, max_error: float, dtypes: List[str]=['uint8', 'int16']) -> Union[Quantization, None]:
+    """
+    The quantization with the smallest of the dtypes that represents the
+    range of y with an error of at most max_error, or None if there is
+    none (non-finite values cannot be quantized)
+    """
+    if y.size == 0:
+        return Quantization(dtype=dtypes[0], scale=1, offset=0)
+    min_val, max_val = _min_max(y)
+    if not (np.isfinite(min_val) and np.isfinite(max_val)):
+        return None
+    for dtype in dtypes:
+        info = np.iinfo(dtype)
+        # the minimum maps to info.min and the maximum to info.max
+        scale = (max_val - min_val) / (int(info.max) - int(info.min))
+        if scale == 0:
+            # constant values are represented exactly
+            return Quantization(dtype=dtype, scale=1, offset=min_val - int(info.min))
+        if scale / 2 > max_error:
+            continue
+        return Quantization(dtype=dtype, scale=scale, offset=min_val - int(info.min) * scale)
+    return None
+
+def _min_max(y: Union[np.ndarray, LazyArray]):
+    # (nan if y has nan entries)
+    if isinstance(y, LazyArray):
+        bounds = np.array([(np.min(c), np.max(c)) for c in y.iter_chunks() if c.size > 0])
+        return float(np.min(bounds[:, 0])), float(np.max(bounds[:, 1]))
+    return float(np.min(y)), float(np.max(y))
+
+def contains_quantized_arrays(x: Any) -> bool:
+    if isinstance(x, dict):
+        if x.get('_type', None) == 'quantizedArray':
+            return True
+        return any([contains_quantized_arrays(v) for v in x.values()])
+    elif isinstance(x, (list, tuple)):
+        return any([contains_quantized_arrays(v) for v in x])
+    return False
@@ -0,0 +1,89 @@
+import hashlib
+import numpy as np
+from typing import Any, Dict, List, Set, Tuple, Union
+from .LazyArray import LazyArray
+
+
+def extract_shared_arrays(datas: List[Any], *, min_num_bytes: int=1024) -> Tuple[List[Any], Dict[str, np.ndarray]]:
+    """
+    Find numpy arrays that occur in more than one of the view data objects
+
+    Arrays are matched by object identity and otherwise by a hash of their
+    content. Each shared array is replaced by {'_type': 'sharedArrayRef', 'key': key}
+    in every view data object, and the returned dict maps key -> array so
+    that each shared array can be stored once.
+    """
+    hashes_by_id: Dict[int, str] = {}
+    view_indices_by_hash: Dict[str, Set[int]] = {}
+    arrays_by_hash: Dict[str, np.ndarray] = {}
+    for ii, data in enumerate(datas):
+        for a in _iterate_arrays(data):
+            if a.nbytes < min_num_bytes:
+                continue
+            h = hashes_by_id.get(id(a), None)
+            if h is None:
+                h = _array_hash(a)
+                hashes_by_id[id(a)] = h
+            view_indices_by_hash.setdefault(h, set()).add(ii)
+            arrays_by_hash.setdefault(h, a)
+    shared_hashes = set([h for h, view_indices in view_indices_by_hash.items() if len(view_indices) > 1])
+    if len(shared_hashes) == 0:
+        return datas, {}
+    new_datas = [
+        _replace_shared_arrays(data, hashes_by_id=hashes_by_id, shared_hashes=shared_hashes, min_num_bytes=min_num_bytes)
+        for data in datas
+    ]
+    return new_datas, {h: arrays_by_hash[h] for h in sorted(shared_hashes)}
+
+def get_shared_array_keys(data: Any) -> List[str]:
+    """
+    The keys of the shared arrays referenced by a view data object
+    """
+    ret: Set[str] = set()
+    _collect_shared_array_keys(data, ret)
+    return sorted(ret)
+
+def _iterate_arrays(x: Any):
+    if isinstance(x, (np.ndarray, LazyArray)):
+        yield x
+    elif isinstance(x, dict):
+        for val in x.values():
+            yield from _iterate_arrays(val)
+    elif isinstance(x, (list, tuple)):
+        for val in x:
+            yield from _iterate_arrays(val)
+
+def _replace_shared_arrays(x: Any, *, hashes_by_id: Dict[int, str], shared_hashes: Set[str], min_num_bytes: int):
+    if isinstance(x, (np.ndarray, LazyArray)):
+        if x.nbytes >= min_num_bytes:
+            h = hashes_by_id[id(x)]
+            if h in shared_hashes:
+                return {'_type': 'sharedArrayRef', 'key': h}
+        return x
+    elif isinstance(x, dict):
+        return {key: _replace_shared_arrays(val, hashes_by_id=hashes_by_id, shared_hashes=shared_hashes, min_num_bytes=min_num_bytes) for key, val in x.items()}
+    elif isinstance(x, (list, tuple)):
+        return [_replace_shared_arrays(val, hashes_by_id=hashes_by_id, shared_hashes=shared_hashes, min_num_bytes=min_num_bytes) for val in x]
+    else:
+        return x
+
+def _collect_shared_array_keys(x: Any, ret: Set[str]):
+    if isinstance(x, dict):
+        if x.get('_type', None) == 'sharedArrayRef':
+            ret.add(x['key'])
+            return
+        for val in x.values():
+            _collect_shared_array_keys(val, ret)
+    elif isinstance(x, (list, tuple)):
+        for val in x:
+            _collect_shared_array_keys(val, ret)
+
+def _array_hash(a: Union[np.ndarray, LazyArray]):
+    h = hashlib.blake2b(digest_size=20)
+    h.update(f'{a.dtype.str}{a.shape}'.encode('utf-8'))
+    if isinstance(a, LazyArray):
+        for chunk in a.iter_chunks():
+            h.update(memoryview(np.ascontiguousarray(chunk)).cast('B'))
+    else:
+        h.update(memoryview(np.ascontiguousarray(a)).cast('B'))
+    return h.hexdigest()
@@ -0,0 +1,93 @@
+import json
+import base64
+import numpy as np
+from typing import Any, Iterator, TextIO, Union
+from .LazyArray import LazyArray
+
+
+# Number of raw bytes encoded at a time. A multiple of 3 so that the
+# base64 chunks can be concatenated without padding in between.
+_ARRAY_CHUNK_NUM_BYTES = 3 * 2**18
+_SUPPORTED_DTYPES = ['uint8', 'int16', 'uint16', 'int32', 'uint32', 'float32', 'float64']
+
+def iter_encode_data(x: Any, *, label: str='') -> Iterator[str]:
+    """
+    Encode view data as JSON text, yielding it in chunks
+
+    The output is the same document that
+    kcl.store_json(fig.serialize_data(x, allow_float64=True)) produces (compact separators, sorted keys, numpy arrays as base64
+    ndarray objects), but neither the serialized copy of the data nor the
+    full text is ever held in memory. Arrays are encoded in chunks of
+    about 1 MB directly from the array memory. Objects that have a
+    to_dict() method (for example view items) are converted one at a time.
+    """
+    if isinstance(x, (np.ndarray, LazyArray)):
+        yield from _iter_encode_array(x, label=label)
+    elif isinstance(x, dict):
+        for key in x.keys():
+            if not isinstance(key, str):
+                raise Exception(f'serialize: keys must be string not {str(type(key))}: {label}')
+        yield '{'
+        for ii, key in enumerate(sorted(x.keys())):
+            if ii > 0:
+                yield ','
+            yield json.dumps(key)
+            yield ':'
+            yield from iter_encode_data(x[key], label=f'{label}.{key}')
+        yield '}'
+    elif isinstance(x, (list, tuple)):
+        yield '['
+        for ii, val in enumerate(x):
+            if ii > 0:
+                yield ','
+            yield from iter_encode_data(val, label=f'{label}[{ii}]')
+        yield ']'
+    elif isinstance(x, np.integer):
+        yield json.dumps(int(x))
+    elif isinstance(x, np.floating):
+        yield json.dumps(float(x), allow_nan=False)
+    elif isinstance(x, (str, int, float, bool)) or x is None:
+        yield json.dumps(x, allow_nan=False)
+    elif hasattr(x, 'to_dict'):
+        yield from iter_encode_data(x.to_dict(), label=label)
+    else:
+        raise Exception(f'Item is not json safe: {type(x)}: {label}')
+
+def write_encoded_data(x: Any, f: TextIO):
+    """
+    Write view data as JSON text to a file (see iter_encode_data)
+    """
+    for chunk in iter_encode_data(x):
+        f.write(chunk)
+
+def _iter_encode_array(x: Union[np.ndarray, LazyArray], *, label: str):
+    if x.dtype.name not in _SUPPORTED_DTYPES:
+        raise Exception(f'Unable to serialize numpy array with dtype {x.dtype.name}: {label}')
+    # keys in sorted order: _type, data_b64, dtype, shape
+    yield '{"_type":"ndarray","data_b64":"'
+    if isinstance(x, LazyArray):
+        yield from _iter_encode_lazy_array_data(x)
+    else:
+        buf = memoryview(_little_endian(np.ascontiguousarray(x))).cast('B')
+        for i in range(0, len(buf), _ARRAY_CHUNK_NUM_BYTES):
+            yield base64.b64encode(buf[i:i + _ARRAY_CHUNK_NUM_BYTES]).decode('ascii')
+    yield f'","dtype":"{x.dtype.name}","shape":{json.dumps([int(n) for n in x.shape], separators=(",", ":"))}}}'
+
+def _iter_encode_lazy_array_data(x: LazyArray):
+    # The chunks read from the source are not multiples of 3 bytes, so the
+    # bytes that do not fill a base64 group are carried over to the next
+    # chunk
+    remainder = b''
+    for chunk in x.iter_chunks():
+        buf = remainder + bytes(memoryview(_little_endian(np.ascontiguousarray(chunk))).cast('B'))
+        n = len(buf) - len(buf) % 3
+        if n > 0:
+            yield base64.b64encode(buf[:n]).decode('ascii')
+        remainder = buf[n:]
+    if len(remainder) > 0:
+        yield base64.b64encode(remainder).decode('ascii')
+
+def _little_endian(a: np.ndarray):
+    if a.dtype.byteorder == '>':
+        return a.astype(a.dtype.newbyteorder('<'))
+    return a
@@ -0,0 +1,35 @@
+import json
+import pytest
+import figurl
+
+
+class _Figure:
+    # stands in for figurl.Figure, which stores the figure in kachery
+    def __init__(self, *, view_url: str, data: dict) -> None:
+        self.view_url = view_url
+        self.data = data
+        self.state = None
+    def set_state(self, state: dict):
+        self.state = state
+    def url(self, *, label: str, local=None):
+        _Figure.published.append(self)
+        return f'https://figurl.org/f?v={self.view_url}&label={label}'
+
+@pytest.fixture
+def local_publish(tmp_path, monkeypatch):
+    """
+    Publish to a local store in tmp_path, and return the list that the
+    published figures are appended to
+    """
+    monkeypatch.setenv('FIGNEURO_STORAGE_BACKEND', 'local')
+    monkeypatch.setenv('FIGNEURO_LOCAL_STORE_DIR', str(tmp_path / 'store'))
+    monkeypatch.setenv('FIGNEURO_UPLOAD_CACHE_DIR', str(tmp_path / 'cache'))
+    _Figure.published = []
+    monkeypatch.setattr(figurl, 'Figure', _Figure)
+    return _Figure.published
+
+def load_view_datas(figure) -> list:
+    # the stored data of each view of a published figure (JSON documents only)
+    from figneuro.storage import get_storage_backend
+    backend = get_storage_backend('local')
+    return [json.loads(backend.load_text(v['dataUri'])) for v in figure.data['views']]
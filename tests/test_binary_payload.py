@@ -0,0 +1,50 @@
+import io
+import struct
+import numpy as np
+from figneuro.views.LazyArray import LazyArray
+from figneuro.views.binary_payload import write_binary_payload, read_binary_payload, BINARY_PAYLOAD_MAGIC
+
+
+def _round_trip(x):
+    f = io.BytesIO()
+    write_binary_payload(x, f)
+    return f.getvalue(), read_binary_payload(f.getvalue())
+
+def test_binary_payload_round_trip():
+    rng = np.random.default_rng(0)
+    arrays = [
+        np.array([-1, 2, 3], dtype=np.int8),
+        rng.integers(0, 255, size=(3, 5)).astype(np.uint8),
+        np.arange(-7, 6, dtype=np.int16),
+        np.arange(5, dtype=np.uint16),
+        np.arange(-3, 8, dtype=np.int32),
+        np.array([0, 2**32 - 1], dtype=np.uint32),
+        rng.normal(size=(4, 3)).astype(np.float32),
+        rng.normal(size=9),
+        np.zeros((0,), dtype=np.float32),
+        # not contiguous, and big-endian
+        rng.normal(size=(6, 4))[:, 1],
+        np.arange(5, dtype='>i4')
+    ]
+    data = {'type': 'Test', 'arrays': arrays, 'n': np.int64(3), 'v': np.float32(0.5), 'items': [{'a': 'x', 'b': None}]}
+    buf, y = _round_trip(data)
+    assert buf[:8] == BINARY_PAYLOAD_MAGIC
+    assert y['type'] == 'Test' and y['n'] == 3 and y['v'] == 0.5 and y['items'] == [{'a': 'x', 'b': None}]
+    for a, b in zip(arrays, y['arrays']):
+        assert b.dtype.name == a.dtype.name
+        assert b.shape == a.shape
+        np.testing.assert_array_equal(b, a)
+
+def test_binary_payload_layout():
+    buf, _ = _round_trip({'x': np.arange(3, dtype=np.uint8), 'y': np.arange(3, dtype=np.float64)})
+    header_length = struct.unpack('<I', buf[8:12])[0]
+    data_start = (12 + header_length + 7) // 8 * 8
+    # every array buffer starts at a multiple of 8 bytes
+    assert np.frombuffer(buf, dtype='<f8', count=3, offset=data_start + 8).tolist() == [0, 1, 2]
+    assert len(buf) % 8 == 0
+
+def test_binary_payload_reads_lazy_arrays(monkeypatch):
+    monkeypatch.setenv('FIGNEURO_CHUNK_NUM_BYTES', '12')
+    x = np.random.default_rng(1).normal(size=(25, 2))
+    _, y = _round_trip({'x': LazyArray(x, dtype='float32')})
+    np.testing.assert_array_equal(y['x'], x.astype(np.float32))
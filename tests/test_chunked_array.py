@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from figneuro.views.ChunkedArray import ChunkedArray
+from figneuro.views.PayloadPolicy import PayloadPolicy
+from figneuro.views.chunked_arrays import store_chunked_arrays, contains_chunked_arrays
+
+
+def test_chunked_array():
+    x = np.sort(np.random.default_rng(0).random(25)).astype(np.float32)
+    c = ChunkedArray(x, chunk_size=10)
+    assert c.num_chunks == 3
+    assert c.chunk_range(2) == (20, 25)
+    np.testing.assert_array_equal(c.get_chunk(1), x[10:20])
+    assert c.time_bounds(0) == (float(x[0]), float(x[9]))
+    y = np.zeros((4, 30), dtype=np.int16)
+    c2 = ChunkedArray(y, times=np.arange(30.0), axis=1, chunk_size=7)
+    assert c2.get_chunk(4).shape == (4, 2)
+    with pytest.raises(Exception):
+        ChunkedArray(x[::-1])
+    with pytest.raises(Exception):
+        ChunkedArray(y, times=np.arange(5.0))
+
+def test_store_chunked_arrays():
+    x = np.sort(np.random.default_rng(1).random(25)) * 10
+    stored = {}
+    batches = []
+    def store_chunks(chunks):
+        batches.append(len(chunks))
+        stored.update(chunks)
+        return {key: f'sha1://{key}' for key in chunks}
+    data = {'type': 'Test', 'items': [{'t': ChunkedArray(x, chunk_size=10)}]}
+    assert contains_chunked_arrays(data)
+    index = store_chunked_arrays(data, payload_policy=PayloadPolicy(float_rtol=1e-6), store_chunks=store_chunks, batch_size=2)['items'][0]['t']
+    assert batches == [2, 1]
+    assert index['_type'] == 'chunkedArray' and index['shape'] == [25] and index['axis'] == 0
+    assert [(a['start'], a['end']) for a in index['chunks']] == [(0, 10), (10, 20), (20, 25)]
+    restored = np.concatenate([stored[a['uri'][len('sha1://'):]] for a in index['chunks']]).astype(np.float64) + index.get('offset', 0)
+    np.testing.assert_allclose(restored, x, atol=1e-5 * 10)
+    assert index['chunks'][2]['tEnd'] == pytest.approx(x[-1], abs=1e-4)
@@ -0,0 +1,62 @@
+import json
+import base64
+import zlib
+import numpy as np
+from figneuro.storage.LocalStorageBackend import LocalStorageBackend
+from figneuro.views.compression import compress_file, compress_jsonl_text, read_compressed_jsonl, store_jsonl_text
+
+
+def _jsonl_text(num_records: int):
+    lines = [json.dumps({'type': 'header', 'n': num_records})]
+    lines += [json.dumps({'i': i, 'label': f'frame {i}', 'x': [i, i + 0.5]}) for i in range(num_records)]
+    return '\n'.join(lines)
+
+def test_compress_file_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr('figneuro.views.compression._READ_CHUNK_NUM_BYTES', 1000)
+    buf = np.random.default_rng(0).integers(0, 4, size=10000).astype(np.uint8).tobytes()
+    with open(tmp_path / 'a.dat', 'wb') as f:
+        f.write(buf)
+    compress_file(str(tmp_path / 'a.dat'), str(tmp_path / 'a.dat.z'))
+    with open(tmp_path / 'a.dat.z', 'rb') as f:
+        compressed = f.read()
+    assert len(compressed) < len(buf)
+    # the zlib format that DecompressionStream('deflate') reads
+    assert zlib.decompress(compressed) == buf
+
+def test_compressed_jsonl_round_trip():
+    text = _jsonl_text(1000)
+    buf = compress_jsonl_text(text, block_num_bytes=1000)
+    header, records = read_compressed_jsonl(buf)
+    assert header == {'type': 'header', 'n': 1000}
+    assert records == [json.loads(line) for line in text.split('\n')[1:]]
+    # records are grouped in blocks of about block_num_bytes of text
+    header_length = int.from_bytes(buf[8:12], 'little')
+    blocks = json.loads(buf[12:12 + header_length])['blocks']
+    assert len(blocks) > 10
+    assert [b[0] for b in blocks] == sorted(b[0] for b in blocks)
+
+def test_compressed_jsonl_with_one_record_per_block():
+    header, records = read_compressed_jsonl(compress_jsonl_text(_jsonl_text(5), block_num_bytes=1))
+    assert header['n'] == 5
+    assert [r['i'] for r in records] == list(range(5))
+
+def test_store_jsonl_text(tmp_path):
+    backend = LocalStorageBackend(str(tmp_path / 'store'))
+    text = _jsonl_text(50)
+    uri = store_jsonl_text(text, label='a.jsonl', backend=backend, compress=True)
+    assert uri.endswith('label=a.jsonl.z')
+    with open(backend.load_file(uri), 'rb') as f:
+        assert read_compressed_jsonl(f.read())[1][49]['i'] == 49
+    assert backend.load_text(store_jsonl_text(text, label='a.jsonl', backend=backend, compress=False)) == text
+
+def test_compressed_view_data_round_trip(tmp_path):
+    from figneuro.views.View import _UploadOptions, _upload_view_data_and_return_uri
+    backend = LocalStorageBackend(str(tmp_path / 'store'))
+    data = {'type': 'Test', 'x': np.arange(1000, dtype=np.float32)}
+    uri = _upload_view_data_and_return_uri(data, opts=_UploadOptions(backend=backend, use_cache=False, compress=True))
+    envelope = backend.load_json(uri)
+    assert envelope['type'] == 'figneuro.Payload' and envelope['compression'] == 'deflate' and envelope['encoding'] == 'json'
+    with open(backend.load_file(envelope['payloadUri']), 'rb') as f:
+        payload = json.loads(zlib.decompress(f.read()))
+    assert payload['type'] == 'Test'
+    assert np.array_equal(np.frombuffer(base64.b64decode(payload['x']['data_b64']), dtype='float32'), data['x'])
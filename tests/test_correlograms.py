@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+from figneuro.spike_sorting import correlograms
+from figneuro.spike_sorting.correlograms import compute_correlogram, compute_correlograms, compute_pair_correlograms, cross_correlogram_items, top_similarity_pairs
+
+SAMPLING_FREQUENCY = 30000
+OPTS = {'sampling_frequency': SAMPLING_FREQUENCY, 'window_size_msec': 10, 'bin_size_msec': 1}
+
+
+def _reference(times1, times2=None):
+    # every pair of spikes, binned as in compute_correlogram_data of the
+    # spike sorting examples
+    num_bins = 9
+    half = (num_bins + 1) // 2
+    edges = np.array((np.arange(num_bins + 1) - num_bins / 2) * OPTS['bin_size_msec'], dtype=np.float32)
+    counts = np.zeros((num_bins,), dtype=np.int32)
+    if times2 is None:
+        lags = (times1[None, :] - times1[:, None])[np.triu_indices(len(times1), 1)]
+        lags = np.concatenate([lags, -lags])
+    else:
+        lags = (times2[None, :] - times1[:, None]).ravel()
+    for lag in lags:
+        delta_msec = abs(int(lag)) / SAMPLING_FREQUENCY * 1000
+        for i in range(half):
+            if edges[half - 1 + i] <= delta_msec < edges[half + i]:
+                counts[half - 1 + i if lag >= 0 else half - 1 - i] += 1
+    return counts
+
+def _spike_trains():
+    rng = np.random.default_rng(0)
+    trains = {u: np.sort(rng.integers(0, SAMPLING_FREQUENCY, size=150)) for u in [1, 2, 3, 4]}
+    # coincident spikes
+    trains[2] = np.sort(np.concatenate([trains[2], trains[1][:20]]))
+    return trains
+
+class _Sorting:
+    def __init__(self, trains) -> None:
+        self._trains = trains
+        self.num_reads = 0
+    def get_unit_ids(self):
+        return list(self._trains.keys())
+    def get_unit_spike_train(self, *, unit_id, segment_index):
+        self.num_reads += 1
+        return self._trains[unit_id]
+    def get_sampling_frequency(self):
+        return SAMPLING_FREQUENCY
+
+def test_compute_correlogram_matches_all_pairs():
+    trains = _spike_trains()
+    np.testing.assert_array_equal(compute_correlogram(trains[1], **OPTS)['bin_counts'], _reference(trains[1]))
+    np.testing.assert_array_equal(compute_correlogram(trains[1], trains[2], **OPTS)['bin_counts'], _reference(trains[1], trains[2]))
+    # unsorted input
+    np.testing.assert_array_equal(compute_correlogram(trains[3][::-1], trains[2], **OPTS)['bin_counts'], _reference(trains[3], trains[2]))
+    assert len(compute_correlogram(trains[1], **OPTS)['bin_edges_sec']) == 10
+
+def test_compute_correlograms(monkeypatch):
+    trains = _spike_trains()
+    a = compute_correlograms(trains, **OPTS)
+    assert a['unit_ids'] == [1, 2, 3, 4]
+    for i1, u1 in enumerate(a['unit_ids']):
+        for i2, u2 in enumerate(a['unit_ids']):
+            np.testing.assert_array_equal(a['bin_counts'][i1, i2], _reference(trains[u1], trains[u2] if u1 != u2 else None))
+    # in process-pool shards, and in small blocks of pairs
+    np.testing.assert_array_equal(compute_correlograms(trains, num_workers=3, **OPTS)['bin_counts'], a['bin_counts'])
+    monkeypatch.setattr(correlograms, '_MAX_NUM_PAIRS_PER_BLOCK', 7)
+    np.testing.assert_array_equal(compute_correlograms(trains, **OPTS)['bin_counts'], a['bin_counts'])
+    b = compute_correlograms(trains, unit_ids=[3, 1], **OPTS)
+    assert b['unit_ids'] == [3, 1]
+    np.testing.assert_array_equal(b['bin_counts'][0, 1], a['bin_counts'][2, 0])
+
+def test_compute_pair_correlograms():
+    trains = _spike_trains()
+    a = compute_correlograms(trains, **OPTS)
+    pairs = [(2, 1), (3, 3), (1, 4), (4, 2)]
+    for num_workers in [1, 2]:
+        p = compute_pair_correlograms(trains, pairs, num_workers=num_workers, **OPTS)
+        assert p['bin_counts'].shape == (4, 9)
+        for ii, (u1, u2) in enumerate(pairs):
+            np.testing.assert_array_equal(p['bin_counts'][ii], a['bin_counts'][u1 - 1, u2 - 1])
+    assert compute_pair_correlograms(trains, [], **OPTS)['bin_counts'].shape == (0, 9)
+    with pytest.raises(Exception):
+        compute_pair_correlograms(trains, [(1, 5)], **OPTS)
+
+def test_cross_correlogram_items_with_pairs(monkeypatch):
+    trains = _spike_trains()
+    similarity_scores = [_Score(1, 2, 0.9), _Score(1, 1, 1), _Score(3, 4, 0.5), _Score(2, 3, 0.1)]
+    pairs = top_similarity_pairs(similarity_scores, 2)
+    assert pairs == [(1, 2), (3, 4)]
+    # only the given pairs are counted
+    def dense(*args, **kwargs):
+        raise Exception('Unexpected')
+    monkeypatch.setattr(correlograms, 'compute_correlograms', dense)
+    items = cross_correlogram_items(_Sorting(trains), window_size_msec=10, bin_size_msec=1, pairs=pairs)
+    assert [(a.unit_id1, a.unit_id2) for a in items] == pairs
+    np.testing.assert_array_equal(items[1].bin_counts, _reference(trains[3], trains[4]))
+    monkeypatch.undo()
+    sorting = _Sorting(trains)
+    items = cross_correlogram_items(sorting, window_size_msec=10, bin_size_msec=1)
+    assert len(items) == 16 and sorting.num_reads == 4
+
+class _Score:
+    def __init__(self, unit_id1, unit_id2, similarity) -> None:
+        self.unit_id1 = unit_id1
+        self.unit_id2 = unit_id2
+        self.similarity = similarity
@@ -0,0 +1,64 @@
+import numpy as np
+from figneuro.views.LazyArray import LazyArray
+from figneuro.views.TimeseriesGraph import TimeseriesGraph
+from figneuro.views.decimation import min_max_pyramid
+
+
+def _series(n: int):
+    rng = np.random.default_rng(0)
+    t = np.arange(n, dtype=np.float32) / 100
+    y = np.cumsum(rng.normal(size=n)).astype(np.float32)
+    return t, y
+
+def test_levels_keep_the_min_and_max_of_each_bin():
+    t, y = _series(100003)
+    levels = min_max_pyramid(t, y, factor=4, min_num_bins=100)
+    assert [a[0] for a in levels] == [4**k for k in range(1, len(levels) + 1)]
+    for bin_size, t_level, y_level in levels:
+        num_bins = (len(y) + bin_size - 1) // bin_size
+        assert num_bins > 100
+        assert len(y_level) == 2 * num_bins
+        # points in time order
+        assert np.all(np.diff(t_level) >= 0)
+        bins = [y[i:i + bin_size] for i in range(0, len(y), bin_size)]
+        np.testing.assert_array_equal(np.minimum(y_level[0::2], y_level[1::2]), [b.min() for b in bins])
+        np.testing.assert_array_equal(np.maximum(y_level[0::2], y_level[1::2]), [b.max() for b in bins])
+        # the points are samples of the series
+        assert np.all(np.isin(t_level, t))
+    # the coarsest level has at most factor * min_num_bins bins
+    assert len(levels[-1][2]) // 2 <= 4 * 100
+
+def test_lazy_series_have_the_same_levels(monkeypatch):
+    monkeypatch.setattr('figneuro.views.decimation._LAZY_MAX_NUM_BINS', 2000)
+    monkeypatch.setenv('FIGNEURO_CHUNK_NUM_BYTES', '4000')
+    t, y = _series(50000)
+    levels = min_max_pyramid(t, y, min_num_bins=10)
+    lazy_levels = min_max_pyramid(LazyArray(t), LazyArray(y), min_num_bins=10)
+    # the finest levels of a lazy series are left out
+    assert lazy_levels[0][0] == 64
+    skipped = len(levels) - len(lazy_levels)
+    for a, b in zip(levels[skipped:], lazy_levels):
+        assert a[0] == b[0]
+        np.testing.assert_array_equal(a[1], b[1])
+        np.testing.assert_array_equal(a[2], b[2])
+
+def test_decimation_is_opt_in():
+    t, y = _series(20000)
+    G = TimeseriesGraph().add_line_series(name='a', t=t, y=y, color='red')
+    data = G.to_dict()
+    assert data['type'] == 'TimeseriesGraph'
+    assert 'decimatedSeries' not in data
+    G = TimeseriesGraph().add_line_series(name='a', t=t, y=y, color='red', decimate=True)
+    data = G.to_dict()
+    assert data['type'] == 'figneuro.DecimatedTimeseriesGraph'
+    [d] = data['decimatedSeries']
+    assert d['dataset'] == 'a' and d['numPoints'] == 20000
+    assert d['startTime'] == 0 and d['endTime'] == float(t[-1])
+    level_names = [a['dataset'] for a in d['levels']]
+    assert level_names == [f'a/minmax{a["binSize"]}' for a in d['levels']]
+    assert set(level_names) <= set(ds['name'] for ds in data['datasets'])
+
+def test_unsorted_series_are_not_decimated():
+    t, y = _series(1000)
+    G = TimeseriesGraph().add_line_series(name='a', t=t[::-1].copy(), y=y, color='red', decimate=True)
+    assert G.to_dict()['type'] == 'TimeseriesGraph'
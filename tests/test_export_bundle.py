@@ -0,0 +1,77 @@
+import os
+import json
+import zlib
+from typing import List
+import numpy as np
+from figneuro.storage.LocalStorageBackend import LocalStorageBackend
+from figneuro.views.View import View
+from figneuro.views.Box import Box
+from figneuro.views.LayoutItem import LayoutItem
+from figneuro.views.Markdown import Markdown
+from figneuro.views.binary_payload import read_binary_payload
+
+
+class _SideFileView(View):
+    # a view that refers to a file stored separately, like the
+    # annotationsUri of an AnnotatedVideo
+    def __init__(self, uri: str) -> None:
+        super().__init__('Test')
+        self._uri = uri
+    def to_dict(self) -> dict:
+        return {'type': self.type, 'annotationsUri': self._uri, 'x': np.arange(100, dtype=np.float32)}
+    def child_views(self) -> List[View]:
+        return []
+
+def _export(tmp_path, monkeypatch, **kwargs):
+    source = tmp_path / 'source'
+    monkeypatch.setenv('FIGNEURO_STORAGE_BACKEND', 'local')
+    monkeypatch.setenv('FIGNEURO_LOCAL_STORE_DIR', str(source))
+    side_file_uri = LocalStorageBackend(str(source)).store_text('annotations', label='annotations.jsonl')
+    layout = Box(direction='vertical', items=[LayoutItem(Markdown('# A')), LayoutItem(_SideFileView(side_file_uri))])
+    path = str(tmp_path / 'bundle')
+    layout.export_bundle(path, label='test', state={'a': 1}, **kwargs)
+    with open(f'{path}/manifest.json') as f:
+        manifest = json.load(f)
+    return path, manifest, side_file_uri
+
+def _load(path, manifest, uri):
+    with open(os.path.join(path, manifest['files'][uri.split('?')[0]]), 'rb') as f:
+        return f.read()
+
+def _load_view_data(path, manifest, uri):
+    # what the figneuro-views app does to load the data of a view
+    doc = json.loads(_load(path, manifest, uri))
+    if doc.get('type') != 'figneuro.Payload':
+        return doc
+    if 'data' in doc:
+        return doc['data']
+    buf = _load(path, manifest, doc['payloadUri'])
+    if doc.get('compression') == 'deflate':
+        buf = zlib.decompress(buf)
+    return read_binary_payload(buf) if doc['encoding'] == 'binary' else json.loads(buf)
+
+def test_bundle_contains_the_figure_and_side_files(tmp_path, monkeypatch):
+    path, manifest, side_file_uri = _export(tmp_path, monkeypatch)
+    assert manifest['type'] == 'figneuro.Bundle'
+    assert manifest['label'] == 'test'
+    assert manifest['state'] == {'a': 1}
+    for rel in manifest['files'].values():
+        assert os.path.exists(os.path.join(path, rel))
+    figure = json.loads(_load(path, manifest, manifest['dataUri']))
+    assert figure['type'] == 'MainLayout'
+    datas = [_load_view_data(path, manifest, v['dataUri']) for v in figure['views']]
+    assert datas[0]['source'] == '# A'
+    assert datas[1]['annotationsUri'] == side_file_uri
+    # the side file is copied from the configured store
+    assert _load(path, manifest, side_file_uri) == b'annotations'
+
+def test_bundle_with_binary_compressed_payloads(tmp_path, monkeypatch):
+    path, manifest, _ = _export(tmp_path, monkeypatch, binary=True, compress=True)
+    figure = json.loads(_load(path, manifest, manifest['dataUri']))
+    data = _load_view_data(path, manifest, figure['views'][1]['dataUri'])
+    np.testing.assert_array_equal(data['x'], np.arange(100, dtype=np.float32))
+
+def test_reexport_does_not_change_the_bundle(tmp_path, monkeypatch):
+    path, manifest1, _ = _export(tmp_path, monkeypatch)
+    _, manifest2, _ = _export(tmp_path, monkeypatch)
+    assert manifest1 == manifest2
@@ -0,0 +1,68 @@
+from typing import List
+import numpy as np
+from figneuro.storage.LocalStorageBackend import LocalStorageBackend
+from figneuro.views.View import View, _UploadOptions
+from figneuro.views.Box import Box
+from figneuro.views.LayoutItem import LayoutItem
+
+
+class _CountingView(View):
+    def __init__(self, value: float) -> None:
+        super().__init__('Test')
+        self.value = value
+        self.x = np.zeros(10, dtype=np.float32)
+        # changed in place, so that counting does not mark the view dirty
+        self.num_to_dict_calls = [0]
+    def to_dict(self) -> dict:
+        self.num_to_dict_calls[0] += 1
+        return {'type': self.type, 'value': self.value, 'x': self.x}
+    def child_views(self) -> List[View]:
+        return []
+
+def _publish(layout: View, tmp_path, **kwargs):
+    opts = _UploadOptions(backend=LocalStorageBackend(str(tmp_path / 'store')), use_cache=False, **kwargs)
+    return layout._create_main_layout_data(opts=opts)
+
+def _setup():
+    views = [_CountingView(k) for k in range(3)]
+    layout = Box(direction='vertical', items=[LayoutItem(v) for v in views])
+    return views, layout
+
+def _num_calls(views):
+    return [v.num_to_dict_calls[0] for v in views]
+
+def test_only_dirty_views_are_published_again(tmp_path):
+    views, layout = _setup()
+    data1 = _publish(layout, tmp_path, incremental=True)
+    assert _num_calls(views) == [1, 1, 1]
+    assert _publish(layout, tmp_path, incremental=True) == data1
+    assert _num_calls(views) == [1, 1, 1]
+    views[1].value = 10
+    data2 = _publish(layout, tmp_path, incremental=True)
+    assert _num_calls(views) == [1, 2, 1]
+    assert data2['views'][0] == data1['views'][0]
+    assert data2['views'][1]['dataUri'] != data1['views'][1]['dataUri']
+    # changes made in place are only seen after mark_dirty()
+    views[2].x[0] = 1
+    assert _publish(layout, tmp_path, incremental=True) == data2
+    views[2].mark_dirty()
+    data3 = _publish(layout, tmp_path, incremental=True)
+    assert _num_calls(views) == [1, 2, 2]
+    assert data3['views'][2]['dataUri'] != data2['views'][2]['dataUri']
+
+def test_changed_options_publish_all_views(tmp_path):
+    views, layout = _setup()
+    _publish(layout, tmp_path, incremental=True)
+    _publish(layout, tmp_path, incremental=True, binary=True)
+    assert _num_calls(views) == [2, 2, 2]
+    _publish(layout, tmp_path / 'other', incremental=True, binary=True)
+    assert _num_calls(views) == [3, 3, 3]
+
+def test_incremental_publishing_is_opt_in(tmp_path, monkeypatch):
+    monkeypatch.delenv('FIGNEURO_INCREMENTAL_PUBLISH', raising=False)
+    views, layout = _setup()
+    data1 = _publish(layout, tmp_path)
+    views[0].x[0] = 1
+    data2 = _publish(layout, tmp_path)
+    assert _num_calls(views) == [2, 2, 2]
+    assert data2['views'][0]['dataUri'] != data1['views'][0]['dataUri']
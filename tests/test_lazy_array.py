@@ -0,0 +1,66 @@
+import numpy as np
+from figneuro.views.ChunkedArray import ChunkedArray
+from figneuro.views.LazyArray import LazyArray, as_lazy_array, is_non_decreasing
+from figneuro.views.PayloadPolicy import PayloadPolicy
+from figneuro.views.chunked_arrays import store_chunked_arrays
+
+
+class _Source:
+    # an array-like source (like an h5py dataset) that records the reads
+    def __init__(self, x: np.ndarray) -> None:
+        self._x = x
+        self.shape = x.shape
+        self.dtype = x.dtype
+        self.reads = []
+    def __getitem__(self, index):
+        self.reads.append(index)
+        return self._x[index]
+
+def test_lazy_array_reads_in_chunks(monkeypatch):
+    x = np.arange(100, dtype=np.float64).reshape(50, 2)
+    source = _Source(x)
+    a = LazyArray(source, dtype='float32')
+    assert a.shape == (50, 2) and a.dtype == np.float32 and a.nbytes == 400 and len(a) == 50
+    assert source.reads == []
+    chunks = list(a.iter_chunks(chunk_size=16))
+    assert [len(c) for c in chunks] == [16, 16, 16, 2]
+    np.testing.assert_array_equal(np.concatenate(chunks), x.astype(np.float32))
+    monkeypatch.setenv('FIGNEURO_CHUNK_NUM_BYTES', '80')
+    assert a.default_chunk_size() == 10
+    np.testing.assert_array_equal(a.column(1)[3:5], [7, 9])
+    b = a.map(lambda c: c * 2, dtype='int32')
+    assert b.dtype == np.int32
+    np.testing.assert_array_equal(np.concatenate(list(b.iter_chunks())), (x * 2).astype(np.int32))
+    assert a.min_max() == (0, 99)
+    assert np.isnan(LazyArray(np.array([np.nan, np.nan])).min_max()[0])
+
+def test_as_lazy_array(tmp_path):
+    m = np.memmap(tmp_path / 'a.dat', dtype=np.int16, mode='w+', shape=(10,))
+    assert isinstance(as_lazy_array(m), LazyArray)
+    assert as_lazy_array(np.zeros(3)) is None
+    assert isinstance(as_lazy_array(_Source(np.zeros(3))), LazyArray)
+    # objects with the buffer protocol are viewed, not copied
+    np.testing.assert_array_equal(LazyArray(bytearray(b'\x01\x02'))[:], [1, 2])
+
+def test_is_non_decreasing(monkeypatch):
+    monkeypatch.setenv('FIGNEURO_CHUNK_NUM_BYTES', '8')
+    assert is_non_decreasing(LazyArray(np.array([0, 1, 1, 2, 3, 5], dtype=np.int16)))
+    # a decrease between two chunks
+    assert not is_non_decreasing(LazyArray(np.array([0, 1, 2, 3, 2, 5], dtype=np.int16)))
+    assert not is_non_decreasing(np.array([1.0, 0.0]))
+
+def test_chunks_of_lazy_sources_are_read_as_they_are_stored():
+    x = np.arange(100, dtype=np.float32)
+    source = _Source(x)
+    c = ChunkedArray(source, chunk_size=10)
+    def num_chunk_reads():
+        # (the times of the first and last entries of each chunk are read
+        # one by one)
+        return len([r for r in source.reads if isinstance(r, tuple)])
+    num_chunk_reads_per_batch = []
+    def store_chunks(chunks):
+        num_chunk_reads_per_batch.append(num_chunk_reads())
+        return {key: key for key in chunks}
+    store_chunked_arrays({'x': c}, payload_policy=PayloadPolicy(), store_chunks=store_chunks, batch_size=3)
+    # each batch is stored before the next chunks are read
+    assert num_chunk_reads_per_batch == [3, 6, 9, 10]
@@ -0,0 +1,67 @@
+import json
+import numpy as np
+import pytest
+from figneuro.storage.LocalStorageBackend import LocalStorageBackend
+from figneuro.views.TimeseriesGraph import TimeseriesGraph
+from figneuro.views.binary_payload import read_binary_payload
+
+
+def _load_segment(backend, uri):
+    with open(backend.load_file(uri), 'rb') as f:
+        return read_binary_payload(f.read())
+
+def _manifest(G, backend):
+    return json.loads(backend.get_mutable(G.to_dict()['liveManifestKey']))
+
+def _graph():
+    return TimeseriesGraph(live=True).add_line_series(name='a', t=np.arange(10, dtype=np.float32), y=np.zeros(10, dtype=np.float32), color='red')
+
+def test_appended_segments_are_listed_in_the_manifest(tmp_path):
+    backend = LocalStorageBackend(str(tmp_path / 'store'))
+    G = _graph()
+    data = G.to_dict()
+    assert data['type'] == 'figneuro.LiveTimeseriesGraph'
+    G.append('a', np.arange(10, 15, dtype=np.float32), np.ones(5, dtype=np.float32), backend=backend)
+    G.append('a', np.arange(15, 17, dtype=np.float32), np.full(2, 2, dtype=np.float32), backend=backend)
+    segments = _manifest(G, backend)['segments']
+    assert [(s['dataset'], s['numPoints']) for s in segments] == [('a', 5), ('a', 2)]
+    np.testing.assert_array_equal(_load_segment(backend, segments[1]['uri'])['t'], [15, 16])
+    # the view data itself does not change
+    assert G.to_dict() == data
+
+def test_appended_times_must_be_in_order(tmp_path):
+    backend = LocalStorageBackend(str(tmp_path / 'store'))
+    G = _graph()
+    with pytest.raises(Exception):
+        # before the last time of the series
+        G.append('a', np.array([8, 20], dtype=np.float32), np.zeros(2, dtype=np.float32), backend=backend)
+    with pytest.raises(Exception):
+        G.append('a', np.array([12, 11], dtype=np.float32), np.zeros(2, dtype=np.float32), backend=backend)
+    # an empty chunk does not move the last time
+    G.append('a', np.zeros((0,), dtype=np.float32), np.zeros((0,), dtype=np.float32), backend=backend)
+    G.append('a', np.array([9, 12], dtype=np.float32), np.zeros(2, dtype=np.float32), backend=backend)
+    with pytest.raises(Exception):
+        G.append('a', np.array([11], dtype=np.float32), np.zeros(1, dtype=np.float32), backend=backend)
+    assert len(_manifest(G, backend)['segments']) == 2
+
+def test_append_errors(tmp_path):
+    backend = LocalStorageBackend(str(tmp_path / 'store'))
+    t = np.arange(10, dtype=np.float32)
+    with pytest.raises(Exception):
+        TimeseriesGraph().add_line_series(name='a', t=t, y=t, color='red').append('a', t + 10, t, backend=backend)
+    G = _graph()
+    with pytest.raises(Exception):
+        G.append('b', t + 10, t, backend=backend)
+    with pytest.raises(Exception):
+        G.append('a', t + 10, t[:5], backend=backend)
+
+def test_appended_values_use_the_quantization_of_the_series(tmp_path):
+    backend = LocalStorageBackend(str(tmp_path / 'store'))
+    t = np.arange(100, dtype=np.float32)
+    G = TimeseriesGraph(live=True).add_line_series(name='a', t=t, y=np.sin(t / 10).astype(np.float32), color='red', max_error=0.01)
+    y = G.to_dict()['datasets'][0]['data']['y']
+    G.append('a', t + 100, np.cos(t / 10).astype(np.float32), backend=backend)
+    segment = _load_segment(backend, _manifest(G, backend)['segments'][0]['uri'])
+    assert segment['y']['_type'] == 'quantizedArray'
+    assert segment['y']['scale'] == y['scale'] and segment['y']['offset'] == y['offset']
+    assert np.abs(segment['y']['data'] * y['scale'] + y['offset'] - np.cos(t / 10)).max() <= 0.01 + 1e-6
@@ -0,0 +1,50 @@
+import asyncio
+import hashlib
+from figneuro.storage.LocalStorageBackend import LocalStorageBackend
+from figneuro.storage.get_storage_backend import get_storage_backend
+
+
+def _write(path, text):
+    with open(path, 'w') as f:
+        f.write(text)
+    return str(path)
+
+def test_files_are_content_addressed(tmp_path):
+    backend = LocalStorageBackend(str(tmp_path / 'store'))
+    fname = _write(tmp_path / 'a.txt', 'abc')
+    uri = backend.store_file(fname, label='a.txt')
+    sha1 = hashlib.sha1(b'abc').hexdigest()
+    assert uri == f'sha1://{sha1}?label=a.txt'
+    # same content, same file
+    assert backend.store_file(_write(tmp_path / 'b.txt', 'abc')) == f'sha1://{sha1}'
+    assert backend.load_text(uri) == 'abc'
+    assert backend.load_file(f'sha1://{sha1}') == backend.path_for_sha1(sha1)
+    assert backend.has_file(uri)
+    assert backend.load_file('sha1://' + '0' * 40) is None
+    assert not backend.has_file('sha1://' + '0' * 40)
+    assert backend.load_file('https://example.com/a.txt') is None
+
+def test_json_mutables_and_batches(tmp_path):
+    backend = LocalStorageBackend(str(tmp_path / 'store'))
+    uri = backend.store_json({'b': 1, 'a': [1, 2]}, label='x.json')
+    assert backend.load_text(uri) == '{"a":[1,2],"b":1}'
+    assert backend.get_mutable('k') is None
+    backend.set_mutable('k', 'v1')
+    backend.set_mutable('k', 'v2')
+    assert backend.get_mutable('k') == 'v2'
+    files = [(_write(tmp_path / f'{i}.txt', f'{i}'), f'{i}.txt') for i in range(5)]
+    uris = backend.put_many(files)
+    assert [backend.load_text(u) for u in uris] == [f'{i}' for i in range(5)]
+    assert asyncio.run(backend.put_many_async(files)) == uris
+
+def test_get_storage_backend(tmp_path, monkeypatch):
+    monkeypatch.setenv('FIGNEURO_LOCAL_STORE_DIR', str(tmp_path / 'store'))
+    backend = get_storage_backend('local')
+    assert isinstance(backend, LocalStorageBackend)
+    assert backend.directory == str(tmp_path / 'store')
+    assert get_storage_backend('local') is backend
+    monkeypatch.setenv('FIGNEURO_STORAGE_BACKEND', 'local')
+    assert get_storage_backend() is backend
+    other = LocalStorageBackend(str(tmp_path / 'other'))
+    assert get_storage_backend(other) is other
+    assert other.cache_namespace() != backend.cache_namespace()
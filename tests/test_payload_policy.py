@@ -0,0 +1,43 @@
+import numpy as np
+from figneuro.views.PayloadPolicy import PayloadPolicy, get_default_payload_policy
+
+
+def _restore(x):
+    # what the figneuro-views app reconstructs from the published data
+    if isinstance(x, dict) and x.get('_type') == 'offsetArray':
+        return x['data'].astype(np.float64) + x['offset']
+    return np.asarray(x).astype(np.float64)
+
+def test_default_policy_round_trips_float64_exactly(monkeypatch):
+    monkeypatch.delenv('FIGNEURO_PAYLOAD_FLOAT_RTOL', raising=False)
+    policy = get_default_payload_policy()
+    rng = np.random.default_rng(0)
+    arrays = [
+        rng.normal(size=1000),
+        # spike times late in a long recording
+        3600 * 40 + np.sort(rng.random(1000)) * 10,
+        np.arange(1000, dtype=np.float64),
+        np.array([1.5, np.nan, -2.25, np.inf])
+    ]
+    for x in arrays:
+        y = policy.apply({'x': x})['x']
+        # tolerance 0: the published values are the original values
+        np.testing.assert_array_equal(_restore(y), x)
+    # values that float32 represents exactly are still down-cast
+    assert policy.apply({'x': np.arange(10, dtype=np.float64)})['x'].dtype == np.float32
+
+def test_default_policy_down_casts_integers_losslessly():
+    policy = PayloadPolicy()
+    for x in [np.arange(-5, 5, dtype=np.int64), np.array([0, 2**31 + 5], dtype=np.int64), np.array([-1, 2**40], dtype=np.int64)]:
+        y = policy.apply({'x': x})['x']
+        np.testing.assert_array_equal(y.astype(np.int64), x)
+
+def test_lossy_policy_stays_within_tolerance():
+    rtol = 1e-6
+    policy = PayloadPolicy(float_rtol=rtol)
+    rng = np.random.default_rng(1)
+    for x in [rng.normal(size=1000), 3600 * 40 + np.sort(rng.random(1000)) * 10]:
+        y = policy.apply({'x': x})['x']
+        assert _restore(y).dtype == np.float64
+        assert (y['data'] if isinstance(y, dict) else y).dtype == np.float32
+        assert np.abs(_restore(y) - x).max() <= rtol * (x.max() - x.min())
@@ -0,0 +1,54 @@
+import threading
+import weakref
+from typing import List
+import numpy as np
+from figneuro.storage.LocalStorageBackend import LocalStorageBackend
+from figneuro.views.View import View, _UploadOptions
+from figneuro.views.Box import Box
+from figneuro.views.LayoutItem import LayoutItem
+
+
+class _ArrayView(View):
+    # a view whose data is built (as a new array) every time it is published
+    def __init__(self, value: float, *, on_array=None) -> None:
+        super().__init__('Test')
+        self._value = value
+        self._on_array = on_array
+    def to_dict(self) -> dict:
+        x = np.full(1000, self._value, dtype=np.float32)
+        if self._on_array is not None:
+            self._on_array(x)
+        return {'type': self.type, 'x': x}
+    def child_views(self) -> List[View]:
+        return []
+
+def _layout(views: List[View]):
+    return Box(direction='vertical', items=[LayoutItem(v) for v in views])
+
+def _options(tmp_path, **kwargs):
+    return _UploadOptions(backend=LocalStorageBackend(str(tmp_path / 'store')), use_cache=False, **kwargs)
+
+def test_views_are_dropped_once_uploaded(tmp_path):
+    lock = threading.Lock()
+    num_alive = [0]
+    max_num_alive = [0]
+    def on_released():
+        with lock:
+            num_alive[0] -= 1
+    def on_array(x):
+        with lock:
+            num_alive[0] += 1
+            max_num_alive[0] = max(max_num_alive[0], num_alive[0])
+        weakref.finalize(x, on_released)
+    views = [_ArrayView(k, on_array=on_array) for k in range(20)]
+    _layout(views)._create_main_layout_data(opts=_options(tmp_path, num_workers=2))
+    assert num_alive[0] == 0
+    assert max_num_alive[0] <= 2
+
+def test_figure_does_not_depend_on_the_number_of_workers(tmp_path):
+    views = [_ArrayView(k) for k in range(8)]
+    data1 = _layout(views)._create_main_layout_data(opts=_options(tmp_path, num_workers=1))
+    data4 = _layout(views)._create_main_layout_data(opts=_options(tmp_path, num_workers=4))
+    data_shared = _layout(views)._create_main_layout_data(opts=_options(tmp_path, num_workers=4, share_arrays=True))
+    assert data1 == data4
+    assert [v['dataUri'] for v in data1['views']] == [v['dataUri'] for v in data_shared['views']]
@@ -0,0 +1,47 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from figneuro.spike_sorting.views.RasterPlot import RasterPlot, RasterPlotItem
+from figneuro.views.Box import Box
+from figneuro.views.ChunkedArray import ChunkedArray
+from figneuro.views.LayoutItem import LayoutItem
+from conftest import load_view_datas
+
+
+def _run_with_timeout(coro, *, timeout: float):
+    # in a separate thread, so that a deadlock fails the test rather than
+    # hanging it
+    result = {}
+    def run():
+        async def main():
+            # fewer threads than upload workers
+            asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=3))
+            return await coro
+        result['value'] = asyncio.run(main())
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), 'url_async did not finish'
+    return result['value']
+
+def _raster_plots(num_views: int):
+    rng = np.random.default_rng(0)
+    views = []
+    for k in range(num_views):
+        times = np.sort(rng.random(200)).astype(np.float32) * 100 + k
+        views.append(RasterPlot(start_time_sec=0, end_time_sec=200, plots=[RasterPlotItem(0, ChunkedArray(times, chunk_size=20))]))
+    return Box(direction='vertical', items=[LayoutItem(v) for v in views])
+
+def test_url_async_with_many_chunked_views(local_publish):
+    layout = _raster_plots(40)
+    url = _run_with_timeout(layout.url_async(label='test', num_workers=4), timeout=60)
+    assert url.startswith('https://')
+    figure = local_publish[-1]
+    assert len(figure.data['views']) == 40
+    # the same figure as the synchronous path
+    layout.url(label='test', num_workers=4)
+    assert local_publish[-1].data == figure.data
+    data = load_view_datas(figure)[5]
+    chunks = data['data']['plots'][0]['spikeTimesSec']['chunks']
+    assert len(chunks) == 10 and all(['uri' in c for c in chunks])
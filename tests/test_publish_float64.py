@@ -0,0 +1,25 @@
+import base64
+import numpy as np
+from figneuro.spike_sorting.views.RasterPlot import RasterPlot, RasterPlotItem
+from conftest import load_view_datas
+
+
+def _decode(x):
+    assert x['_type'] == 'ndarray'
+    return np.frombuffer(base64.b64decode(x['data_b64']), dtype=x['dtype'])
+
+def test_float64_spike_times_are_published_exactly(local_publish, monkeypatch):
+    monkeypatch.delenv('FIGNEURO_PAYLOAD_FLOAT_RTOL', raising=False)
+    rng = np.random.default_rng(0)
+    # spike times late in a long recording, not representable as float32
+    times = [3600 * 40 + np.sort(rng.random(100)) * 10 for _ in range(3)]
+    view = RasterPlot(start_time_sec=0, end_time_sec=3600 * 41, plots=[RasterPlotItem(k, t) for k, t in enumerate(times)])
+    for streaming in ['1', '0']:
+        monkeypatch.setenv('FIGNEURO_STREAMING_ENCODE', streaming)
+        url = view.url(label='test', use_cache=False)
+        assert url.startswith('https://')
+        data = load_view_datas(local_publish[-1])[0]
+        assert data['type'] == 'RasterPlot'
+        for plot, t in zip(data['plots'], times):
+            assert plot['spikeTimesSec']['dtype'] == 'float64'
+            np.testing.assert_array_equal(_decode(plot['spikeTimesSec']), t)
@@ -0,0 +1,55 @@
+import numpy as np
+from figneuro.views.LazyArray import LazyArray
+from figneuro.views.TimeseriesGraph import TimeseriesGraph
+from figneuro.views.quantization import Quantization, choose_quantization
+
+
+def _restore(q: np.ndarray, quantization: Quantization):
+    return q.astype(np.float64) * quantization.scale + quantization.offset
+
+def test_quantization_error_is_within_max_error():
+    rng = np.random.default_rng(0)
+    y = rng.normal(size=10000) * 50 + 1000
+    for max_error, dtype in [(1, 'uint8'), (0.01, 'int16')]:
+        quantization = choose_quantization(y, max_error=max_error)
+        assert quantization.dtype == dtype
+        q = quantization.quantize(y)
+        assert q.dtype == dtype
+        err = np.abs(_restore(q, quantization) - y)
+        assert err.max() <= max_error
+        assert err.max() <= quantization.max_error * (1 + 1e-9)
+        # the extremes map to the ends of the range of the dtype
+        assert q.min() == np.iinfo(dtype).min and q.max() == np.iinfo(dtype).max
+    # int16 cannot get within 1e-4 of values with a range of about 400
+    assert choose_quantization(y, max_error=1e-4) is None
+
+def test_special_cases():
+    assert choose_quantization(np.array([1.0, np.nan]), max_error=1) is None
+    # constant values are exact
+    quantization = choose_quantization(np.full(10, 3.25), max_error=1e-9)
+    np.testing.assert_array_equal(_restore(quantization.quantize(np.full(10, 3.25)), quantization), 3.25)
+    assert choose_quantization(np.zeros((0,)), max_error=1) is not None
+    # raw int16 samples with scale 1 and offset 0 are kept as they are
+    q = np.arange(5, dtype=np.int16)
+    assert Quantization(dtype='int16', scale=1, offset=0).quantize(q) is q
+
+def test_lazy_arrays_are_quantized_chunk_by_chunk(monkeypatch):
+    monkeypatch.setenv('FIGNEURO_CHUNK_NUM_BYTES', '800')
+    y = np.random.default_rng(1).normal(size=1000)
+    quantization = choose_quantization(LazyArray(y), max_error=0.01)
+    assert quantization.scale == choose_quantization(y, max_error=0.01).scale
+    q = quantization.quantize(LazyArray(y))
+    assert isinstance(q, LazyArray) and q.dtype == np.int16
+    np.testing.assert_array_equal(np.concatenate(list(q.iter_chunks())), quantization.quantize(y))
+
+def test_timeseries_graph_quantized_series():
+    t = np.arange(1000, dtype=np.float32)
+    y = np.sin(t / 10).astype(np.float32)
+    data = TimeseriesGraph().add_line_series(name='a', t=t, y=y, color='red', max_error=0.01).to_dict()
+    yq = data['datasets'][0]['data']['y']
+    assert yq['_type'] == 'quantizedArray' and yq['data'].dtype == np.uint8
+    assert np.abs(yq['data'] * yq['scale'] + yq['offset'] - y).max() <= 0.01
+    # raw samples with their scale and offset
+    data = TimeseriesGraph().add_line_series(name='a', t=t, y=np.arange(1000, dtype=np.int16), color='red', scale=0.5, offset=2).to_dict()
+    yq = data['datasets'][0]['data']['y']
+    assert yq['scale'] == 0.5 and yq['offset'] == 2 and yq['data'].dtype == np.int16
@@ -0,0 +1,44 @@
+import numpy as np
+import figneuro.spike_sorting.views as ssv
+from figneuro.spike_sorting.views.SpikeTrains import SpikeTrains
+
+EDGES = [-1.5, -0.5, 0.5, 1.5]
+
+
+def _cross_correlogram_items():
+    return [
+        ssv.CrossCorrelogramItem(unit_id1=u1, unit_id2=u2, bin_edges_sec=EDGES, bin_counts=[u1, u2, 0])
+        for u1 in [1, 2] for u2 in [1, 2]
+    ]
+
+def test_cross_correlogram_items_keep_their_view_type():
+    view = ssv.CrossCorrelograms(cross_correlograms=_cross_correlogram_items())
+    d = view.to_dict()
+    assert view.type == 'CrossCorrelograms'
+    assert d['type'] == 'CrossCorrelograms'
+    assert [(a['unitId1'], a['unitId2']) for a in d['crossCorrelograms']] == [(1, 1), (1, 2), (2, 1), (2, 2)]
+
+def test_dense_cross_correlograms_on_request():
+    view = ssv.CrossCorrelograms(cross_correlograms=_cross_correlogram_items(), dense=True)
+    d = view.to_dict()
+    assert d['type'] == 'figneuro.DenseCrossCorrelograms'
+    assert d['unitIds'] == [1, 2]
+    view = ssv.CrossCorrelograms(bin_edges_sec=EDGES, unit_ids=[1, 2], bin_counts=np.zeros((2, 2, 3)))
+    assert view.type == 'figneuro.DenseCrossCorrelograms'
+
+def test_autocorrelogram_items_keep_their_view_type():
+    items = [ssv.AutocorrelogramItem(unit_id=u, bin_edges_sec=EDGES, bin_counts=[u, 0, u]) for u in [1, 2]]
+    view = ssv.Autocorrelograms(autocorrelograms=items)
+    d = view.to_dict()
+    assert d['type'] == 'Autocorrelograms'
+    assert [a['unitId'] for a in d['autocorrelograms']] == [1, 2]
+    view = ssv.Autocorrelograms(autocorrelograms=items, dense=True)
+    assert view.to_dict()['type'] == 'figneuro.DenseAutocorrelograms'
+
+def test_raster_plot_items_in_seconds_keep_their_view_type():
+    plots = [ssv.RasterPlotItem(unit_id=u, spike_times_sec=np.array([0.1, 0.2 * u], dtype=np.float32)) for u in [1, 2]]
+    view = ssv.RasterPlot(start_time_sec=0, end_time_sec=1, plots=plots)
+    assert view.to_dict()['type'] == 'RasterPlot'
+    spike_trains = SpikeTrains.from_unit_spike_frames([1, 2], [np.array([3, 6]), np.array([3])], sampling_frequency=30)
+    view = ssv.RasterPlot(start_time_sec=0, end_time_sec=1, plots=spike_trains)
+    assert view.to_dict()['type'] == 'figneuro.SpikeTrainsView'
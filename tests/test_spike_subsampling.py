@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+import figneuro.spike_sorting.views as ssv
+from figneuro.spike_sorting.views.SpikeSubsampling import SpikeSubsampling
+from figneuro.spike_sorting.views.SpikeTrains import SpikeTrains
+
+SAMPLING_FREQUENCY = 1000
+SUBSAMPLING = SpikeSubsampling(max_spikes_per_bin=5, num_time_bins=4, seed=3)
+
+
+def _data(seed=0):
+    rng = np.random.default_rng(seed)
+    frames = [np.sort(rng.integers(0, 10 * SAMPLING_FREQUENCY, size=n)) for n in [300, 7]]
+    amplitudes = [rng.normal(size=len(f)).astype(np.float32) for f in frames]
+    # outliers, which must always be shown
+    amplitudes[0][17] = 100
+    amplitudes[0][230] = -100
+    return frames, amplitudes
+
+def _amplitudes_view(subsampling=SUBSAMPLING):
+    frames, amplitudes = _data()
+    plots = [
+        ssv.SpikeAmplitudesItem(unit_id=u, spike_times_sec=(f / SAMPLING_FREQUENCY).astype(np.float32), spike_amplitudes=a)
+        for u, f, a in zip([1, 2], frames, amplitudes)
+    ]
+    return ssv.SpikeAmplitudes(start_time_sec=0, end_time_sec=10, plots=plots, subsampling=subsampling)
+
+def _assert_same(x1, x2):
+    if isinstance(x1, dict):
+        assert x1.keys() == x2.keys()
+        for k in x1:
+            _assert_same(x1[k], x2[k])
+    elif isinstance(x1, list):
+        assert len(x1) == len(x2)
+        for a, b in zip(x1, x2):
+            _assert_same(a, b)
+    else:
+        assert np.array_equal(x1, x2)
+
+def test_same_data_gives_same_subsampling():
+    d1 = _amplitudes_view().to_dict()
+    d2 = _amplitudes_view().to_dict()
+    _assert_same(d1, d2)
+    # and a different seed gives a different one
+    d3 = _amplitudes_view(SpikeSubsampling(max_spikes_per_bin=5, num_time_bins=4, seed=4)).to_dict()
+    assert not np.array_equal(d1['view']['units'][0]['spikeTimesSec'], d3['view']['units'][0]['spikeTimesSec'])
+
+def test_amplitude_outliers_are_kept():
+    d = _amplitudes_view().to_dict()
+    assert d['type'] == 'figneuro.SubsampledView'
+    units = d['view']['units']
+    amplitudes = units[0]['spikeAmplitudes']
+    assert 100 in amplitudes and -100 in amplitudes
+    # at most 5 random spikes and the minimum and maximum per bin
+    assert len(amplitudes) <= 4 * (5 + 2)
+    assert len(units[1]['spikeAmplitudes']) == 7
+    record = d['subsampling']
+    assert record['numSpikes'].tolist() == [300, 7]
+    assert record['ratios'][1] == 1
+    assert record['numShownSpikes'] == len(amplitudes) + 7
+
+def test_spike_trains_subsampling_matches_items():
+    frames, amplitudes = _data()
+    st = SpikeTrains.from_unit_spike_frames([1, 2], frames, sampling_frequency=SAMPLING_FREQUENCY)
+    view = ssv.SpikeAmplitudes(start_time_sec=0, end_time_sec=10, plots=st, spike_amplitudes=np.concatenate(amplitudes), subsampling=SUBSAMPLING)
+    d = view.to_dict()
+    # the same spikes as with the items in seconds
+    units = _amplitudes_view().to_dict()['view']['units']
+    assert d['subsampling']['numShownSpikes'] == sum(len(u['spikeAmplitudes']) for u in units)
+    assert np.array_equal(d['view']['spikeData']['spikeAmplitudes'], np.concatenate([u['spikeAmplitudes'] for u in units]))
+
+def _locations_view():
+    frames, values = _data(1)
+    units = [
+        ssv.SpikeLocationsItem(unit_id=u, spike_times_sec=f / SAMPLING_FREQUENCY, x_locations=v, y_locations=-2 * v)
+        for u, f, v in zip([1, 2], frames, values)
+    ]
+    return ssv.SpikeLocations(
+        units,
+        x_range=(-100, 100),
+        y_range=(-200, 200),
+        hide_unit_selector=False,
+        channel_locations={},
+        subsampling=SUBSAMPLING
+    )
+
+def test_location_outliers_are_kept():
+    d1 = _locations_view().to_dict()
+    _assert_same(d1, _locations_view().to_dict())
+    unit = d1['view']['units'][0]
+    assert 100 in unit['xLocations'] and -100 in unit['xLocations']
+    assert 200 in unit['yLocations'] and -200 in unit['yLocations']
+    assert len(unit['xLocations']) < 300
+
+def test_invalid_subsampling():
+    with pytest.raises(Exception):
+        SpikeSubsampling(max_spikes_per_bin=0)
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from figneuro.spike_sorting.views.SpikeTrains import SpikeTrains, frames_as_uint32
+
+TIMES = np.array([50, 10, 40, 20, 30, 60])
+LABELS = np.array([2, 1, 2, 3, 1, 9])
+
+
+def test_from_times_labels():
+    st = SpikeTrains.from_times_labels(TIMES, LABELS, sampling_frequency=1000)
+    assert st.unit_ids == [1, 2, 3, 9]
+    assert st.spike_frames.tolist() == [10, 30, 40, 50, 20, 60]
+    assert st.unit_offsets.tolist() == [0, 2, 4, 5, 6]
+    # values in the source order are reordered with sort_index
+    assert np.array_equal(TIMES[st.sort_index], st.spike_frames)
+    assert st.get_unit_spike_train(2).tolist() == [40, 50]
+
+def test_from_times_labels_with_unit_ids():
+    # in the given order, leaving out the spikes of the other units
+    st = SpikeTrains.from_times_labels(TIMES, LABELS, sampling_frequency=1000, unit_ids=[3, 1, 7])
+    assert st.unit_ids == [3, 1, 7]
+    assert st.spike_frames.tolist() == [20, 10, 30]
+    assert st.unit_offsets.tolist() == [0, 1, 3, 3]
+    assert LABELS[st.sort_index].tolist() == [3, 1, 1]
+
+def test_from_times_labels_with_no_units():
+    st = SpikeTrains.from_times_labels(TIMES, LABELS, sampling_frequency=1000, unit_ids=[])
+    assert st.num_units == 0
+    assert st.num_spikes == 0
+    assert st.unit_offsets.tolist() == [0]
+    st = SpikeTrains.from_times_labels(np.zeros((0,), dtype=np.int64), np.zeros((0,), dtype=np.int64), sampling_frequency=1000, unit_ids=[])
+    assert st.num_spikes == 0
+
+def test_from_unit_spike_frames():
+    st = SpikeTrains.from_unit_spike_frames(['b', 'a'], [np.array([5, 7]), np.array([1])], sampling_frequency=1000)
+    assert st.unit_ids == ['b', 'a']
+    assert st.spike_frames.tolist() == [5, 7, 1]
+    assert st.get_unit_spike_train('a').tolist() == [1]
+    assert st.sort_index is None
+    with pytest.raises(Exception):
+        SpikeTrains.from_unit_spike_frames(['a'], [], sampling_frequency=1000)
+
+def test_invalid_unit_offsets():
+    with pytest.raises(Exception):
+        SpikeTrains(unit_ids=[1, 2], spike_frames=np.arange(3), unit_offsets=np.array([0, 2, 2]), sampling_frequency=1000)
+
+def test_to_dict_frame_offset():
+    start = 2**33
+    st = SpikeTrains.from_unit_spike_frames([1], [start + np.array([0, 5, 9])], sampling_frequency=30000)
+    d = st.to_dict()
+    assert d['spikeFrames'].dtype == np.uint32
+    assert d['frameOffset'] == start
+    assert (d['spikeFrames'].astype(np.int64) + d['frameOffset']).tolist() == (start + np.array([0, 5, 9])).tolist()
+    assert 'frameOffset' not in SpikeTrains.from_unit_spike_frames([1], [np.array([3])], sampling_frequency=1).to_dict()
+
+def test_frames_as_uint32():
+    frames, offset = frames_as_uint32(np.array([-3, 4]))
+    assert offset == -3
+    assert frames.tolist() == [0, 7]
+    with pytest.raises(Exception):
+        frames_as_uint32(np.array([0, 2**33]))
@@ -0,0 +1,44 @@
+import io
+import numpy as np
+import simplejson
+import figurl as fig
+from figneuro.views.LazyArray import LazyArray
+from figneuro.views.stream_encode import write_encoded_data
+
+
+def _encode(x):
+    f = io.StringIO()
+    write_encoded_data(x, f)
+    return f.getvalue()
+
+def _serialize(x):
+    # what the non-streaming path writes
+    return simplejson.dumps(fig.serialize_data(x, allow_float64=True), separators=(',', ':'), indent=None, allow_nan=False, sort_keys=True)
+
+def test_stream_encoder_matches_serialize_data(monkeypatch):
+    rng = np.random.default_rng(0)
+    data = {
+        'type': 'Test',
+        'z': [1, 2.5, 'a', None, True, {'b': np.int32(3), 'a': np.float32(0.5)}],
+        'arrays': [
+            rng.integers(0, 255, size=(7, 3)).astype(np.uint8),
+            rng.integers(-1000, 1000, size=100).astype(np.int16),
+            np.arange(10, dtype=np.uint16),
+            np.arange(-5, 5, dtype=np.int32),
+            np.arange(10, dtype=np.uint32),
+            rng.normal(size=(5, 4)).astype(np.float32),
+            rng.normal(size=7),
+            np.zeros((0,), dtype=np.float32)
+        ],
+        'nested': {'x': ('t', 1)}
+    }
+    assert _encode(data) == _serialize(data)
+    # arrays larger than one chunk of the encoder
+    monkeypatch.setattr('figneuro.views.stream_encode._ARRAY_CHUNK_NUM_BYTES', 3 * 10)
+    assert _encode(data) == _serialize(data)
+
+def test_stream_encoder_reads_lazy_arrays_in_chunks(monkeypatch):
+    monkeypatch.setenv('FIGNEURO_CHUNK_NUM_BYTES', '20')
+    x = np.random.default_rng(1).normal(size=(101, 2)).astype(np.float32)
+    assert _encode({'x': LazyArray(x)}) == _serialize({'x': x})
+    assert _encode({'x': LazyArray(x.astype(np.float64), dtype='float32')}) == _serialize({'x': x})
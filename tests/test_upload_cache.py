@@ -0,0 +1,54 @@
+import os
+import shutil
+import numpy as np
+from figneuro.storage.LocalStorageBackend import LocalStorageBackend
+from figneuro.views.View import _UploadOptions, _upload_view_data_and_return_uri, _get_cache_key
+
+
+class _CountingBackend(LocalStorageBackend):
+    def __init__(self, directory: str) -> None:
+        super().__init__(directory)
+        self.num_stored = 0
+    def store_file(self, filename, *, label=None):
+        self.num_stored += 1
+        return super().store_file(filename, label=label)
+
+def _data(k: int=0):
+    return {'type': 'Test', 'x': np.arange(1000, dtype=np.float32) + k}
+
+def test_cache_hits_skip_the_upload(tmp_path, monkeypatch):
+    monkeypatch.setenv('FIGNEURO_UPLOAD_CACHE_DIR', str(tmp_path / 'cache'))
+    backend = _CountingBackend(str(tmp_path / 'store'))
+    opts = _UploadOptions(backend=backend)
+    uri = _upload_view_data_and_return_uri(_data(), opts=opts)
+    num_stored = backend.num_stored
+    assert num_stored > 0
+    assert _upload_view_data_and_return_uri(_data(), opts=opts) == uri
+    assert backend.num_stored == num_stored
+    # changed data is a miss
+    assert _upload_view_data_and_return_uri(_data(1), opts=opts) != uri
+    assert backend.num_stored > num_stored
+
+def test_cache_hits_for_deleted_files_are_stored_again(tmp_path, monkeypatch):
+    monkeypatch.setenv('FIGNEURO_UPLOAD_CACHE_DIR', str(tmp_path / 'cache'))
+    backend = _CountingBackend(str(tmp_path / 'store'))
+    opts = _UploadOptions(backend=backend)
+    uri = _upload_view_data_and_return_uri(_data(), opts=opts)
+    shutil.rmtree(tmp_path / 'store')
+    num_stored = backend.num_stored
+    assert _upload_view_data_and_return_uri(_data(), opts=opts) == uri
+    assert backend.num_stored > num_stored
+    assert backend.load_file(uri) is not None
+
+def test_cache_keys_depend_on_the_store(tmp_path, monkeypatch):
+    monkeypatch.setenv('FIGNEURO_UPLOAD_CACHE_DIR', str(tmp_path / 'cache'))
+    opts1 = _UploadOptions(backend=LocalStorageBackend(str(tmp_path / 'store1')))
+    opts2 = _UploadOptions(backend=LocalStorageBackend(str(tmp_path / 'store2')))
+    key1 = _get_cache_key(_data(), opts=opts1, namespace='test')
+    assert key1 == _get_cache_key(_data(), opts=opts1, namespace='test')
+    assert key1 != _get_cache_key(_data(), opts=opts2, namespace='test')
+    # a figure published to another store gets its own copy of the data
+    uri = _upload_view_data_and_return_uri(_data(), opts=opts1)
+    assert _upload_view_data_and_return_uri(_data(), opts=opts2) == uri
+    assert opts2.backend.load_file(uri) is not None
+    assert os.path.exists(opts1.backend.load_file(uri))